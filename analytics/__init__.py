@@ -0,0 +1,3 @@
+"""
+חבילת analytics - סטטיסטיקות שימוש מתוך נתוני הלמידה
+"""
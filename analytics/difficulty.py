@@ -0,0 +1,189 @@
+"""
+כיול רמות הקושי של המילים לפי תוצאות המשתמשים (עבודת אצווה, מחוץ לבוט)
+
+ציוני הידע (words_knowledge) של כל המשתמשים נטענים למטריצה דלילה
+משתמשים x מילים - שלושה מערכי NumPy של שורה, עמודה וציון. לכל מילה נספרים
+המשתמשים שתרגלו אותה (ציון שונה מ-0) ואלה שיודעים אותה (ציון חיובי).
+שיעור ההצלחה מוחלק לכיוון השיעור הכללי, כך שמילה שתרגלו מעט משתמשים לא
+נחשבת קלה או קשה במיוחד בגלל כמה תוצאות. הרמות נקבעות לפי קוונטילים של
+שיעור ההצלחה: השליש עם השיעור הגבוה ביותר ברמה 1, והנמוך ביותר ברמה 3.
+
+הרמות נכתבות לקובץ המילים, ותמונת המצב הבינארית (אם יש) נבנית מחדש.
+
+הרצה מתיקיית הפרויקט (לפי האחסון של הבוט - USER_STORAGE):
+    python -m analytics.difficulty data/users data/words/words_complete_unique_ids.json
+    python -m analytics.difficulty --storage sqlite data/users.sqlite3 data/words/words_complete_unique_ids.json
+    python -m analytics.difficulty --storage mongo mongodb://localhost:27017/english_learning_bot data/words/...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from array import array
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from storage.file_io import write_file_atomic
+from utils.word_snapshot import build_snapshot, snapshot_path_for
+
+
+class ScoreMatrix(NamedTuple):
+    """ציוני הידע כמטריצה דלילה משתמשים x מילים (ערך לכל תא שאינו ריק)"""
+    rows: np.ndarray
+    cols: np.ndarray
+    scores: np.ndarray
+    shape: Tuple[int, int]
+
+
+class ScoreMatrixBuilder:
+    """בניית מטריצת הציונים משתמש אחרי משתמש, בלי לשמור את הפרופילים"""
+
+    def __init__(self, word_index: Dict[str, int]):
+        """
+        Args:
+            word_index: מזהה מילה -> מספר העמודה שלה
+        """
+        self.word_index = word_index
+        self._cols = array('i')
+        self._scores = array('i')
+        self._counts = array('i')
+
+    def add(self, words_knowledge: Dict[str, int]) -> None:
+        """הוספת שורה - ציוני הידע של משתמש אחד"""
+        index = self.word_index
+        self._cols.extend([index.get(word_id, -1) for word_id in words_knowledge])
+        self._scores.extend(words_knowledge.values())
+        self._counts.append(len(words_knowledge))
+
+    def build(self) -> ScoreMatrix:
+        cols = np.frombuffer(self._cols, dtype=np.intc)
+        scores = np.frombuffer(self._scores, dtype=np.intc)
+        counts = np.frombuffer(self._counts, dtype=np.intc)
+        rows = np.repeat(np.arange(len(counts), dtype=np.intc), counts)
+        # ציונים של מילים שכבר לא נמצאות במאגר
+        known = cols >= 0
+        return ScoreMatrix(rows[known], cols[known], scores[known], (len(counts), len(self.word_index)))
+
+
+def success_rates(matrix: ScoreMatrix, prior_strength: float = 5.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    שיעור ההצלחה המוחלק של כל מילה
+
+    Args:
+        matrix: ציוני הידע
+        prior_strength: משקל השיעור הכללי, במספר "משתמשים מדומים" לכל מילה
+
+    Returns:
+        שיעור ההצלחה של כל מילה, ומספר המשתמשים שתרגלו אותה
+    """
+    words = matrix.shape[1]
+    attempts = np.bincount(matrix.cols[matrix.scores != 0], minlength=words)
+    known = np.bincount(matrix.cols[matrix.scores > 0], minlength=words)
+    total = attempts.sum()
+    prior = known.sum() / total if total else 0.5
+    return (known + prior_strength * prior) / (attempts + prior_strength), attempts
+
+
+def fit_levels(rates: np.ndarray, attempts: np.ndarray, levels: int = 3,
+               min_attempts: int = 5) -> Optional[np.ndarray]:
+    """
+    רמת קושי לכל מילה (1 - הקלה ביותר) לפי קוונטילים של שיעור ההצלחה
+
+    גבולות הרמות נקבעים רק לפי מילים שתרגלו לפחות min_attempts משתמשים; מילה
+    שכמעט לא תרגלו מקבלת את הרמה של השיעור הכללי (בדרך כלל האמצעית).
+
+    Returns:
+        מערך הרמות, או None אם אין מספיק מילים עם תוצאות
+    """
+    observed = rates[attempts >= min_attempts]
+    if observed.size < levels:
+        return None
+    edges = np.quantile(observed, np.linspace(0, 1, levels + 1)[1:-1])
+    return levels - np.searchsorted(edges, rates, side='right')
+
+
+async def load_score_matrix(backend, word_index: Dict[str, int], batch_size: int = 500) -> ScoreMatrix:
+    """
+    טעינת ציוני הידע של כל המשתמשים מאחסון הפרופילים (כל ProfileBackend)
+
+    גם משתמשים לא פעילים שהפרופיל שלהם בארכיון נכללים - התוצאות שלהם
+    על המילים תקפות גם אם הפסיקו לתרגל.
+    """
+    builder = ScoreMatrixBuilder(word_index)
+    async for profile in backend.scan_profiles(("words_knowledge",), batch_size):
+        if profile.get("words_knowledge"):
+            builder.add(profile["words_knowledge"])
+    return builder.build()
+
+
+def calibrate_words(words_data: List[Dict], matrix: ScoreMatrix, levels: int = 3,
+                    prior_strength: float = 5.0, min_attempts: int = 5) -> Optional[Counter]:
+    """
+    עדכון difficulty_level של המילים (במקום) לפי הציונים
+
+    Args:
+        words_data: רשומות המילים, לפי סדר העמודות במטריצה
+
+    Returns:
+        מספר המילים בכל רמה, או None אם אין מספיק תוצאות (המילים לא השתנו)
+    """
+    rates, attempts = success_rates(matrix, prior_strength)
+    fitted = fit_levels(rates, attempts, levels, min_attempts)
+    if fitted is None:
+        return None
+    for word, level in zip(words_data, fitted.tolist()):
+        word["difficulty_level"] = level
+    return Counter(fitted.tolist())
+
+
+def _open_backend(storage: str, source: str):
+    """אחסון הפרופילים לקריאה (pymongo נטען רק לאחסון MongoDB)"""
+    if storage == "sqlite":
+        from storage.sqlite_backend import SQLiteProfileBackend
+        return SQLiteProfileBackend(source)
+    if storage == "mongo":
+        from storage.mongo_backend import MongoProfileBackend
+        return MongoProfileBackend(source)
+    from storage.backends import FileProfileBackend
+    return FileProfileBackend(source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="כיול רמות הקושי של המילים לפי תוצאות המשתמשים")
+    parser.add_argument("source", help="תיקיית קבצי המשתמשים, קובץ המסד של SQLite או ה-URI של MongoDB")
+    parser.add_argument("words_file", help="קובץ המילים (JSON) לעדכון")
+    parser.add_argument("--storage", choices=("file", "sqlite", "mongo"), default="file",
+                        help="סוג אחסון הפרופילים (כמו USER_STORAGE של הבוט)")
+    parser.add_argument("--levels", type=int, default=3, help="מספר רמות הקושי")
+    parser.add_argument("--prior", type=float, default=5.0, help="משקל השיעור הכללי בהחלקה")
+    parser.add_argument("--min-attempts", type=int, default=5, help="מספר משתמשים מינימלי לקביעת גבולות הרמות")
+    args = parser.parse_args()
+
+    with open(args.words_file, 'r', encoding='utf-8') as f:
+        words_data = json.load(f)
+    word_index = {word["word_id"]: column for column, word in enumerate(words_data)}
+
+    async def load() -> ScoreMatrix:
+        backend = _open_backend(args.storage, args.source)
+        try:
+            return await load_score_matrix(backend, word_index)
+        finally:
+            await backend.close()
+
+    matrix = asyncio.run(load())
+    print(f"נטענו {matrix.scores.size} ציונים של {matrix.shape[0]} משתמשים")
+    counts = calibrate_words(words_data, matrix, args.levels, args.prior, args.min_attempts)
+    if counts is None:
+        print("אין מספיק תוצאות לכיול - קובץ המילים לא השתנה.")
+        return
+    write_file_atomic(args.words_file, json.dumps(words_data, ensure_ascii=False, indent=2).encode('utf-8'))
+    if os.path.exists(snapshot_path_for(args.words_file)):
+        build_snapshot(args.words_file)
+    print("מילים לפי רמה: " + ", ".join(f"{level}: {counts[level]}" for level in sorted(counts)))
+
+
+if __name__ == "__main__":
+    main()
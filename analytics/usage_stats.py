@@ -0,0 +1,373 @@
+"""
+סטטיסטיקות שימוש יומיות (במבנה של docs/spec.md) מתוך יומן אירועי הידע
+
+כל אירוע ביומן הוא תוצאת למידה אחת של משתמש במילה. האירועים נקראים בזרם,
+פעם אחת, ומצטברים לסיכום (rollup) של היום שלהם: המשתמשים הפעילים, הפעילויות
+לפי סוג, וניסיונות והצלחות לכל מילה. הסיכומים נשמרים יחד עם המיקום ביומן
+שעד אליו נקראו האירועים, כך שהרצה נוספת קוראת רק אירועים חדשים ומעדכנת רק
+את הימים שלהם. מהסיכום של כל יום נכתב מסמך הסטטיסטיקות שלו (YYYY-MM-DD.json)
+עם המילים הנפוצות והקשות ביותר (top-K). total_users הוא מספר המשתמשים
+שהופיעו ביומן עד אותו יום.
+
+כדי לדעת מי מהמשתמשים של היום חדש, נשמר קובץ בינארי ממוין של כל המשתמשים
+עם היום הראשון שבו הופיעו. הקובץ נקרא בזרם ולא נטען לזיכרון, כך שהזיכרון
+תלוי במספר המשתמשים הפעילים ביום ובמספר המילים - לא במספר האירועים ולא
+במספר המשתמשים הכולל.
+
+הרצה ידנית מתיקיית הפרויקט:
+    python -m analytics.usage_stats data/stats/journal data/stats
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import struct
+from collections import Counter
+from datetime import date, datetime, time as dtime, timedelta
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storage.file_io import write_file_atomic
+from storage.knowledge_journal import SEGMENT_PREFIX, SEGMENT_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "state.json"
+ROLLUP_DIR = "rollups"
+SEEN_USERS_NAME = "users.bin"
+# רשומה בקובץ המשתמשים: מזהה המשתמש ומספר היום (date.toordinal) שבו הופיע ראשון
+_SEEN_RECORD = struct.Struct("<qi")
+_SEEN_CHUNK = _SEEN_RECORD.size * 8192
+# שם הפעילות בסטטיסטיקות לפי המקור של האירוע ביומן
+ACTIVITY_NAMES = {"practice": "flashcards"}
+# אירועים רצופים של אותו משתמש מאותו מקור, בהפרש קטן מזה (במיקרו-שניות), הם פעילות אחת -
+# כל התוצאות של סבב תרגול נרשמות יחד
+ACTIVITY_GAP_US = 1_000_000
+# גודל הבלוק בקריאת קטע של היומן
+READ_BLOCK = 1 << 20
+
+
+def _day_bounds(ts: int) -> Tuple[str, int, int]:
+    """התאריך (שעון מקומי) של ts, ותחילת היום והיום הבא במיקרו-שניות"""
+    day = datetime.fromtimestamp(ts / 1_000_000).date()
+    start = datetime.combine(day, dtime.min).timestamp()
+    end = datetime.combine(day + timedelta(days=1), dtime.min).timestamp()
+    return day.isoformat(), int(start * 1_000_000), int(end * 1_000_000)
+
+
+def _complete_lines(f: BinaryIO) -> Iterator[Tuple[List[str], int]]:
+    """
+    השורות השלמות בקובץ, מהמיקום הנוכחי, בקבוצות של בלוק אחד כל פעם -
+    עם מספר הבתים שכל קבוצה תופסת
+
+    שורה אחרונה חלקית (כתיבה שנקטעה) לא מוחזרת; היא תיקרא בהרצה הבאה, אם תושלם.
+    """
+    tail = b""
+    while True:
+        block = f.read(READ_BLOCK)
+        if not block:
+            return
+        block = tail + block
+        complete = block.rfind(b"\n") + 1
+        tail = block[complete:]
+        if complete:
+            yield block[:complete - 1].decode('utf-8').split("\n"), complete
+
+
+def _empty_rollup(day: str) -> Dict:
+    return {"date": day, "journal_ts": 0, "users": set(), "activities": Counter(),
+            "attempts": Counter(), "successes": Counter()}
+
+
+class UsageStatsAggregator:
+    """צבירה מצטברת של יומן אירועי הידע לסטטיסטיקות שימוש יומיות"""
+
+    def __init__(self, journal_dir: str, stats_dir: str = "data/stats", top_k: int = 10,
+                 min_attempts: int = 5, prune: bool = False, interval: float = 3600.0):
+        """
+        Args:
+            journal_dir: תיקיית קטעי היומן (בדרך כלל תיקיית ההיסטוריה של היומן)
+            stats_dir: תיקיית מסמכי הסטטיסטיקות, הסיכומים היומיים ומצב הקריאה
+            top_k: מספר המילים ברשימות הנפוצות והקשות
+            min_attempts: מספר הניסיונות המינימלי ביום כדי שמילה תיחשב קשה
+            prune: מחיקת קטעים שנקראו במלואם (רק בתיקיית ההיסטוריה - לא ביומן הפעיל)
+            interval: כל כמה שניות לצבור ברקע
+        """
+        self.journal_dir = journal_dir
+        self.stats_dir = stats_dir
+        self.top_k = top_k
+        self.min_attempts = min_attempts
+        self.prune = prune
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        os.makedirs(os.path.join(stats_dir, ROLLUP_DIR), exist_ok=True)
+
+    def _segments(self) -> List[str]:
+        if not os.path.isdir(self.journal_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.journal_dir)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(os.path.join(self.stats_dir, STATE_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segment": "", "offset": 0, "total_users": 0, "last_event": [None, None, 0]}
+
+    def _save_state(self, state: Dict) -> None:
+        data = json.dumps(state, separators=(",", ":")).encode('utf-8')
+        write_file_atomic(os.path.join(self.stats_dir, STATE_NAME), data)
+
+    def _migrate_state(self, state: Dict) -> None:
+        """מצב מגרסה קודמת, עם רשימת כל המשתמשים - העברה לקובץ המשתמשים"""
+        users = state.pop("users", None)
+        if users is None:
+            return
+        # היום הראשון של המשתמשים האלה לא ידוע - הם נחשבים ותיקים בכל יום
+        temp_path = self._write_seen(_SEEN_RECORD.pack(user_id, 0) for user_id in sorted(users))
+        os.replace(temp_path, os.path.join(self.stats_dir, SEEN_USERS_NAME))
+        state["total_users"] = len(users)
+
+    def _read_seen(self) -> Iterator[Tuple[int, int]]:
+        try:
+            f = open(os.path.join(self.stats_dir, SEEN_USERS_NAME), 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            while True:
+                chunk = f.read(_SEEN_CHUNK)
+                if not chunk:
+                    break
+                yield from _SEEN_RECORD.iter_unpack(chunk)
+
+    def _write_seen(self, records: Iterable[bytes]) -> str:
+        """כתיבת רשומות ארוזות, בזרם, לעותק זמני של קובץ המשתמשים; מחזיר את הנתיב שלו"""
+        temp_path = os.path.join(self.stats_dir, SEEN_USERS_NAME + ".tmp")
+        with open(temp_path, 'wb') as f:
+            buffer = bytearray()
+            for record in records:
+                buffer += record
+                if len(buffer) >= _SEEN_CHUNK:
+                    f.write(buffer)
+                    buffer.clear()
+            f.write(buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        return temp_path
+
+    def _record_users(self, day: str, users: Iterable[int]) -> Tuple[int, int]:
+        """
+        מיזוג המשתמשים הפעילים ביום לקובץ המשתמשים
+
+        משתמש שמופיע ראשון ביום נשמר עם היום, כך שהרצה חוזרת על אותו יום
+        (אחרי קריסה, או כשנוספו לו אירועים) סופרת אותו שוב כחדש באותו יום.
+
+        Returns:
+            מספר המשתמשים שהופיעו עד היום (כולל), ומספר המשתמשים החדשים ביום
+        """
+        ordinal = date.fromisoformat(day).toordinal()
+        pending = sorted(users)
+        counts = [0, 0]
+        changed = False
+
+        def merged() -> Iterator[bytes]:
+            nonlocal changed
+            pack = _SEEN_RECORD.pack
+            i = 0
+            for user_id, first in self._read_seen():
+                while i < len(pending) and pending[i] < user_id:
+                    yield pack(pending[i], ordinal)
+                    counts[0] += 1
+                    counts[1] += 1
+                    changed = True
+                    i += 1
+                if i < len(pending) and pending[i] == user_id:
+                    i += 1
+                    if first > ordinal:
+                        first = ordinal
+                        changed = True
+                    if first == ordinal:
+                        counts[1] += 1
+                if first <= ordinal:
+                    counts[0] += 1
+                yield pack(user_id, first)
+            for user_id in pending[i:]:
+                yield pack(user_id, ordinal)
+                counts[0] += 1
+                counts[1] += 1
+                changed = True
+
+        temp_path = self._write_seen(merged())
+        if changed:
+            os.replace(temp_path, os.path.join(self.stats_dir, SEEN_USERS_NAME))
+        else:
+            os.remove(temp_path)
+        return counts[0], counts[1]
+
+    def _rollup_path(self, day: str) -> str:
+        return os.path.join(self.stats_dir, ROLLUP_DIR, f"{day}.json")
+
+    def _load_rollup(self, day: str) -> Dict:
+        try:
+            with open(self._rollup_path(day), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return _empty_rollup(day)
+        rollup = _empty_rollup(day)
+        rollup["journal_ts"] = saved["journal_ts"]
+        rollup["users"].update(saved["users"])
+        for field in ("activities", "attempts", "successes"):
+            rollup[field].update(saved[field])
+        return rollup
+
+    def stats_document(self, rollup: Dict, total_users: int) -> Dict:
+        """מסמך הסטטיסטיקות של יום (המבנה של docs/spec.md) מתוך הסיכום שלו"""
+        attempts, successes = rollup["attempts"], rollup["successes"]
+        popular = heapq.nlargest(self.top_k, attempts.items(), key=lambda item: item[1])
+        rated = (
+            (word_id, successes[word_id] / count, count)
+            for word_id, count in attempts.items() if count >= self.min_attempts
+        )
+        # בשיעור הצלחה שווה - קודם המילה שנוסתה יותר פעמים
+        difficult = heapq.nsmallest(self.top_k, rated, key=lambda item: (item[1], -item[2]))
+        return {
+            "date": rollup["date"],
+            "total_users": total_users,
+            "active_users": len(rollup["users"]),
+            "activities_completed": dict(rollup["activities"]),
+            "popular_words": [{"word_id": word_id, "attempts": count} for word_id, count in popular],
+            "difficult_words": [
+                {"word_id": word_id, "success_rate": round(rate, 2)} for word_id, rate, _ in difficult
+            ],
+        }
+
+    def _finish_day(self, rollup: Dict) -> int:
+        """
+        עדכון קובץ המשתמשים, ואחריו כתיבת מסמך הסטטיסטיקות והסיכום של היום
+
+        בקריסה באמצע הסיכום השמור עוד לא כולל את האירועים, והם נספרים
+        שוב (פעם אחת) בהרצה הבאה.
+
+        Returns:
+            מספר המשתמשים שהופיעו ביומן עד היום (כולל)
+        """
+        total_users, rollup["new_users"] = self._record_users(rollup["date"], rollup["users"])
+        document = self.stats_document(rollup, total_users)
+        write_file_atomic(
+            os.path.join(self.stats_dir, f"{rollup['date']}.json"),
+            json.dumps(document, ensure_ascii=False, indent=2).encode('utf-8'),
+        )
+        saved = dict(rollup, users=sorted(rollup["users"]))
+        write_file_atomic(self._rollup_path(rollup["date"]), json.dumps(saved, separators=(",", ":")).encode('utf-8'))
+        return total_users
+
+    def aggregate(self) -> List[str]:
+        """
+        קריאת האירועים החדשים ביומן ועדכון הימים שלהם
+
+        אירוע שכבר נכלל בסיכום של היום שלו (ts שלא גדול מ-journal_ts של הסיכום)
+        לא נספר שוב, גם אם מצב הקריאה לא נשמר לפני קריסה.
+
+        Returns:
+            התאריכים שמסמכי הסטטיסטיקות שלהם עודכנו
+        """
+        state = self._load_state()
+        self._migrate_state(state)
+        last_user, last_source, last_ts = state["last_event"]
+        updated: List[str] = []
+        rollup = None
+        day_start = day_end = included_ts = 0
+        for name in self._segments():
+            if name < state["segment"]:
+                continue
+            offset = state["offset"] if name == state["segment"] else 0
+            with open(os.path.join(self.journal_dir, name), 'rb') as f:
+                f.seek(offset)
+                for lines, size in _complete_lines(f):
+                    offset += size
+                    for line in lines:
+                        ts, user_id, word_id, delta, source = line.split("\t")
+                        ts = int(ts)
+                        if not day_start <= ts < day_end:
+                            if rollup is not None:
+                                state["total_users"] = self._finish_day(rollup)
+                            day, day_start, day_end = _day_bounds(ts)
+                            rollup = self._load_rollup(day)
+                            if day not in updated:
+                                updated.append(day)
+                            # הלולאה רצה על כל אירוע - השדות של הסיכום במשתנים מקומיים
+                            included_ts = rollup["journal_ts"]
+                            users, activities = rollup["users"], rollup["activities"]
+                            attempts, successes = rollup["attempts"], rollup["successes"]
+                        if ts <= included_ts:
+                            continue
+                        user_id = int(user_id)
+                        rollup["journal_ts"] = ts
+                        users.add(user_id)
+                        if user_id != last_user or source != last_source or ts - last_ts > ACTIVITY_GAP_US:
+                            activities[ACTIVITY_NAMES.get(source, source)] += 1
+                        last_user, last_source, last_ts = user_id, source, ts
+                        attempts[word_id] += 1
+                        if int(delta) > 0:
+                            successes[word_id] += 1
+                        self.events += 1
+            state["segment"], state["offset"] = name, offset
+        if rollup is not None:
+            state["total_users"] = self._finish_day(rollup)
+        state["last_event"] = [last_user, last_source, last_ts]
+        self._save_state(state)
+        if self.prune:
+            # הקטע האחרון שנקרא יכול עוד לגדול (אם זו תיקיית היומן הפעיל)
+            for name in self._segments():
+                if name < state["segment"]:
+                    os.remove(os.path.join(self.journal_dir, name))
+        return updated
+
+    def start(self) -> None:
+        """התחלת הצבירה התקופתית ברקע (הסבב הראשון מיד)"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                days = await loop.run_in_executor(None, self.aggregate)
+                if days:
+                    logger.info(f"Usage statistics updated for {', '.join(days)}")
+            except Exception as e:
+                logger.error(f"Aggregating usage statistics failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="צבירת יומן אירועי הידע לסטטיסטיקות שימוש יומיות")
+    parser.add_argument("journal_dir", help="תיקיית קטעי היומן")
+    parser.add_argument("stats_dir", help="תיקיית מסמכי הסטטיסטיקות")
+    parser.add_argument("--top", type=int, default=10, help="מספר המילים ברשימות הנפוצות והקשות")
+    parser.add_argument("--min-attempts", type=int, default=5, help="מספר ניסיונות מינימלי למילה קשה")
+    parser.add_argument("--prune", action="store_true", help="מחיקת קטעים שנקראו (רק לתיקיית ההיסטוריה)")
+    args = parser.parse_args()
+
+    aggregator = UsageStatsAggregator(args.journal_dir, args.stats_dir, args.top, args.min_attempts, args.prune)
+    days = aggregator.aggregate()
+    print(f"נקראו {aggregator.events} אירועים, עודכנו {len(days)} ימים: {', '.join(days)}")
+
+
+if __name__ == "__main__":
+    main()
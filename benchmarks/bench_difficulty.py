@@ -0,0 +1,72 @@
+"""
+מדידת ביצועים: כיול רמות הקושי של המילים (analytics/difficulty.py)
+
+    בנייה  - הכנסת ציוני הידע של 100,000 משתמשים למטריצה הדלילה
+    כיול   - שיעורי ההצלחה המוחלקים והתאמת הרמות
+    התאמה - אחוז המילים שקיבלו את הרמה של הקושי האמיתי שלהן בנתונים הסינתטיים
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_difficulty.py
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.difficulty import ScoreMatrixBuilder, calibrate_words
+
+WORDS_FILE = "data/words/words_complete_unique_ids.json"
+USERS = 100_000
+WORDS_PER_USER = 40
+LEVELS = 3
+
+
+def synthetic_knowledge(rng, word_ids, hardness):
+    """ציוני ידע של משתמשים עם יכולת אקראית; הסיכוי לדעת מילה יורד עם הקושי שלה"""
+    for _ in range(USERS):
+        ability = rng.gauss(0, 1)
+        knowledge = {}
+        for word_id in rng.sample(word_ids, WORDS_PER_USER):
+            known = rng.random() < 1 / (1 + math.exp(hardness[word_id] - ability))
+            knowledge[word_id] = rng.randint(1, 3) if known else -rng.randint(1, 3)
+        yield knowledge
+
+
+def main():
+    with open(WORDS_FILE, 'r', encoding='utf-8') as f:
+        words_data = json.load(f)
+    word_ids = [word["word_id"] for word in words_data]
+    rng = random.Random(7)
+    hardness = {word_id: rng.uniform(-2, 2) for word_id in word_ids}
+    profiles = list(synthetic_knowledge(rng, word_ids, hardness))
+    print(f"{USERS:,} משתמשים, {len(word_ids):,} מילים, {USERS * WORDS_PER_USER:,} ציונים")
+
+    start = time.perf_counter()
+    builder = ScoreMatrixBuilder({word_id: column for column, word_id in enumerate(word_ids)})
+    for knowledge in profiles:
+        builder.add(knowledge)
+    matrix = builder.build()
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = calibrate_words(words_data, matrix, LEVELS)
+    calibrated = time.perf_counter() - start
+
+    # הרמה ה"נכונה" - לפי השליש של הקושי האמיתי
+    ranked = sorted(word_ids, key=hardness.get)
+    expected = {word_id: 1 + position * LEVELS // len(ranked) for position, word_id in enumerate(ranked)}
+    agreement = sum(word["difficulty_level"] == expected[word["word_id"]] for word in words_data) / len(words_data)
+
+    print(f"בנייה:  {built:6.2f} שניות")
+    print(f"כיול:   {calibrated:6.2f} שניות")
+    print("רמות:   " + ", ".join(f"{level}: {counts[level]}" for level in sorted(counts)))
+    print(f"התאמה:  {agreement:6.1%} מהמילים ברמה של הקושי האמיתי שלהן")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+מדידת ביצועים: יומן אירועי הידע - קצב רישום עם כתיבה מקובצת, וקצב שחזור
+
+    רישום  - משתמשים רבים רושמים תוצאות במקביל (כל תוצאה ממתינה ל-fsync);
+             נמדדים אירועים לשנייה ומספר האירועים הממוצע בכל fsync
+    קריאה  - פענוח כל קטעי היומן (אירועים לשנייה)
+    שחזור  - recover_journal: החלת האירועים על הפרופילים, שמירתם ומחיקת היומן
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_journal_replay.py
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import UserRepository
+from storage.knowledge_journal import KnowledgeJournal
+
+USERS = 1_000
+EVENTS_PER_USER = 100
+WORDS = 5_000
+CONCURRENCY = 200  # משתמשים שרושמים תוצאות באותו זמן
+
+
+async def record(directory):
+    rng = random.Random(7)
+    word_ids = [f"word-{i:05d}" for i in range(WORDS)]
+    journal = KnowledgeJournal(os.path.join(directory, "journal"))
+    slots = asyncio.Semaphore(CONCURRENCY)
+
+    async def user_session(user_id):
+        async with slots:
+            for _ in range(EVENTS_PER_USER):
+                await journal.append(user_id, rng.choice(word_ids), rng.choice((1, -1)), "practice")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_session(user_id) for user_id in range(USERS)))
+    elapsed = time.perf_counter() - start
+    await journal.close()
+    return journal.appends / elapsed, journal.appends / journal.commits, journal.bytes
+
+
+async def replay(directory):
+    journal = KnowledgeJournal(os.path.join(directory, "journal"))
+    segments = await journal.rotate()
+    start = time.perf_counter()
+    events = await journal.read(segments)
+    read = time.perf_counter() - start
+
+    repo = UserRepository(os.path.join(directory, "users"), flush_interval=0, journal=journal, compact_interval=0)
+    start = time.perf_counter()
+    applied = await repo.recover_journal()
+    recover = time.perf_counter() - start
+    assert applied == len(events) == USERS * EVENTS_PER_USER
+    assert not os.listdir(journal.directory)
+    await repo.close()
+    return len(events) / read, applied / recover, recover
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="bench_journal_")
+    try:
+        events = USERS * EVENTS_PER_USER
+        print(f"{USERS} משתמשים, {events:,} אירועים, {CONCURRENCY} רושמים במקביל")
+        rate, per_commit, size = asyncio.run(record(directory))
+        print(f"רישום:  {rate:>12,.0f} אירועים לשנייה, {per_commit:.1f} אירועים ל-fsync, "
+              f"{size / events:.0f} בתים לאירוע")
+        read_rate, recover_rate, recover_seconds = asyncio.run(replay(directory))
+        print(f"קריאה:  {read_rate:>12,.0f} אירועים לשנייה")
+        print(f"שחזור:  {recover_rate:>12,.0f} אירועים לשנייה ({recover_seconds:.2f} שניות, כולל שמירת {USERS} פרופילים)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
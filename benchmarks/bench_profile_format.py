@@ -0,0 +1,73 @@
+"""
+מדידת ביצועים: גודל וזמני קידוד/פענוח של פרופיל משתמש בכל אחד מהפורמטים
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_profile_format.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.serializers import SERIALIZERS, WordIdTable, loads_profile
+
+WORDS_FILE = "data/words/words_complete_unique_ids.json"
+SIZES = (100, 1_000, 4_000)
+REPEATS = 200
+
+
+def make_profile(words, known):
+    """פרופיל טיפוסי עם known מילים ב-words_knowledge וסשן תרגול של 5 מילים"""
+    rng = random.Random(known)
+    session_words = rng.sample(words, 5)
+    return {
+        "user_id": 1469134687,
+        "join_date": "2025-03-15",
+        "daily_streak": 3,
+        "last_practice": "2025-03-20",
+        "total_practice_time": 0,
+        "session_data": {
+            "current_word_set": [word["word_id"] for word in session_words],
+            "current_word_index": 5,
+            "conversation_context": {},
+            "session_results": {
+                word["word_id"]: {"word": word["english"], "hebrew": word["hebrew"], "remembered": rng.random() < 0.7}
+                for word in session_words
+            },
+        },
+        "words_knowledge": {word["word_id"]: rng.randint(-3, 6) for word in rng.sample(words, known)},
+    }
+
+
+def measure(function, argument):
+    """זמן ממוצע לקריאה במיקרו-שניות"""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function(argument)
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+def main():
+    with open(WORDS_FILE, "r", encoding="utf-8") as f:
+        words = json.load(f)
+
+    with tempfile.TemporaryDirectory() as directory:
+        word_ids = WordIdTable(os.path.join(directory, "word_ids.txt"))
+        print(f"{'מילים':>6}  {'פורמט':<8}{'גודל (B)':>10}{'קידוד (us)':>12}{'פענוח (us)':>12}")
+        for known in SIZES:
+            profile = make_profile(words, known)
+            for name, serializer_class in SERIALIZERS.items():
+                serializer = serializer_class(word_ids)
+                data = serializer.dumps(profile)  # גם ממלא את טבלת המזהים לפני המדידה
+                encode_us = measure(serializer.dumps, profile)
+                decode_us = measure(lambda d: loads_profile(d, word_ids), data)
+                print(f"{known:>6}  {name:<8}{len(data):>10,}{encode_us:>12.0f}{decode_us:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
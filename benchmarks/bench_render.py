@@ -0,0 +1,134 @@
+"""
+מדידת ביצועים: בניית הודעות התרגול בכל לחיצה
+
+    כרטיס מילה  - בניית הטקסט והמקלדת של מילה בסבב תרגול: בשרשור מחרוזות
+                  בכל לחיצה, מול כרטיס מוכן מהמטמון (רק הכותרת נבנית)
+    מילה אקראית - אותו דבר לכרטיס "מילה אקראית"
+    תפריט ראשי  - בניית מקלדת התפריט בכל הצגה, מול המקלדת הקבועה
+
+דורש את python-telegram-bot (כמו הבוט עצמו).
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_render.py [קובץ מילים]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from models import WordsRepository
+from modules.practice.word_cards import WordCardCache
+from modules.user.user_module import MAIN_MENU_KEYBOARD
+
+TAPS = 20_000
+SESSION = 5
+
+
+def practice_card_by_concatenation(word, index, total):
+    """בניית כרטיס התרגול כפי שנבנה לפני המטמון"""
+    word_text = f"📝 מילה #{index + 1}/{total}: *{word.english}*\n"
+    word_text += f"🔤 תרגום לעברית: *{word.hebrew}*\n\n"
+    if word.examples:
+        word_text += "📚 דוגמאות:\n"
+        for i, example in enumerate(word.examples[:2], 1):
+            word_text += f"{i}. {example}\n"
+        word_text += "\n"
+    if word.part_of_speech:
+        word_text += f"({word.part_of_speech})\n"
+    if word.synonyms:
+        word_text += f"\n🔄 מילים נרדפות: {', '.join(word.synonyms)}"
+    keyboard = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{word.word_id}"),
+            InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{word.word_id}")
+        ],
+        [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
+    ])
+    return word_text, keyboard
+
+
+def random_card_by_concatenation(word):
+    """בניית כרטיס "מילה אקראית" כפי שנבנה לפני המטמון"""
+    word_text = f"📝 *מילה אקראית*: *{word.english}*\n"
+    if word.translation:
+        word_text += f"🔤 תרגום באנגלית: *{word.translation}*\n"
+    if word.hebrew:
+        word_text += f"🔤 תרגום לעברית: *{word.hebrew}*\n"
+    if word.part_of_speech:
+        word_text += f"📋 חלק דיבור: *{word.part_of_speech}*\n"
+    if word.examples:
+        word_text += "\n📚 דוגמאות:\n"
+        for i, example in enumerate(word.examples[:2], 1):
+            word_text += f"{i}. {example}\n"
+    if word.synonyms:
+        word_text += f"\n🔄 מילים נרדפות: {', '.join(word.synonyms)}"
+    keyboard = InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{word.word_id}"),
+            InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{word.word_id}")
+        ],
+        [
+            InlineKeyboardButton("🔄 מילה אקראית נוספת", callback_data="practice_random"),
+            InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
+        ]
+    ])
+    return word_text, keyboard
+
+
+def main_menu_by_construction():
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton("🎯 תרגול מילים", callback_data="practice"),
+            InlineKeyboardButton("🎮 משחקים", callback_data="games")
+        ],
+        [
+            InlineKeyboardButton("📖 סיפורים", callback_data="stories"),
+            InlineKeyboardButton("✍️ כתיבה", callback_data="writing")
+        ],
+        [
+            InlineKeyboardButton("⚙️ הגדרות", callback_data="settings")
+        ]
+    ])
+
+
+def per_tap(render, taps):
+    start = time.perf_counter()
+    for tap in taps:
+        render(tap)
+    return (time.perf_counter() - start) / len(taps) * 1e6
+
+
+def main():
+    words_file = sys.argv[1] if len(sys.argv) > 1 else "data/words/words_complete_unique_ids.json"
+    words_repo = WordsRepository(words_file)
+    rng = random.Random(5)
+    # רוב הלחיצות הן על מילים שכבר הוצגו (סבבים חוזרים של אותם משתמשים)
+    words = [words_repo.get_word(word_id) for word_id in rng.sample(words_repo.get_word_ids(), 500)]
+    taps = [(rng.choice(words), i % SESSION) for i in range(TAPS)]
+    cards = WordCardCache(words_repo)
+    print(f"{len(words_repo.words):,} מילים, {TAPS:,} לחיצות על {len(words)} מילים שונות")
+
+    rows = [
+        ("כרטיס מילה",
+         per_tap(lambda tap: practice_card_by_concatenation(tap[0], tap[1], SESSION), taps),
+         per_tap(lambda tap: (cards.practice_text(tap[0], tap[1], SESSION), cards.card(tap[0]).practice_keyboard), taps)),
+        ("מילה אקראית",
+         per_tap(lambda tap: random_card_by_concatenation(tap[0]), taps),
+         per_tap(lambda tap: cards.card(tap[0]).random_text, taps)),
+        ("תפריט ראשי",
+         per_tap(lambda tap: main_menu_by_construction(), taps),
+         per_tap(lambda tap: MAIN_MENU_KEYBOARD, taps)),
+    ]
+    print(f"{'הודעה':<14}{'בנייה (µs)':>14}{'מטמון (µs)':>14}{'האצה':>8}")
+    for name, built, cached in rows:
+        print(f"{name:<14}{built:>14.2f}{cached:>14.2f}{built / cached:>7.0f}x")
+    print(f"כרטיסים במטמון: {len(cards)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+מדידת ביצועים: שליפת מילים ומשתמשים לחזרה (storage/review_index.py) מול סריקה
+
+    מילים    - 5 המילים הבאות לחזרה של משתמש עם 10,000 מילים בתזמון:
+               ReviewQueue מול סריקה של כל word_progress
+    משתמשים - המשתמשים שמועד החזרה שלהם בשעה הקרובה, מתוך 100,000:
+               DueReviewIndex מול סריקה של המועד הקרוב של כל משתמש
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_review_queue.py
+"""
+
+import heapq
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.review_index import DueReviewIndex, ReviewQueue
+
+WORDS = 10_000
+USERS = 100_000
+SESSION_WORDS = 5
+REPEATS = 2_000
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def random_moment(rng, now, days):
+    return (now + timedelta(seconds=rng.uniform(-days, days) * 86_400)).strftime(TIME_FORMAT)
+
+
+def timed(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    rng = random.Random(7)
+    now = datetime(2026, 1, 1, 12)
+    until = now.strftime(TIME_FORMAT)
+
+    progress_map = {f"word-{i:05d}": {"next_review": random_moment(rng, now, 60)} for i in range(WORDS)}
+    queue = ReviewQueue(progress_map)
+
+    def scan_words():
+        due = ((entry["next_review"], word_id) for word_id, entry in progress_map.items()
+               if entry["next_review"] <= until)
+        return [word_id for _, word_id in heapq.nsmallest(SESSION_WORDS, due)]
+
+    heap_seconds, heap_words = timed(lambda: queue.due(progress_map, until, SESSION_WORDS), REPEATS)
+    scan_seconds, scan_words_result = timed(scan_words, REPEATS // 20)
+    assert heap_words == scan_words_result
+    print(f"מילים ({WORDS:,} בתזמון):   ערימה {heap_seconds * 1e6:8.1f} µs   סריקה {scan_seconds * 1e6:10.1f} µs")
+
+    earliest = {user_id: random_moment(rng, now, 30) for user_id in range(USERS)}
+    index = DueReviewIndex()
+    for user_id, moment in earliest.items():
+        index.update(user_id, moment)
+    # המשתמשים שהמועד שלהם בשעה הקרובה (מי שהמועד שלו כבר עבר קיבל תזכורת קודם)
+    hour_later = (now + timedelta(hours=1)).strftime(TIME_FORMAT)
+
+    def scan_users():
+        return sorted(user_id for user_id, moment in earliest.items() if until < moment <= hour_later)
+
+    index_seconds, index_users = timed(lambda: index.due_users(hour_later, since=until), 20)
+    scan_seconds, scanned_users = timed(scan_users, 20)
+    assert index_users == scanned_users
+    print(f"משתמשים ({USERS:,}):        אינדקס {index_seconds * 1e3:6.2f} ms   סריקה {scan_seconds * 1e3:8.2f} ms"
+          f"   ({len(index_users)} משתמשים)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+מדידת ביצועים: צבירת יומן אירועי הידע לסטטיסטיקות שימוש יומיות
+
+    צבירה מלאה    - כל הקטעים של יומן עם 100,000 משתמשים (אירועים לשנייה)
+    צבירה מצטברת - הרצה נוספת אחרי שנוסף קטע אחד: נקראים רק האירועים החדשים
+    בלי שינוי     - הרצה נוספת כשאין אירועים חדשים
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_usage_stats.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.usage_stats import UsageStatsAggregator
+from storage.knowledge_journal import KnowledgeEvent, format_event
+
+USERS = 100_000
+SESSIONS_PER_USER = 2
+WORDS_PER_SESSION = 10
+WORDS = 5_000
+DAYS = 3
+SEGMENT_EVENTS = 50_000
+
+
+def write_journal(directory, rng, start_ts, sessions, span_seconds):
+    """כתיבת סבבי תרגול סינתטיים, מפוזרים על span_seconds, כקטעי יומן; מחזיר את ה-ts האחרון"""
+    word_ids = [f"word-{i:05d}" for i in range(WORDS)]
+    # מילים "קשות" - הצלחה בכ-30% מהניסיונות
+    hard = set(rng.sample(word_ids, 50))
+    ts = start_ts
+    step = span_seconds * 1_000_000 // len(sessions)
+    lines = []
+    for user_id, source in sessions:
+        ts += step
+        for i, word_id in enumerate(rng.sample(word_ids, WORDS_PER_SESSION)):
+            success = rng.random() < (0.3 if word_id in hard else 0.8)
+            lines.append(format_event(KnowledgeEvent(ts + i, user_id, word_id, 1 if success else -1, source)))
+        if len(lines) >= SEGMENT_EVENTS:
+            flush_segment(directory, lines)
+            lines = []
+    if lines:
+        flush_segment(directory, lines)
+    return ts + WORDS_PER_SESSION
+
+
+def flush_segment(directory, lines):
+    name = f"knowledge-{time.time_ns():020d}.log"
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+
+def timed(aggregator):
+    before = aggregator.events
+    start = time.perf_counter()
+    days = aggregator.aggregate()
+    return time.perf_counter() - start, aggregator.events - before, days
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="bench_usage_stats_")
+    try:
+        journal_dir = os.path.join(directory, "journal")
+        os.makedirs(journal_dir)
+        rng = random.Random(7)
+        sessions = [(user_id, rng.choice(("practice", "practice", "memory_game")))
+                    for user_id in range(USERS) for _ in range(SESSIONS_PER_USER)]
+        rng.shuffle(sessions)
+        start_ts = (int(time.time()) - DAYS * 86_400) * 1_000_000
+        last_ts = write_journal(journal_dir, rng, start_ts, sessions, DAYS * 86_400)
+        events = len(sessions) * WORDS_PER_SESSION
+        print(f"{USERS:,} משתמשים, {events:,} אירועים ב-{DAYS} ימים")
+
+        aggregator = UsageStatsAggregator(journal_dir, os.path.join(directory, "stats"))
+        seconds, read, days = timed(aggregator)
+        print(f"צבירה מלאה:    {seconds:6.2f} שניות, {read / seconds:>10,.0f} אירועים לשנייה, {len(days)} ימים")
+
+        write_journal(journal_dir, rng, last_ts, sessions[:1_000], 60)
+        seconds, read, days = timed(aggregator)
+        print(f"צבירה מצטברת: {seconds:6.2f} שניות, {read:,} אירועים חדשים, ימים: {', '.join(days)}")
+
+        seconds, read, days = timed(aggregator)
+        print(f"בלי שינוי:     {seconds:6.2f} שניות, {read:,} אירועים חדשים")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
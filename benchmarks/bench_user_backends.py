@@ -0,0 +1,101 @@
+"""
+מדידת ביצועים: קצב שמירה וטעינה של פרופילים בכל אחד מסוגי האחסון
+
+לכל משתמש נשמר פרופיל מלא פעם אחת, ואז מדומים סופי סשנים - בכל סשן משתנים
+הציונים של 5 מילים והפרופיל נשמר שוב (באצוות, כמו בכתיבה המושהית).
+
+MongoDB נמדד רק אם MONGO_URI מוגדר (למשל מול mongod מקומי):
+    MONGO_URI=mongodb://localhost:27017/bench_users python benchmarks/bench_user_backends.py
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.backends import FileProfileBackend
+from storage.sqlite_backend import SQLiteProfileBackend
+
+USERS = 500
+KNOWN_WORDS = 1_000
+SESSIONS = 5
+BATCH_SIZE = 100  # כמו USER_FLUSH_MAX_DIRTY
+
+
+def make_profile(user_id, rng):
+    return {
+        "user_id": user_id,
+        "join_date": "2024-01-01",
+        "daily_streak": 0,
+        "words_knowledge": {f"word-{i:05d}": rng.randint(-3, 3) for i in range(KNOWN_WORDS)},
+        "session_data": {"current_word_set": [], "current_word_index": 0, "conversation_context": {}},
+    }
+
+
+async def store_in_batches(backend, profiles):
+    for start in range(0, len(profiles), BATCH_SIZE):
+        await backend.store_many(profiles[start:start + BATCH_SIZE])
+
+
+async def run(backend):
+    rng = random.Random(7)
+    profiles = [make_profile(user_id, rng) for user_id in range(USERS)]
+
+    start = time.perf_counter()
+    await store_in_batches(backend, profiles)
+    initial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(SESSIONS):
+        for profile in profiles:
+            knowledge = profile["words_knowledge"]
+            for word_id in rng.sample(list(knowledge), 5):
+                knowledge[word_id] += 1
+            profile["daily_streak"] += 1
+        await store_in_batches(backend, profiles)
+    sessions = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = await asyncio.gather(*(backend.load(user_id) for user_id in range(USERS)))
+    load = time.perf_counter() - start
+    assert all(profile is not None for profile in loaded)
+
+    await backend.close()
+    return USERS / initial, USERS * SESSIONS / sessions, USERS / load
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="bench_backends_")
+    backends = {
+        "file": lambda: FileProfileBackend(os.path.join(directory, "users")),
+        "sqlite": lambda: SQLiteProfileBackend(os.path.join(directory, "users.sqlite3")),
+    }
+    mongo_uri = os.getenv("MONGO_URI")
+    if mongo_uri:
+        from storage.mongo_backend import MongoProfileBackend
+
+        def make_mongo():
+            backend = MongoProfileBackend(mongo_uri, collection="bench_users")
+            backend.collection.drop()
+            return backend
+        backends["mongo"] = make_mongo
+
+    try:
+        print(f"{USERS} משתמשים, {KNOWN_WORDS} מילים בפרופיל, {SESSIONS} סשנים (פרופילים לשנייה)")
+        print(f"{'אחסון':<8}{'שמירה ראשונה':>14}{'סוף סשן':>10}{'טעינה':>10}")
+        for name, make_backend in backends.items():
+            initial, sessions, load = asyncio.run(run(make_backend()))
+            print(f"{name:<8}{initial:>14,.0f}{sessions:>10,.0f}{load:>10,.0f}")
+        if not mongo_uri:
+            print("(MONGO_URI לא מוגדר - MongoDB לא נמדד)")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
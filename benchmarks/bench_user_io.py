@@ -0,0 +1,163 @@
+"""
+מדידת ביצועים: זמן תגובה של handlers תחת עומס של משתמשים במקביל
+
+כל משתמש מדומה מבצע כמה "לחיצות" תרגול (קריאת פרופיל, עדכון ושמירה, פעמיים),
+עם הפסקה אקראית בין לחיצה ללחיצה. נמדד הזמן מהרגע שהלחיצה אמורה הייתה
+להתחיל ועד שהסתיימה - כולל המתנה ללולאת אירועים שנחסמה על ידי לחיצות אחרות.
+
+גרסאות:
+    legacy         - המימוש הקודם: open/json.dump חוסמים על לולאת האירועים
+    threaded       - UserRepository בלי מטמון ועם כתיבה בכל שמירה (רק מאגר התהליכונים)
+    default        - UserRepository בהגדרות ברירת המחדל (מטמון וכתיבה מושהית)
+
+כל גרסה נמדדת על דיסק רגיל ועל דיסק "איטי" שבו חלק מהכתיבות נתקעות.
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_user_io.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import UserRepository
+from storage import file_io
+
+USERS = 500
+TAPS_PER_USER = 5
+THINK_TIME = 2.0  # הזמן המקסימלי (בשניות) בין שתי לחיצות של אותו משתמש
+KNOWN_WORDS = 800  # גודל words_knowledge בפרופיל טיפוסי
+SLOW_WRITE_CHANCE = 0.02
+SLOW_WRITE_SECONDS = 0.1
+
+
+class LegacyUserRepository:
+    """העתק של המימוש הקודם של UserRepository.get_user/save_user"""
+
+    def __init__(self, data_dir, slow=False):
+        self.data_dir = data_dir
+        self.slow = slow
+        self.writes = 0
+
+    def _get_user_file_path(self, user_id):
+        return os.path.join(self.data_dir, f"user_{user_id}.json")
+
+    async def get_user(self, user_id):
+        file_path = self._get_user_file_path(user_id)
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    async def save_user(self, user_profile):
+        if self.slow:
+            stall_disk()
+        with open(self._get_user_file_path(user_profile["user_id"]), 'w', encoding='utf-8') as f:
+            json.dump(user_profile, f, ensure_ascii=False, indent=2)
+        self.writes += 1
+        return True
+
+    async def close(self):
+        pass
+
+    def stats(self):
+        return {"writes": self.writes}
+
+
+def stall_disk():
+    """הדמיית דיסק איטי - חלק קטן מהכתיבות נתקעות"""
+    if random.random() < SLOW_WRITE_CHANCE:
+        time.sleep(SLOW_WRITE_SECONDS)
+
+
+def slow_write_file_atomic(path, data, replaces=(), fsync=True):
+    stall_disk()
+    _write_file_atomic(path, data, replaces, fsync)
+
+
+_write_file_atomic = file_io.write_file_atomic
+
+
+def create_profiles(data_dir):
+    """יצירת קבצי פרופיל לכל המשתמשים המדומים"""
+    for user_id in range(USERS):
+        profile = {
+            "user_id": user_id,
+            "join_date": "2024-01-01",
+            "words_knowledge": {f"word_{i}": random.randint(-3, 3) for i in range(KNOWN_WORDS)},
+            "daily_streak": 0,
+            "session_data": {"current_word_set": [], "current_word_index": 0, "conversation_context": {}},
+        }
+        with open(os.path.join(data_dir, f"user_{user_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+
+
+async def practice_tap(repo, user_id):
+    """לחיצה אחת בתרגול: שני סבבים של קריאה, עדכון ושמירה"""
+    profile = await repo.get_user(user_id)
+    profile["words_knowledge"]["word_0"] = profile["words_knowledge"].get("word_0", 0) + 1
+    await repo.save_user(profile)
+    profile = await repo.get_user(user_id)
+    profile["session_data"]["current_word_index"] += 1
+    await repo.save_user(profile)
+
+
+async def simulate_user(repo, user_id, latencies):
+    for _ in range(TAPS_PER_USER):
+        # הזמן נמדד מהרגע שהלחיצה "הגיעה", כך שהמתנה ללולאה תקועה נכללת בו
+        delay = random.uniform(0, THINK_TIME)
+        arrival = time.perf_counter() + delay
+        await asyncio.sleep(delay)
+        await practice_tap(repo, user_id)
+        latencies.append(time.perf_counter() - arrival)
+
+
+async def run(make_repo):
+    repo = make_repo()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(simulate_user(repo, user_id, latencies) for user_id in range(USERS)))
+    total = time.perf_counter() - start
+    await repo.close()
+    return sorted(latencies), total, repo.stats()["writes"]
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    random.seed(42)
+    data_dir = tempfile.mkdtemp(prefix="bench_users_")
+    try:
+        create_profiles(data_dir)
+        variants = {
+            "legacy": lambda slow: LegacyUserRepository(data_dir, slow),
+            "threaded": lambda slow: UserRepository(data_dir, flush_interval=0, max_dirty=1, cache_size=0),
+            "default": lambda slow: UserRepository(data_dir),
+        }
+
+        print(f"{USERS} משתמשים x {TAPS_PER_USER} לחיצות, {KNOWN_WORDS} מילים בפרופיל")
+        print(f"{'גרסה':<10}{'דיסק':<8}{'p50 (ms)':>10}{'p99 (ms)':>10}{'max (ms)':>10}{'total (s)':>10}{'writes':>8}")
+        for slow in (False, True):
+            file_io.write_file_atomic = slow_write_file_atomic if slow else _write_file_atomic
+            for name, make_repo in variants.items():
+                latencies, total, writes = asyncio.run(run(lambda: make_repo(slow)))
+                print(f"{name:<10}{'איטי' if slow else 'רגיל':<8}"
+                      f"{percentile(latencies, 0.5) * 1000:>10.1f}"
+                      f"{percentile(latencies, 0.99) * 1000:>10.1f}"
+                      f"{latencies[-1] * 1000:>10.1f}{total:>10.2f}{writes:>8}")
+    finally:
+        file_io.write_file_atomic = _write_file_atomic
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
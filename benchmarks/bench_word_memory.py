@@ -0,0 +1,124 @@
+"""
+מדידת זיכרון (RSS) של מאגר המילים: מחלקת Word הקודמת מול Word עם __slots__
+
+כל מדידה רצה בתהליך נפרד כדי שה-RSS לא יושפע ממדידות קודמות.
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_word_memory.py
+"""
+
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS_FILE = "data/words/words_complete_unique_ids.json"
+SIZES = (None, 200_000)  # None - קובץ המילים האמיתי
+
+
+class LegacyWord:
+    """העתק של מחלקת Word הקודמת (עם __dict__ ורשימות נפרדות)"""
+
+    def __init__(self, word_id, english, hebrew="", part_of_speech="", difficulty_level=1,
+                 examples=None, synonyms=None, topic_tags=None, translation=None):
+        self.word_id = word_id
+        self.english = english
+        self.hebrew = hebrew
+        self.translation = translation
+        self.part_of_speech = part_of_speech
+        self.difficulty_level = difficulty_level
+        self.examples = examples or []
+        self.synonyms = synonyms or []
+        self.topic_tags = topic_tags or ["general"]
+
+
+def current_rss_kb():
+    """ה-RSS הנוכחי של התהליך בקילובייטים"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def write_synthetic_file(size, path):
+    """כתיבת קובץ מילים בגודל המבוקש - המאגר האמיתי משוכפל עם מזהים וטקסט ייחודיים"""
+    with open(WORDS_FILE, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    rng = random.Random(42)
+    records = []
+    for i in range(size):
+        record = dict(base[i % len(base)])
+        record["word_id"] = f"{record['word_id'][:-8]}{i:08d}"
+        record["english"] = f"{record['english']}{rng.randint(0, 999)}"
+        record["examples"] = [f"{example} ({i})" for example in record["examples"]]
+        records.append(record)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+
+
+def measure(variant, path, mode):
+    """
+    טעינת קובץ מילים למילון word_id -> Word (ושחרור ה-JSON הגולמי) ומדידת:
+    rss - תוספת ה-RSS של התהליך, כולל זיכרון שנשאר שמור אחרי פענוח ה-JSON
+    heap - הזיכרון שהאובייקטים החיים תופסים בפועל (לפי tracemalloc)
+    """
+    from models import Word
+
+    word_class = LegacyWord if variant == "legacy" else Word
+    gc.collect()
+    if mode == "heap":
+        tracemalloc.start()
+    before = current_rss_kb()
+
+    if variant == "legacy":
+        # הטעינה הקודמת: פענוח כל הקובץ למילונים ורק אז יצירת המילים
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        words = {}
+        for data in records:
+            words[data["word_id"]] = word_class(
+                data["word_id"], data["english"], data.get("hebrew", ""),
+                data.get("part_of_speech", ""), data.get("difficulty_level", 1),
+                data.get("examples", []), data.get("synonyms", []),
+                data.get("topic_tags", []), data.get("translation")
+            )
+        del records, data
+    else:
+        # הטעינה של WordsRepository: כל רשומה הופכת ל-Word כבר בזמן הפענוח
+        with open(path, "r", encoding="utf-8") as f:
+            words = {word.word_id: word for word in json.load(f, object_hook=Word.from_dict)}
+    gc.collect()
+    if mode == "heap":
+        return tracemalloc.get_traced_memory()[0] // 1024
+    return current_rss_kb() - before
+
+
+def main():
+    if len(sys.argv) == 4:
+        print(measure(*sys.argv[1:]))
+        return
+
+    print(f"{'מילים':>12}{'מדד':>6}{'Word קודם (MB)':>18}{'Word חדש (MB)':>18}")
+    for size in SIZES:
+        path = WORDS_FILE
+        if size is not None:
+            path = os.path.join(tempfile.gettempdir(), f"bench_words_{size}.json")
+            write_synthetic_file(size, path)
+        label = f"{size:,}" if size is not None else "קובץ אמיתי"
+        for mode in ("rss", "heap"):
+            results = []
+            for variant in ("legacy", "slots"):
+                output = subprocess.run([sys.executable, __file__, variant, path, mode],
+                                        capture_output=True, text=True, check=True).stdout
+                results.append(int(output.strip().splitlines()[-1]) / 1024)
+            print(f"{label:>12}{mode:>6}{results[0]:>18.1f}{results[1]:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
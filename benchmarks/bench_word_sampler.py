@@ -0,0 +1,87 @@
+"""
+מדידת ביצועים: דגימה משוקללת של מילים לסבב תרגול
+
+    דוגם במטמון   - דגימת 5 מילים מעץ פנוויק שכבר נבנה, ועדכון המשקלים של
+                    5 מילים אחרי הסבב (O(log n) לכל מילה)
+    בנייה מחדש    - חישוב המשקלים של כל המילים בכל סבב ודגימה ב-random.choices
+    בניית הדוגם   - בניית העץ בפעם הראשונה שמשתמש מתרגל (החטאה במטמון)
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_word_sampler.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.practice.word_sampler import WordSampler, practice_weight
+
+WORDS = 20_000
+KNOWN = 3_000
+SESSION = 5
+ROUNDS = 2_000
+
+
+def make_profile(rng, word_ids):
+    return {
+        "user_id": 1,
+        "words_knowledge": {word_id: rng.randint(-2, 6) for word_id in rng.sample(word_ids, KNOWN)},
+        "word_progress": {},
+    }
+
+
+def rebuild_sample(word_ids, profile, now, rng):
+    """הדרך הנאיבית: משקלים לכל המילים בכל סבב"""
+    knowledge, progress_map = profile["words_knowledge"], profile["word_progress"]
+    weights = [practice_weight(knowledge.get(word_id), progress_map.get(word_id), now) for word_id in word_ids]
+    chosen = []
+    while len(chosen) < SESSION:
+        word_id = rng.choices(word_ids, weights)[0]
+        if word_id not in chosen:
+            chosen.append(word_id)
+    return chosen
+
+
+def answer(profile, chosen, rng):
+    for word_id in chosen:
+        knowledge = profile["words_knowledge"]
+        knowledge[word_id] = knowledge.get(word_id, 0) + (1 if rng.random() < 0.7 else -1)
+
+
+def main():
+    rng = random.Random(3)
+    word_ids = [f"word-{i:05d}" for i in range(WORDS)]
+    profile = make_profile(rng, word_ids)
+    now = "2026-01-01T12:00:00"
+    print(f"{WORDS:,} מילים, {KNOWN:,} מילים עם ציון, סבבים של {SESSION} מילים")
+
+    start = time.perf_counter()
+    sampler = WordSampler(word_ids, profile, practice_weight, now)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        chosen = sampler.sample(SESSION, rng=rng)
+        answer(profile, chosen, rng)
+        for word_id in chosen:
+            sampler.update(word_id, profile, now)
+    cached = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS // 20):
+        chosen = rebuild_sample(word_ids, profile, now, rng)
+        answer(profile, chosen, rng)
+    rebuilt = (time.perf_counter() - start) / (ROUNDS // 20)
+
+    print(f"{'שיטה':<16}{'זמן לסבב (ms)':>16}")
+    print(f"{'דוגם במטמון':<16}{cached * 1000:>16.3f}")
+    print(f"{'בנייה מחדש':<16}{rebuilt * 1000:>16.3f}")
+    print(f"{'בניית הדוגם':<16}{build * 1000:>16.3f}")
+    print(f"האצה: פי {rebuilt / cached:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+מדידת ביצועים: מנוע החיפוש (WordSearchIndex) מול הסריקה הישנה של search_words
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_word_search.py
+"""
+
+import json
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Word
+from utils.word_search import WordSearchIndex
+
+WORDS_FILE = "data/words/words_complete_unique_ids.json"
+QUERIES = ["a", "ab", "wor", "cream", "particul", "recieve", "גליד", "tenth", "xyzzy"]
+REPEATS = 200
+
+
+def legacy_search(words, query, limit=10):
+    """העתק של המימוש הקודם של WordsRepository.search_words (סריקה מלאה)"""
+    query = query.lower()
+    results = []
+    for word in words.values():
+        if query in word.english.lower():
+            results.append(word)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def load_words(size):
+    """טעינת מאגר המילים והרחבתו באופן סינתטי לגודל המבוקש"""
+    with open(WORDS_FILE, "r", encoding="utf-8") as f:
+        base = [Word.from_dict(data) for data in json.load(f)]
+
+    rng = random.Random(42)
+    words = {word.word_id: word for word in base[:size]}
+    while len(words) < size:
+        source = rng.choice(base)
+        suffix = "".join(rng.choices(string.ascii_lowercase, k=3))
+        word = Word(f"{source.word_id}-{len(words)}", source.english + suffix,
+                    source.hebrew, translation=source.translation)
+        words[word.word_id] = word
+    return words
+
+
+def measure(function, queries):
+    """זמן ממוצע לשאילתה במיקרו-שניות"""
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for query in queries:
+            function(query)
+    return (time.perf_counter() - start) / (REPEATS * len(queries)) * 1e6
+
+
+def main():
+    for size in (4_000, 100_000):
+        words = load_words(size)
+
+        start = time.perf_counter()
+        index = WordSearchIndex.build(words.values())
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n=== {size:,} מילים (בניית אינדקס: {build_ms:.0f}ms) ===")
+        print(f"{'שאילתה':<12}{'סריקה (us)':>14}{'אינדקס (us)':>14}")
+        for query in QUERIES:
+            legacy = measure(lambda q: legacy_search(words, q), [query])
+            indexed = measure(lambda q: index.search(q), [query])
+            print(f"{query:<12}{legacy:>14.1f}{indexed:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
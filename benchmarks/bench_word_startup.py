@@ -0,0 +1,69 @@
+"""
+מדידת זמן עלייה וזיכרון (RSS) של WordsRepository: טעינה מ-JSON מול תמונת מצב ממופה
+
+כל מדידה רצה בתהליך נפרד. הרצה מתיקיית הפרויקט:
+    python benchmarks/bench_word_startup.py
+"""
+
+import gc
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS_FILE = "data/words/words_complete_unique_ids.json"
+
+
+def current_rss_kb():
+    """ה-RSS הנוכחי של התהליך בקילובייטים"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(words_file):
+    """טעינת המאגר ומדידת זמן הטעינה ותוספת ה-RSS"""
+    from models import WordsRepository
+
+    gc.collect()
+    before = current_rss_kb()
+    start = time.perf_counter()
+    repo = WordsRepository(words_file)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    gc.collect()
+    source = "snapshot" if repo.is_snapshot_backed else "json"
+    return f"{source} {elapsed_ms:.1f} {(current_rss_kb() - before) / 1024:.1f}"
+
+
+def main():
+    if len(sys.argv) == 2:
+        print(measure(sys.argv[1]))
+        return
+
+    from utils.word_snapshot import build_snapshot
+
+    # עבודה על עותק זמני, כדי לא לגעת בתמונת המצב של הפרויקט
+    work_dir = tempfile.mkdtemp()
+    words_file = os.path.join(work_dir, "words.json")
+    shutil.copy(WORDS_FILE, words_file)
+    try:
+        print(f"{'מקור':>10}{'זמן (ms)':>12}{'RSS (MB)':>12}")
+        for build in (False, True):
+            if build:
+                build_snapshot(words_file)
+            output = subprocess.run([sys.executable, __file__, words_file],
+                                    capture_output=True, text=True, check=True).stdout
+            source, elapsed, rss = output.strip().splitlines()[-1].split()
+            print(f"{source:>10}{elapsed:>12}{rss:>12}")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
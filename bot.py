@@ -2,10 +2,12 @@
 בוט טלגרם ללימוד אנגלית
 """
 
+import asyncio
 import logging
 import os
 import json
 import sys
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union, Callable
 from enum import Enum, auto
@@ -40,29 +42,85 @@ root_logger.addHandler(console_handler)
 # Create a custom logger for our bot
 logger = logging.getLogger("EnglishBot")
 
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import (
+    Update, InlineKeyboardMarkup, InlineKeyboardButton,
+    InlineQueryResultArticle, InputTextMessageContent
+)
 from telegram.ext import (
-    Application, CommandHandler, CallbackQueryHandler,
+    Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler,
     MessageHandler, ContextTypes, filters, ConversationHandler
 )
 
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+from analytics.usage_stats import UsageStatsAggregator
 from models import WordsRepository, UserRepository
 from modules.practice.practice_module import PracticeModule, States as PracticeStates
+from modules.practice.spaced_repetition import SpacedRepetition
+from modules.practice.word_sampler import WordSamplers
 from modules.user.user_module import UserModule, UserStates
 from modules.commands.commands_module import CommandsModule
+from storage.archive import ProfileArchiver
+from storage.backends import FileProfileBackend
+from storage.knowledge_journal import KnowledgeJournal
+from storage.mongo_backend import MongoProfileBackend
+from storage.sqlite_backend import SQLiteProfileBackend
+from storage.user_locks import UserLocks
+from utils.file_watcher import FileWatcher
 
 # טעינת משתני סביבה
 load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_API_TOKEN")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-WORDS_FILE = os.getenv("WORDS_FILE", "data/words/words.json")
+WORDS_FILE = os.getenv("WORDS_FILE", "data/words/words_complete_unique_ids.json")
 DATA_DIR = os.getenv("DATA_DIR", "data")
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 DISABLE_HTTPX_LOGS = os.getenv("DISABLE_HTTPX_LOGS", "False").lower() in ("true", "1", "t")
+# כל כמה שניות לבדוק אם קובץ המילים השתנה (0 מבטל טעינה מחדש)
+WORDS_RELOAD_INTERVAL = float(os.getenv("WORDS_RELOAD_INTERVAL", "5"))
+# כתיבה מושהית של פרופילי משתמשים: כל כמה שניות, או אחרי כמה פרופילים שהשתנו
+USER_FLUSH_INTERVAL = float(os.getenv("USER_FLUSH_INTERVAL", "5"))
+USER_FLUSH_MAX_DIRTY = int(os.getenv("USER_FLUSH_MAX_DIRTY", "100"))
+# מטמון פרופילי משתמשים: מספר פרופילים, גודל מקסימלי ומספר הפרופילים לטעינה מוקדמת
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1000"))
+USER_CACHE_MAX_MB = float(os.getenv("USER_CACHE_MAX_MB", "64"))
+USER_CACHE_WARMUP = int(os.getenv("USER_CACHE_WARMUP", "200"))
+# מספר פעולות הקבצים של פרופילי המשתמשים שרצות במקביל
+USER_IO_WORKERS = int(os.getenv("USER_IO_WORKERS", "4"))
+# פורמט השמירה של פרופילי משתמשים: json (ברירת המחדל, הפורמט המקורי), compact או binary.
+# הקריאה מזהה כל פורמט, אבל קבצים ב-compact או binary לא נקראים בגרסאות קודמות של הבוט
+USER_PROFILE_FORMAT = os.getenv("USER_PROFILE_FORMAT", "json")
+# מצב הסשן של המשתמשים (המילה הנוכחית בתרגול וכו') נשמר בזיכרון: אחרי כמה שניות
+# ללא שימוש הוא נמחק, לאיזה קובץ לשמור אותו (ריק - לא נשמר), וכל כמה שניות לשמור
+# אותו אם השתנה (חוץ מהשמירה בכיבוי - אחרי קריסה הולך לאיבוד רק מה שהשתנה מאז)
+USER_SESSION_TTL = float(os.getenv("USER_SESSION_TTL", "3600"))
+USER_SESSION_FILE = os.getenv("USER_SESSION_FILE", os.path.join(DATA_DIR, "sessions.json")) or None
+USER_SESSION_SAVE_INTERVAL = float(os.getenv("USER_SESSION_SAVE_INTERVAL", "60"))
+# אינדקס המשתמשים לפי מועד החזרה הקרוב - קובץ לשמירתו בין הפעלות (ריק - לא נשמר),
+# וכל כמה שניות לשמור אותו אם השתנה. בלי קובץ האינדקס נבנה בהפעלה מהאחסון.
+USER_REVIEW_INDEX_FILE = os.getenv("USER_REVIEW_INDEX_FILE", os.path.join(DATA_DIR, "review_index.json")) or None
+USER_REVIEW_INDEX_INTERVAL = float(os.getenv("USER_REVIEW_INDEX_INTERVAL", "300"))
+# לכמה משתמשים פעילים לשמור בזיכרון את משקלי הדגימה של המילים
+WORD_SAMPLER_USERS = int(os.getenv("WORD_SAMPLER_USERS", "1000"))
+# יומן אירועי הידע (תוצאות תרגול ומשחקים): תיקייה (ריק - בלי יומן, הפרופיל נשמר בכל תוצאה)
+# וכל כמה שניות היומן נדחס לפרופילים השמורים
+USER_JOURNAL_DIR = os.getenv("USER_JOURNAL_DIR", os.path.join(DATA_DIR, "journal"))
+USER_JOURNAL_COMPACT_INTERVAL = float(os.getenv("USER_JOURNAL_COMPACT_INTERVAL", "60"))
+# סטטיסטיקות שימוש יומיות מהיומן: תיקייה (ריק מבטל; הקטעים שנדחסו עוברים ל-journal שבתוכה
+# עד שנצברו) וכל כמה שניות לצבור
+USAGE_STATS_DIR = os.getenv("USAGE_STATS_DIR", os.path.join(DATA_DIR, "stats"))
+USAGE_STATS_INTERVAL = float(os.getenv("USAGE_STATS_INTERVAL", "3600"))
+# אחרי כמה ימים בלי שינוי פרופיל (באחסון בקבצים) עובר לארכיון דחוס (0 מבטל)
+USER_ARCHIVE_DAYS = float(os.getenv("USER_ARCHIVE_DAYS", "90"))
+# אחסון פרופילי המשתמשים: file (קובץ לכל משתמש), sqlite או mongo (לפי MONGO_URI)
+USER_STORAGE = os.getenv("USER_STORAGE", "file").lower()
+# מספר העדכונים שמטופלים במקביל (1 - אחד אחרי השני); עדכונים של אותו משתמש תמיד רצים לפי הסדר
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "1"))
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", "8"))
+USER_SQLITE_PATH = os.getenv("USER_SQLITE_PATH", os.path.join(DATA_DIR, "users.sqlite3"))
 
 # הגדרת לוגר
 log_level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
@@ -85,14 +143,46 @@ else:
     logger.warning("מפתח ה-API של Gemini לא מוגדר. פונקציונליות ה-AI תהיה מוגבלת.")
     model = None
 
-# אתחול מאגרי נתונים
+# אתחול מאגרי נתונים - מאגר המילים הוא מופע יחיד שמשותף לכל המודולים
 words_repo = WordsRepository(WORDS_FILE)
 logger.info(f"Loaded {len(words_repo.words)} words from the dictionary")
-user_repo = UserRepository(os.path.join(DATA_DIR, "users"))
-if DATA_DIR:
-    logger.info("Connected to MongoDB database")
+if USER_STORAGE == "mongo" and MONGO_URI:
+    user_backend = MongoProfileBackend(MONGO_URI, pool_size=MONGO_POOL_SIZE)
+elif USER_STORAGE == "sqlite":
+    user_backend = SQLiteProfileBackend(USER_SQLITE_PATH)
 else:
-    logger.warning("No MongoDB connection defined. User data will be stored in memory temporarily.")
+    if USER_STORAGE != "file":
+        logger.warning(f"User storage '{USER_STORAGE}' is not available, falling back to files.")
+    user_backend = FileProfileBackend(os.path.join(DATA_DIR, "users"), USER_IO_WORKERS, USER_PROFILE_FORMAT)
+# צבירת היומן לסטטיסטיקות שימוש - רק כשיש יומן
+journal_history_dir = None
+usage_stats = None
+if USER_JOURNAL_DIR and USAGE_STATS_DIR:
+    journal_history_dir = os.path.join(USAGE_STATS_DIR, "journal")
+    usage_stats = UsageStatsAggregator(journal_history_dir, USAGE_STATS_DIR, prune=True,
+                                       interval=USAGE_STATS_INTERVAL)
+# ארכוב פרופילים לא פעילים - רק באחסון בקבצים
+profile_archiver = None
+if isinstance(user_backend, FileProfileBackend) and USER_ARCHIVE_DAYS > 0:
+    profile_archiver = ProfileArchiver(user_backend, USER_ARCHIVE_DAYS)
+user_repo = UserRepository(
+    os.path.join(DATA_DIR, "users"),
+    flush_interval=USER_FLUSH_INTERVAL,
+    max_dirty=USER_FLUSH_MAX_DIRTY,
+    cache_size=USER_CACHE_SIZE,
+    cache_max_bytes=int(USER_CACHE_MAX_MB * 1024 * 1024),
+    backend=user_backend,
+    session_ttl=USER_SESSION_TTL,
+    session_file=USER_SESSION_FILE,
+    session_save_interval=USER_SESSION_SAVE_INTERVAL,
+    review_index_file=USER_REVIEW_INDEX_FILE,
+    review_index_interval=USER_REVIEW_INDEX_INTERVAL,
+    journal=KnowledgeJournal(USER_JOURNAL_DIR, history_dir=journal_history_dir) if USER_JOURNAL_DIR else None,
+    compact_interval=USER_JOURNAL_COMPACT_INTERVAL,
+)
+logger.info(f"User profiles are stored in {type(user_backend).__name__}")
+# מנעול לכל משתמש סביב ה-handlers שקוראים ומשנים את הפרופיל
+user_locks = UserLocks()
 
 # מצבי שיחה להגדרת ConversationHandler
 class States(Enum):
@@ -106,8 +196,101 @@ class States(Enum):
 
 # אתחול מודולים
 user_module = UserModule(user_repo)
-practice_module = PracticeModule(words_repo, user_repo, user_module.get_user_profile, user_module.save_user_profile, user_module.ensure_session_data)
-commands_module = CommandsModule(user_module, practice_module, States)
+practice_module = PracticeModule(words_repo, user_repo, SpacedRepetition(user_repo),
+                                 WordSamplers(words_repo, WORD_SAMPLER_USERS))
+commands_module = CommandsModule(user_module, practice_module, States, words_repo)
+
+# מספר ההצעות המקסימלי בחיפוש inline
+INLINE_RESULTS_LIMIT = 10
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """השלמה אוטומטית של מילים בחיפוש inline (@bot wor...)"""
+    query = update.inline_query.query
+    if not query.strip():
+        return
+    
+    results = []
+    for word in words_repo.search_words(query, limit=INLINE_RESULTS_LIMIT):
+        title = f"{word.english} - {word.hebrew}" if word.hebrew else word.english
+        description = " | ".join(part for part in (word.translation, word.part_of_speech) if part)
+        message_text = title + (f"\n{word.examples[0]}" if word.examples else "")
+        results.append(InlineQueryResultArticle(
+            id=word.word_id,
+            title=title,
+            description=description or None,
+            input_message_content=InputTextMessageContent(message_text)
+        ))
+    
+    await update.inline_query.answer(results, cache_time=300)
+
+async def reload_words() -> None:
+    """טעינה מחדש של קובץ המילים אחרי שינוי, בלי לעצור את הבוט"""
+    start = time.perf_counter()
+    # קריאת הקובץ וחישוב ההבדלים נעשים ברקע; ההחלפה עצמה מיידית
+    updated, stats = await asyncio.to_thread(words_repo.prepare_reload)
+    if updated is not None:
+        words_repo.commit_reload(updated)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"Reloaded words file in {elapsed_ms:.0f}ms (version {words_repo.version}): "
+        f"{stats['added']} added, {stats['changed']} changed, {stats['removed']} removed"
+    )
+
+words_watcher = FileWatcher(WORDS_FILE, reload_words, WORDS_RELOAD_INTERVAL)
+
+async def post_init(application: Application) -> None:
+    """פעולות שרצות אחרי עליית האפליקציה"""
+    if WORDS_RELOAD_INTERVAL > 0:
+        words_watcher.start()
+    if isinstance(user_backend, FileProfileBackend):
+        # קבצים מהמבנה השטוח הישן עוברים לתיקיות ה-shard
+        moved = await user_backend.migrate_layout()
+        if moved:
+            logger.info(f"Moved {moved} user profiles into the sharded layout")
+    # אירועים מהיומן שלא נכללו בפרופילים השמורים (כיבוי לא מסודר)
+    replayed = await user_repo.recover_journal()
+    if replayed:
+        logger.info(f"Replayed {replayed} knowledge events from the journal")
+    warmed = await user_repo.warm_up(USER_CACHE_WARMUP)
+    logger.info(f"Warmed user profile cache with {warmed} recent profiles")
+    user_repo.start()
+    if profile_archiver:
+        profile_archiver.start()
+    if usage_stats:
+        usage_stats.start()
+
+async def post_shutdown(application: Application) -> None:
+    """פעולות שרצות בכיבוי האפליקציה"""
+    await words_watcher.stop()
+    if profile_archiver:
+        await profile_archiver.stop()
+    if usage_stats:
+        await usage_stats.stop()
+    # כתיבת כל הפרופילים שעוד לא נשמרו לדיסק
+    await user_repo.close()
+    stats = user_repo.stats()
+    logger.info(
+        f"User profiles flushed: {stats['writes']} writes in {stats['flushes']} flushes, "
+        f"{stats['coalesced']} saves coalesced, {stats['pending']} pending; "
+        f"cache {stats['cache_hits']} hits, {stats['cache_misses']} misses, "
+        f"{stats['cache_evictions']} evictions; {stats['sessions']} active sessions"
+    )
+    if "journal_appends" in stats:
+        logger.info(
+            f"Knowledge journal: {stats['journal_appends']} events in {stats['journal_commits']} commits, "
+            f"{stats['journal_compactions']} compactions"
+        )
+    access_stats = user_module.access_stats.stats()
+    logger.info(
+        f"Profile access: {access_stats['profile_reads']} reads and {access_stats['profile_writes']} writes "
+        f"in {access_stats['profile_updates']} updates (max {access_stats['profile_max_reads']} reads, "
+        f"{access_stats['profile_max_writes']} writes), {access_stats['profile_over_budget']} over budget"
+    )
+    lock_stats = user_locks.stats()
+    logger.info(
+        f"User locks: {lock_stats['acquisitions']} acquisitions, {lock_stats['contended']} contended, "
+        f"max wait {lock_stats['max_wait_seconds'] * 1000:.0f}ms"
+    )
 
 # פונקציית כניסה לתוכנית
 def main() -> None:
@@ -117,49 +300,61 @@ def main() -> None:
         return
     
     # יצירת אפליקציית הבוט
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .concurrent_updates(CONCURRENT_UPDATES)
+        .build()
+    )
     
     # שמירת מודולים ב-bot_data לשימוש בכל המודולים
     application.bot_data["user_module"] = user_module
     application.bot_data["practice_module"] = practice_module
+    application.bot_data["words_repo"] = words_repo
     
-    # הוספת handlers
+    # הוספת handlers - כל עדכון רץ תחת המנעול של המשתמש, ועם הגרסה של מאגר
+    # המילים שהייתה בתחילתו (טעינה מחדש באמצע העדכון לא מערבבת גרסאות)
+    def locked(handler):
+        return user_locks.serialized(words_repo.pinned(handler))
     application.add_handler(ConversationHandler(
         entry_points=[
-            CommandHandler("start", commands_module.start_command),
-            CommandHandler("home", commands_module.home_command),
+            CommandHandler("start", locked(commands_module.start_command)),
+            CommandHandler("home", locked(commands_module.home_command)),
         ],
         states={
             States.MAIN_MENU: [
-                CommandHandler("practice", commands_module.practice_command),
-                CommandHandler("word", commands_module.word_command),
-                CommandHandler("profile", commands_module.profile_command),
-                CallbackQueryHandler(commands_module.button_callback),
+                CommandHandler("practice", locked(commands_module.practice_command)),
+                CommandHandler("word", locked(commands_module.word_command)),
+                CommandHandler("profile", locked(commands_module.profile_command)),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.REGISTRATION: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.PRACTICING: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.PLAYING_GAME: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.READING_STORY: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.WRITING: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
             States.SETTINGS: [
-                CallbackQueryHandler(commands_module.button_callback),
+                CallbackQueryHandler(locked(commands_module.button_callback)),
             ],
         },
-        fallbacks=[CommandHandler("start", commands_module.start_command)]
+        fallbacks=[CommandHandler("start", locked(commands_module.start_command))]
     ))
     
     # הוספת handlers נוספים שלא חלק מה-ConversationHandler
     application.add_handler(CommandHandler("help", commands_module.help_command))
+    application.add_handler(InlineQueryHandler(inline_query))
     
     # הפעלת הבוט
     logger.info("Bot is starting...")
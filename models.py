@@ -2,12 +2,27 @@
 מודלים לייצוג נתונים בפרויקט בוט למידת אנגלית
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple
 from enum import Enum
+import asyncio
+import functools
 import json
 import os
-import pymongo
+import random
+import sys
+from collections import OrderedDict
+from contextvars import ContextVar
 from datetime import datetime
+from utils.text_normalize import normalize_english, normalize_hebrew, hebrew_index_keys
+from utils.word_search import WordSearchIndex
+from utils.word_snapshot import WordSnapshot, SnapshotWordMap, build_snapshot
+from storage.access_counters import count_read, count_write
+from storage.backends import FileProfileBackend, ProfileBackend
+from storage.knowledge_journal import KnowledgeJournal
+from storage.profile_cache import ProfileCache
+from storage.review_index import DueReviewIndex, ReviewQueue, earliest_review
+from storage.session_store import SessionStore
+from storage.write_behind import WriteBehindBuffer
 
 
 class WordStatus(Enum):
@@ -17,22 +32,38 @@ class WordStatus(Enum):
     MASTERED = "mastered"
 
 
+def _intern(value: Optional[str]) -> Optional[str]:
+    """איחוד מחרוזות חוזרות (חלקי דיבור, תגיות, מילים נרדפות) לעותק יחיד בזיכרון"""
+    return sys.intern(value) if value else value
+
+
+_DEFAULT_TOPIC_TAGS = ("general",)
+
+
 class Word:
-    """מחלקה לייצוג מילה באוצר המילים"""
+    """
+    מחלקה לייצוג מילה באוצר המילים
+    
+    המחלקה משתמשת ב-__slots__ ושומרת את הרשימות כטאפלים עם מחרוזות משותפות,
+    כדי שאלפי המילים במאגר יתפסו כמה שפחות זיכרון
+    """
+    
+    __slots__ = ('word_id', 'english', 'hebrew', 'translation', 'part_of_speech',
+                 'difficulty_level', 'examples', 'synonyms', 'topic_tags')
     
     def __init__(self, word_id: str, english: str, hebrew: str = "", 
                  part_of_speech: str = "", difficulty_level: int = 1,
                  examples: List[str] = None, synonyms: List[str] = None,
                  topic_tags: List[str] = None, translation: str = None):
         self.word_id = word_id
-        self.english = english
-        self.hebrew = hebrew
-        self.translation = translation  # תרגום באנגלית (למשל "tenth" עבור "10th")
-        self.part_of_speech = part_of_speech
+        self.english = _intern(english)
+        self.hebrew = _intern(hebrew)
+        self.translation = _intern(translation)  # תרגום באנגלית (למשל "tenth" עבור "10th")
+        self.part_of_speech = _intern(part_of_speech)
         self.difficulty_level = difficulty_level
-        self.examples = examples or []
-        self.synonyms = synonyms or []
-        self.topic_tags = topic_tags or ["general"]
+        self.examples = tuple(examples) if examples else ()
+        self.synonyms = tuple(_intern(synonym) for synonym in synonyms) if synonyms else ()
+        self.topic_tags = tuple(_intern(tag) for tag in topic_tags) if topic_tags else _DEFAULT_TOPIC_TAGS
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Word':
@@ -58,9 +89,9 @@ class Word:
             'translation': self.translation,
             'part_of_speech': self.part_of_speech,
             'difficulty_level': self.difficulty_level,
-            'examples': self.examples,
-            'synonyms': self.synonyms,
-            'topic_tags': self.topic_tags
+            'examples': list(self.examples),
+            'synonyms': list(self.synonyms),
+            'topic_tags': list(self.topic_tags)
         }
     
     def __str__(self) -> str:
@@ -72,12 +103,15 @@ class UserWordProgress:
     
     def __init__(self, word_id: str, status: WordStatus = WordStatus.NEW, 
                  repetitions: int = 0, success_rate: float = 0.0,
-                 next_review: Optional[str] = None):
+                 next_review: Optional[str] = None,
+                 interval: float = 0.0, ease: float = 2.5):
         self.word_id = word_id
         self.status = status
         self.repetitions = repetitions
         self.success_rate = success_rate
         self.next_review = next_review
+        self.interval = interval  # המרווח בימים עד החזרה הבאה
+        self.ease = ease  # מקדם הגדילה של המרווח בתשובה נכונה (SM-2)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'UserWordProgress':
@@ -87,7 +121,9 @@ class UserWordProgress:
             status=WordStatus(data.get('status', 'new')),
             repetitions=data.get('repetitions', 0),
             success_rate=data.get('success_rate', 0.0),
-            next_review=data.get('next_review', None)
+            next_review=data.get('next_review', None),
+            interval=data.get('interval') or 0.0,
+            ease=data.get('ease') or 2.5
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -97,7 +133,9 @@ class UserWordProgress:
             'status': self.status.value,
             'repetitions': self.repetitions,
             'success_rate': self.success_rate,
-            'next_review': self.next_review
+            'next_review': self.next_review,
+            'interval': self.interval,
+            'ease': self.ease
         }
 
 
@@ -106,150 +144,940 @@ class WordsRepository:
     
     def __init__(self, json_file_path: str):
         self.json_file_path = json_file_path
+        # הגרסה שעדכון מטלגרם התחיל איתה (pinned) - לא מוחלפת בטעינה מחדש
+        self._view: ContextVar[Optional['WordsRepository']] = ContextVar("words_view", default=None)
+        self.version = 1  # עולה בכל טעינה מחדש של המילים
         self.words = {}  # word_id -> Word
+        self._english_index = {}  # אנגלית מנורמלת -> רשימת word_id לפי סדר הטעינה
+        self._hebrew_index = {}  # עברית מנורמלת -> רשימת word_id לפי סדר הטעינה
+        self._search_index = None  # נבנה בחיפוש הראשון
+        # (רמת קושי, נושא) -> טאפל קבוע של word_id; None בכל רכיב פירושו "ללא סינון"
+        self._buckets = {}
         self._load_words()
     
     def _load_words(self) -> None:
-        """טעינת המילים מקובץ JSON"""
+        """
+        טעינת המילים - מתמונת המצב הבינארית אם היא תואמת לקובץ ה-JSON,
+        ואחרת מקובץ ה-JSON עצמו
+        """
+        self._clear()
         if not os.path.exists(self.json_file_path):
-            self.words = {}
             return
         
         try:
-            with open(self.json_file_path, 'r', encoding='utf-8') as file:
-                words_data = json.load(file)
-                for word_data in words_data:
-                    word = Word.from_dict(word_data)
-                    self.words[word.word_id] = word
+            snapshot = WordSnapshot.open_if_fresh(self.json_file_path)
+            if snapshot:
+                # המילים נקראות מהקובץ הממופה לפי דרישה
+                self.words = SnapshotWordMap(snapshot, Word.from_dict)
+            else:
+                self.words = self._read_words_file()
+            self._build_indexes()
         except Exception as e:
             print(f"שגיאה בטעינת קובץ המילים: {e}")
-            self.words = {}
+            self._clear()
+    
+    def _read_words_file(self) -> Dict[str, Word]:
+        """קריאת קובץ ה-JSON של המילים למילון word_id -> Word"""
+        with open(self.json_file_path, 'r', encoding='utf-8') as file:
+            # כל רשומה הופכת ל-Word כבר בזמן הפענוח, כך שהמילונים הגולמיים
+            # לא מצטברים בזיכרון לצד המילים
+            return {word.word_id: word for word in json.load(file, object_hook=Word.from_dict)}
+    
+    def _copy(self) -> 'WordsRepository':
+        """
+        עותק של המאגר שניתן לשנות בלי לגעת במקור - המילים עצמן משותפות,
+        אבל כל המבנים שמשתנים בהוספה והסרה של מילים מועתקים
+        """
+        clone = WordsRepository.__new__(WordsRepository)
+        clone.json_file_path = self.json_file_path
+        clone.version = self.version
+        clone.words = self.words.copy()
+        clone._english_index = {key: list(word_ids) for key, word_ids in self._english_index.items()}
+        clone._hebrew_index = {key: list(word_ids) for key, word_ids in self._hebrew_index.items()}
+        clone._search_index = self._search_index.copy() if self._search_index is not None else None
+        clone._buckets = dict(self._buckets)
+        return clone
+    
+    def _from_fresh_snapshot(self) -> Optional['WordsRepository']:
+        """
+        גרסה חדשה של המאגר מתמונת מצב של התוכן הנוכחי של קובץ ה-JSON
+        (תמונת המצב נבנית מחדש אם היא לא מעודכנת)
+        
+        Returns:
+            הגרסה החדשה, או None אם לא ניתן לבנות או לפתוח את תמונת המצב
+        """
+        try:
+            snapshot = WordSnapshot.open_if_fresh(self.json_file_path)
+            if snapshot is None:
+                build_snapshot(self.json_file_path)
+                snapshot = WordSnapshot.open_if_fresh(self.json_file_path)
+        except (OSError, ValueError) as e:
+            print(f"שגיאה בבניית תמונת המצב של המילים: {e}")
+            return None
+        if snapshot is None:
+            return None
+        fresh = WordsRepository.__new__(WordsRepository)
+        fresh.json_file_path = self.json_file_path
+        fresh._clear()
+        fresh.words = SnapshotWordMap(snapshot, Word.from_dict)
+        fresh._build_indexes()
+        return fresh
+    
+    def view(self) -> 'WordsRepository':
+        """
+        תצוגה קבועה של הגרסה הנוכחית של המאגר. טעינה מחדש לא משנה מבנים
+        קיימים אלא מחליפה אותם, כך שמי שמחזיק תצוגה ממשיך לראות גרסה אחידה.
+        """
+        view = WordsRepository.__new__(WordsRepository)
+        view.__dict__.update(self.__dict__)
+        return view
+    
+    def current(self) -> 'WordsRepository':
+        """
+        המאגר בגרסה של העדכון הנוכחי: התצוגה שנקבעה ב-pinned, או המאגר עצמו
+        מחוץ לעדכון (למשל בעבודות רקע)
+        """
+        view = self._view.get()
+        return view if view is not None else self
+    
+    def pinned(self, handler: Callable) -> Callable:
+        """
+        עטיפת handler כך שכל העדכון רואה את הגרסה של המאגר מתחילתו - גם אם
+        המילים נטענו מחדש באמצע (בין await-ים). המודולים ניגשים למילים דרך
+        current(). תמונת מצב ממופה שהוחלפה משתחררת רק כשאין עוד תצוגות שלה.
+        """
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            token = self._view.set(self.view())
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                self._view.reset(token)
+        return wrapper
+    
+    def prepare_reload(self) -> Tuple[Optional['WordsRepository'], Dict[str, int]]:
+        """
+        קריאת קובץ המילים מחדש והכנת גרסה חדשה של המאגר, שבה מעודכנות רק
+        המילים שהשתנו (לפי word_id). המאגר הנוכחי לא משתנה.
+        ניתן להריץ בתהליכון נפרד; ההחלפה עצמה נעשית ב-commit_reload.
+        
+        Returns:
+            (הגרסה החדשה או None אם אין שינויים, מונים של מילים שנוספו/השתנו/הוסרו)
+        """
+        new_words = self._read_words_file()
+        current_words = self.words
+        
+        added = [word_id for word_id in new_words if word_id not in current_words]
+        removed = [word_id for word_id in current_words if word_id not in new_words]
+        changed = [
+            word_id for word_id, word in new_words.items()
+            if word_id in current_words and current_words[word_id].to_dict() != word.to_dict()
+        ]
+        stats = {"added": len(added), "changed": len(changed), "removed": len(removed)}
+        if not (added or changed or removed):
+            return None, stats
+        
+        if self.is_snapshot_backed:
+            # במאגר שמגובה בתמונת מצב - פתיחה של תמונת מצב מעודכנת, כדי שהמילים
+            # שהשתנו לא יישארו מפוענחות בזיכרון בשכבת השינויים עד ההפעלה הבאה
+            updated = self._from_fresh_snapshot()
+            if updated is not None:
+                updated.version = self.version + 1
+                return updated, stats
+        
+        updated = self._copy()
+        for word_id in removed:
+            updated.remove_word(word_id)
+        for word_id in changed + added:
+            updated.add_word(new_words[word_id])
+        updated.version = self.version + 1
+        return updated, stats
+    
+    def commit_reload(self, updated: 'WordsRepository') -> None:
+        """
+        החלפת כל המבנים של המאגר בגרסה החדשה בפעולה אחת
+        
+        עדכונים שכבר רצים (pinned) ממשיכים עם הגרסה שהתחילו בה. תמונת מצב
+        קודמת שהוחלפה לא נסגרת כאן: המיפוי שלה משתחרר כשהתצוגה האחרונה שמחזיקה
+        אותה נזרקת.
+        """
+        state = dict(updated.__dict__)
+        state.pop("_view", None)
+        self.__dict__.update(state)
+    
+    def reload(self) -> Dict[str, int]:
+        """טעינה מחדש של קובץ המילים עם עדכון של המילים שהשתנו בלבד"""
+        updated, stats = self.prepare_reload()
+        if updated is not None:
+            self.commit_reload(updated)
+        return stats
+    
+    @property
+    def is_snapshot_backed(self) -> bool:
+        """האם המילים נטענו מתמונת מצב ממופה לזיכרון"""
+        return isinstance(self.words, SnapshotWordMap)
+    
+    def _clear(self) -> None:
+        """איפוס המילים וכל האינדקסים"""
+        self.words = {}
+        self._english_index = {}
+        self._hebrew_index = {}
+        self._search_index = None
+        self._buckets = {}
+    
+    @staticmethod
+    def _bucket_keys(word: Word) -> List[tuple]:
+        """מפתחות הדליים שמילה שייכת אליהם"""
+        keys = [(None, None), (word.difficulty_level, None)]
+        for topic in dict.fromkeys(word.topic_tags):
+            keys.append((None, topic))
+            keys.append((word.difficulty_level, topic))
+        return keys
+    
+    def _index_views(self):
+        """המילים לבניית אינדקסים - מתמונת מצב נקראים רק השדות הנחוצים"""
+        if self.is_snapshot_backed:
+            return self.words.index_views()
+        return self.words.values()
+    
+    def _build_indexes(self) -> None:
+        """
+        בניית אינדקסי הגיבוב והדליים לפי סדר המילים במאגר.
+        אינדקס החיפוש נבנה רק בחיפוש הראשון, כדי לא להאט את עליית הבוט.
+        """
+        buckets = {}
+        for word in self._index_views():
+            self._index_word(word)
+            for key in self._bucket_keys(word):
+                buckets.setdefault(key, []).append(word.word_id)
+        self._buckets = {key: tuple(word_ids) for key, word_ids in buckets.items()}
+        self._search_index = None
+    
+    def _get_search_index(self) -> WordSearchIndex:
+        """אינדקס החיפוש, נבנה בקריאה הראשונה"""
+        if self._search_index is None:
+            self._search_index = WordSearchIndex.build(self._index_views())
+        return self._search_index
+    
+    def _index_word(self, word: Word) -> None:
+        """הוספת מילה לאינדקסי החיפוש"""
+        key = normalize_english(word.english)
+        if key:
+            self._english_index.setdefault(key, []).append(word.word_id)
+        for key in hebrew_index_keys(word.hebrew):
+            self._hebrew_index.setdefault(key, []).append(word.word_id)
+    
+    def _unindex_word(self, word: Word) -> None:
+        """הסרת מילה מאינדקסי החיפוש"""
+        keys = [(self._english_index, normalize_english(word.english))]
+        keys += [(self._hebrew_index, key) for key in hebrew_index_keys(word.hebrew)]
+        for index, key in keys:
+            word_ids = index.get(key)
+            if not word_ids or word.word_id not in word_ids:
+                continue
+            word_ids.remove(word.word_id)
+            if not word_ids:
+                del index[key]
+    
+    def add_word(self, word: Word) -> None:
+        """הוספת מילה או החלפת מילה קיימת עם אותו מזהה, כולל עדכון האינדקסים"""
+        if word.word_id in self.words:
+            self.remove_word(word.word_id)
+        self.words[word.word_id] = word
+        self._index_word(word)
+        if self._search_index is not None:
+            self._search_index.add(word)
+        for key in self._bucket_keys(word):
+            self._buckets[key] = self._buckets.get(key, ()) + (word.word_id,)
+    
+    def remove_word(self, word_id: str) -> Optional[Word]:
+        """הסרת מילה לפי מזהה, כולל עדכון האינדקסים"""
+        word = self.words.pop(word_id, None)
+        if word:
+            self._unindex_word(word)
+            if self._search_index is not None:
+                self._search_index.remove(word_id)
+            for key in self._bucket_keys(word):
+                remaining = tuple(other for other in self._buckets.get(key, ()) if other != word_id)
+                if remaining:
+                    self._buckets[key] = remaining
+                else:
+                    self._buckets.pop(key, None)
+        return word
     
     def get_word(self, word_id: str) -> Optional[Word]:
         """קבלת מילה לפי מזהה"""
         return self.words.get(word_id)
     
     def get_word_by_english(self, english: str) -> Optional[Word]:
-        """חיפוש מילה לפי הטקסט באנגלית"""
-        for word in self.words.values():
-            if word.english.lower() == english.lower():
-                return word
-        return None
+        """חיפוש מילה לפי הטקסט באנגלית (ללא תלות באותיות גדולות ורווחים)"""
+        word_ids = self._english_index.get(normalize_english(english))
+        return self.words[word_ids[0]] if word_ids else None
+    
+    def get_words_by_hebrew(self, hebrew: str) -> List[Word]:
+        """חיפוש מילים לפי התרגום לעברית (ללא תלות בניקוד ובפיסוק)"""
+        word_ids = self._hebrew_index.get(normalize_hebrew(hebrew), [])
+        return [self.words[word_id] for word_id in word_ids]
     
     def search_words(self, query: str, limit: int = 10) -> List[Word]:
-        """חיפוש מילים לפי מחרוזת חיפוש"""
-        query = query.lower()
-        results = []
+        """
+        חיפוש מילים לפי מחרוזת חיפוש באנגלית, בתרגום האנגלי או בעברית
         
-        for word in self.words.values():
-            if query in word.english.lower():
-                results.append(word)
-                if len(results) >= limit:
-                    break
+        התוצאות מדורגות: התאמה מדויקת, תחילית, תת-מחרוזת ולבסוף התאמה מקורבת
+        """
+        return [self.words[word_id] for word_id in self._get_search_index().search(query, limit)]
+    
+    def get_game_word(self, word_id: str) -> Optional[Dict[str, Any]]:
+        """
+        תצוגת מילון של מילה במבנה שמשחקים מצפים לו ({"id", "english", "hebrew"})
         
-        return results
+        Args:
+            word_id: מזהה המילה
+            
+        Returns:
+            מילון המילה, או None אם המילה לא קיימת או שאין לה תרגום לעברית
+        """
+        word = self.words.get(word_id)
+        if not word or not word.hebrew:
+            return None
+        return {"id": word.word_id, "english": word.english, "hebrew": word.hebrew}
+    
+    def get_game_words(self, word_ids: List[str]) -> List[Dict[str, Any]]:
+        """תצוגות מילון למשחקים עבור רשימת מזהים (מזהים לא מוכרים מדולגים)"""
+        views = (self.get_game_word(word_id) for word_id in word_ids)
+        return [view for view in views if view]
+    
+    def get_random_game_words(self, count: int, difficulty: Optional[int] = None,
+                              topics: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """מילים אקראיות בתצוגת מילון למשחקים"""
+        words = self.get_random_words(count, difficulty=difficulty, topics=topics)
+        return self.get_game_words([word.word_id for word in words])
     
+    def get_word_ids(self, difficulty: Optional[int] = None, topic: Optional[str] = None) -> Tuple[str, ...]:
+        """מזהי המילים ברמת קושי ובנושא (None - בלי סינון), לפי סדר המאגר"""
+        return self._buckets.get((difficulty, topic), ())
+
     def get_words_by_difficulty(self, level: int, limit: int = 10) -> List[Word]:
         """קבלת מילים לפי רמת קושי"""
-        results = []
-        for word in self.words.values():
-            if word.difficulty_level == level:
-                results.append(word)
-                if len(results) >= limit:
-                    break
-        return results
+        return [self.words[word_id] for word_id in self._buckets.get((level, None), ())[:limit]]
     
     def get_random_words(self, count: int, difficulty: Optional[int] = None, 
                         topics: Optional[List[str]] = None) -> List[Word]:
-        """קבלת מילים אקראיות לפי פילטרים אופציונליים"""
-        import random
-        
-        filtered_words = list(self.words.values())
+        """
+        קבלת מילים אקראיות לפי פילטרים אופציונליים
         
-        if difficulty is not None:
-            filtered_words = [w for w in filtered_words if w.difficulty_level == difficulty]
-            
-        if topics:
-            filtered_words = [w for w in filtered_words 
-                              if any(topic in w.topic_tags for topic in topics)]
+        הדגימה נעשית ישירות מהדליים שחושבו בטעינה, ללא העתקה של כל המאגר
+        """
+        if topics and len(topics) > 1:
+            # איחוד דליים של כמה נושאים (ללא כפילויות של מילים עם כמה נושאים)
+            candidates = tuple(dict.fromkeys(
+                word_id for topic in topics for word_id in self._buckets.get((difficulty, topic), ())
+            ))
+        else:
+            candidates = self._buckets.get((difficulty, topics[0] if topics else None), ())
         
-        return random.sample(filtered_words, min(count, len(filtered_words)))
+        word_ids = random.sample(candidates, min(count, len(candidates)))
+        return [self.words[word_id] for word_id in word_ids]
+
+
+def _word_progress_map(user_data: Dict) -> Dict[str, Dict]:
+    """
+    ההתקדמות במילים של פרופיל, כמילון לפי מזהה מילה
+
+    פרופיל ישן שבו word_progress הוא רשימה מומר למילון במקום (פעם אחת),
+    והמונים ב-progress נספרים מחדש.
+    """
+    progress_map = user_data.get("word_progress")
+    if isinstance(progress_map, dict):
+        return progress_map
+    progress_map = {wp["word_id"]: wp for wp in progress_map or []}
+    user_data["word_progress"] = progress_map
+    progress = user_data.setdefault("progress", {})
+    progress.pop("words_mastered", None)
+    progress.pop("words_learning", None)
+    return progress_map
+
+
+def _progress_counters(user_data: Dict) -> Dict[str, int]:
+    """
+    המילון progress של הפרופיל, עם המונים words_mastered ו-words_learning
+
+    שאר השדות ב-progress נשמרים. מונים חסרים נספרים פעם אחת מתוך word_progress.
+    """
+    progress = user_data.setdefault("progress", {})
+    if "words_mastered" not in progress or "words_learning" not in progress:
+        statuses = [wp.get("status") for wp in _word_progress_map(user_data).values()]
+        progress["words_mastered"] = statuses.count(WordStatus.MASTERED.value)
+        progress["words_learning"] = statuses.count(WordStatus.LEARNING.value)
+    return progress
+
+
+_STATUS_COUNTERS = {
+    WordStatus.MASTERED.value: "words_mastered",
+    WordStatus.LEARNING.value: "words_learning",
+}
+
+
+def _count_status(counters: Dict[str, int], status: Optional[str], delta: int) -> None:
+    """עדכון המונה של סטטוס (NEW ו-None לא נספרים)"""
+    counter = _STATUS_COUNTERS.get(status)
+    if counter:
+        counters[counter] += delta
+
+
+def _knowledge_counters(user_data: Dict) -> Dict[str, int]:
+    """
+    המילון progress של הפרופיל, עם המונה words_learned (מילים עם ציון ידע חיובי)
+
+    מונה חסר נספר פעם אחת מתוך words_knowledge.
+    """
+    progress = user_data.setdefault("progress", {})
+    if "words_learned" not in progress:
+        progress["words_learned"] = sum(1 for score in user_data.get("words_knowledge", {}).values() if score > 0)
+    return progress
+
+
+# שדה הפרופיל של מצב הסשן - נשמר בנפרד מהפרופיל ולא נכתב לאחסון
+SESSION_FIELD = "session_data"
+# ה-ts של האירוע האחרון מיומן הידע שנכלל בפרופיל
+JOURNAL_TS_FIELD = "journal_ts"
+
+
+def _durable_profile(user_profile: Dict) -> Dict:
+    """הפרופיל בלי מצב הסשן, לכתיבה לאחסון (עותק רדוד אם צריך להסיר את הסשן)"""
+    if SESSION_FIELD not in user_profile:
+        return user_profile
+    return {key: value for key, value in user_profile.items() if key != SESSION_FIELD}
 
 
 class UserRepository:
-    """מחלקה לשמירת ושליפת נתוני משתמשים מ-MongoDB"""
+    """מחלקה לשמירת ושליפת נתוני משתמשים (קבצים, SQLite או MongoDB)"""
     
     # הוספת WordStatus כמשתנה סטטי של המחלקה
     WordStatus = WordStatus
     
-    def __init__(self, data_dir="data/users"):
+    def __init__(self, data_dir="data/users", flush_interval: float = 5.0, max_dirty: int = 100,
+                 cache_size: int = 1000, cache_max_bytes: int = 64 * 1024 * 1024,
+                 io_workers: int = 4, profile_format: str = "json",
+                 backend: Optional[ProfileBackend] = None,
+                 session_ttl: float = 3600.0, session_file: Optional[str] = None,
+                 journal: Optional[KnowledgeJournal] = None, compact_interval: float = 60.0,
+                 review_index_file: Optional[str] = None, review_queues: int = 1000,
+                 review_index_interval: float = 300.0, session_save_interval: float = 60.0):
         """
         אתחול מאגר המשתמשים
         
         Args:
             data_dir: תיקיית הנתונים לשמירת קבצי המשתמשים
+            flush_interval: זמן בשניות בין כתיבות של פרופילים שהשתנו לאחסון
+            max_dirty: מספר הפרופילים שהשתנו שמפעיל כתיבה מיידית
+            cache_size: מספר הפרופילים המקסימלי במטמון
+            cache_max_bytes: הגודל המקסימלי של המטמון בבתים
+            io_workers: מספר פעולות הקבצים שרצות במקביל
+            profile_format: פורמט השמירה - json, compact או binary (הקריאה מזהה כל פורמט)
+            backend: האחסון של הפרופילים (ברירת מחדל: קובץ לכל משתמש ב-data_dir)
+            session_ttl: אחרי כמה שניות ללא שימוש מצב הסשן של משתמש נמחק
+            session_file: קובץ לשמירת מצב הסשנים בין הפעלות (None - בזיכרון בלבד)
+            journal: יומן אירועי ידע - תוצאות למידה נרשמות בו במקום לשמור את כל הפרופיל
+            compact_interval: כל כמה שניות היומן נדחס לפרופילים השמורים
+            review_index_file: קובץ לשמירת אינדקס המשתמשים עם חזרות בין הפעלות
+            review_queues: למספר כזה של משתמשים נשמרת בזיכרון ערימת מועדי החזרה
+            review_index_interval: כל כמה שניות אינדקס החזרות נשמר לקובץ (אם השתנה)
+            session_save_interval: כל כמה שניות הסשנים נשמרים ל-session_file (אם השתנו)
         """
         self.data_dir = data_dir
-        # יצירת התיקייה אם לא קיימת
-        os.makedirs(data_dir, exist_ok=True)
+        self.backend = backend or FileProfileBackend(data_dir, io_workers, profile_format)
+        # הפרופילים בזיכרון הם העותק הקובע; האחסון מתעדכן בכתיבה מושהית.
+        # פרופיל שפונה מהמטמון לפני שנכתב עדיין מוחזק בחוצץ הכתיבה.
+        self._cache = ProfileCache(cache_size, cache_max_bytes)
+        self._write_behind = WriteBehindBuffer(self._store_many, flush_interval, max_dirty)
+        # מצב הסשן (session_data) משתנה כמעט בכל לחיצה - הוא נשמר בזיכרון
+        # בנפרד, ולא גורם לכתיבה של כל הפרופיל
+        self.sessions = SessionStore(session_ttl, session_file)
+        self.session_save_interval = session_save_interval
+        self._session_save_task: Optional[asyncio.Task] = None
+        # פרופילים שהשתנו רק דרך היומן מאז הדחיסה האחרונה - מוחזקים כאן גם
+        # אם פונו מהמטמון, עד שהדחיסה שומרת אותם
+        self.journal = journal
+        self.compact_interval = compact_interval
+        self._journaled: Dict[int, Dict] = {}
+        self._compact_lock = asyncio.Lock()
+        self._compact_task: Optional[asyncio.Task] = None
+        self.compactions = 0
+        self.replayed = 0
+        # מועדי החזרה: ערימה לכל משתמש (נבנית מחדש מהפרופיל אם פונתה) ואינדקס
+        # של המשתמשים לפי המועד הקרוב ביותר
+        self.due_index = DueReviewIndex(review_index_file)
+        self.review_queues = review_queues
+        self._review_queues: "OrderedDict[int, ReviewQueue]" = OrderedDict()
+        # האינדקס שלם רק אם נטען מהקובץ או נבנה מהאחסון - עד אז שאילתות על
+        # משתמשים לחזרה עוברות לאחסון, והאינדקס לא נשמר
+        self.review_index_interval = review_index_interval
+        self._review_index_complete = False
+        self._review_rebuild_task: Optional[asyncio.Task] = None
+        self._review_save_task: Optional[asyncio.Task] = None
     
-    def _get_user_file_path(self, user_id: int) -> str:
-        """מחזיר את הנתיב לקובץ המשתמש"""
-        return os.path.join(self.data_dir, f"user_{user_id}.json")
+    def _in_memory(self, user_id: int) -> Optional[Dict]:
+        """פרופיל שפונה מהמטמון אבל השינויים בו עוד לא נשמרו (ביומן או בחוצץ הכתיבה)"""
+        user_profile = self._journaled.get(user_id)
+        return user_profile if user_profile is not None else self._write_behind.pending(user_id)
+    
+    async def _store_many(self, profiles: List[Dict]) -> List[bool]:
+        return await self.backend.store_many([_durable_profile(profile) for profile in profiles])
+    
+    def _attach_session(self, user_id: int, user_profile: Dict) -> Dict:
+        """חיבור מצב הסשן הנוכחי של המשתמש לפרופיל (או הסרתו אם פג זמנו)"""
+        session = self.sessions.get(user_id)
+        if session is not None:
+            user_profile[SESSION_FIELD] = session
+        else:
+            user_profile.pop(SESSION_FIELD, None)
+        return user_profile
     
     async def get_user(self, user_id: int) -> Dict:
-        """קבלת פרופיל משתמש לפי מזהה"""
-        file_path = self._get_user_file_path(user_id)
+        """קבלת פרופיל משתמש לפי מזהה (כולל מצב הסשן, אם יש)"""
+        count_read()
+        user_profile = self._cache.get(user_id)
+        if user_profile is not None:
+            return self._attach_session(user_id, user_profile)
         
-        try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"Error reading user file: {e}")
-        return None
+        # פרופיל שפונה מהמטמון אבל עוד לא נכתב - הגרסה בזיכרון חדשה מזו שבדיסק
+        user_profile = self._in_memory(user_id)
+        if user_profile is not None:
+            self._cache.put(user_id, user_profile)
+            return self._attach_session(user_id, user_profile)
+        
+        user_profile = await self.backend.load(user_id)
+        if user_profile is not None:
+            self._cache_loaded(user_id, user_profile)
+            self._attach_session(user_id, user_profile)
+        return user_profile
+    
+    def _cache_loaded(self, user_id: int, user_profile: Dict) -> None:
+        """הכנסת פרופיל שנטען מהאחסון למטמון"""
+        # פרופיל ישן שבו הסשן נשמר יחד עם שאר הנתונים
+        session = user_profile.pop(SESSION_FIELD, None)
+        if session is not None and self.sessions.get(user_id) is None:
+            self.sessions.put(user_id, session)
+        self._cache.put(user_id, user_profile)
+        # האינדקס בקובץ יכול לפגר אחרי הפרופיל (שינויים מאז השמירה האחרונה שלו)
+        self.due_index.update(user_id, earliest_review(user_profile.get("word_progress")))
+    
+    async def get_user_fields(self, user_id: int, fields: Iterable[str]) -> Optional[Dict]:
+        """
+        קריאה של חלק משדות הפרופיל בלבד (למשל המונים שמוצגים בתפריט)
+        
+        פרופיל שנמצא בזיכרון נקרא משם; אחרת נקראים מהאחסון רק השדות
+        המבוקשים, והתוצאה לא נכנסת למטמון.
+        
+        Returns:
+            מילון עם השדות שקיימים בפרופיל, או None אם אין פרופיל
+        """
+        count_read()
+        fields = tuple(fields)
+        user_profile = self._cache.get(user_id)
+        if user_profile is None:
+            user_profile = self._in_memory(user_id)
+        if user_profile is not None:
+            return {field: user_profile[field] for field in fields if field in user_profile}
+        return await self.backend.load_fields(user_id, fields)
     
     async def save_user(self, user_profile: Dict) -> bool:
-        """שמירת פרופיל משתמש"""
+        """שמירת פרופיל משתמש (נכתב לאחסון בסבב הכתיבה הבא)"""
+        count_write()
         try:
-            file_path = self._get_user_file_path(user_profile["user_id"])
-            # שמירה עם פירמוט יפה לקריאות
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(user_profile, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
+            user_id = user_profile["user_id"]
+        except (KeyError, TypeError) as e:
             print(f"Error saving user file: {e}")
             return False
+        
+        session = user_profile.get(SESSION_FIELD)
+        if session is not None:
+            self.sessions.put(user_id, session)
+        self._cache.put(user_id, user_profile)
+        await self._write_behind.mark_dirty(user_id, user_profile)
+        return True
     
-    async def update_user_word_progress(self, user_id: int, word_progress: UserWordProgress) -> bool:
-        """עדכון התקדמות המשתמש במילה"""
+    async def save_session(self, user_profile: Dict) -> bool:
+        """
+        שמירת מצב הסשן של המשתמש בלבד - לשינויים שלא נוגעים בשאר הפרופיל
+        (המילה הנוכחית, תוצאות הסבב, המשוב האחרון). לא נכתב לאחסון.
+        """
+        count_write()
         try:
-            user_data = await self.get_user(user_id)  # הוספת await כאן
+            user_id = user_profile["user_id"]
+        except (KeyError, TypeError) as e:
+            print(f"Error saving user session: {e}")
+            return False
+        
+        self.sessions.put(user_id, user_profile.get(SESSION_FIELD) or {})
+        return True
+    
+    async def record_knowledge(self, user_profile: Dict, changes: Iterable[Tuple[str, int]], source: str) -> bool:
+        """
+        רישום תוצאות למידה (שינויי ציון ידע) של משתמש
+        
+        עם יומן: השינויים מוחלים על הפרופיל בזיכרון ונרשמים ביומן, והפרופיל
+        עצמו נשמר רק בדחיסה הבאה. בלי יומן: השינויים מוחלים והפרופיל נשמר.
+        
+        Args:
+            user_profile: פרופיל המשתמש (משתנה במקום)
+            changes: זוגות (מזהה מילה, שינוי בציון)
+            source: מקור התוצאה (practice, memory_game...)
             
-            if not user_data:
-                user_data = {"user_id": user_id, "word_progress": []}
+        Returns:
+            האם התוצאות נשמרו (ביומן או בפרופיל)
+        """
+        changes = list(changes)
+        for word_id, delta in changes:
+            self.update_word_knowledge(user_profile, word_id, delta)
+        if self.journal is None or not changes:
+            return await self.save_user(user_profile)
+        if await self._journal_changes(user_profile, changes, source):
+            return True
+        return await self.save_user(user_profile)
+    
+    async def record_results(self, user_profile: Dict, changes: Iterable[Tuple[str, int]],
+                             progresses: Iterable[UserWordProgress], source: str) -> bool:
+        """
+        החלת התוצאות של סבב שלם על הפרופיל: שינויי ציון הידע וההתקדמות החדשה
+        במילים. השינויים בציונים נרשמים ביומן (אם יש), אבל הפרופיל עצמו לא
+        נשמר - הקורא שומר אותו פעם אחת לכל הסבב.
+        
+        Args:
+            user_profile: פרופיל המשתמש (משתנה במקום)
+            changes: זוגות (מזהה מילה, שינוי בציון)
+            progresses: ההתקדמות החדשה של המילים (UserWordProgress)
+            source: מקור התוצאות (practice, memory_game...)
+            
+        Returns:
+            האם השינויים נרשמו ביומן (False גם כשאין יומן)
+        """
+        changes = list(changes)
+        for word_id, delta in changes:
+            self.update_word_knowledge(user_profile, word_id, delta)
+        self._apply_words_progress(user_profile, progresses)
+        if self.journal is None or not changes:
+            return False
+        return await self._journal_changes(user_profile, changes, source)
+    
+    async def _journal_changes(self, user_profile: Dict, changes: List[Tuple[str, int]], source: str) -> bool:
+        """רישום ביומן של שינויים שכבר הוחלו על הפרופיל; מחזיר האם הרישום הצליח"""
+        user_id = user_profile["user_id"]
+        self.journal.advance(user_profile.get(JOURNAL_TS_FIELD, 0))
+        events, committed = self.journal.submit(
+            [(user_id, word_id, delta, source) for word_id, delta in changes])
+        # השינויים כבר בפרופיל לפני הכתיבה ליומן, כך שכל אירוע בקטע סגור
+        # של היומן נכלל בפרופיל שהדחיסה שומרת
+        user_profile[JOURNAL_TS_FIELD] = events[-1].ts
+        self._journaled[user_id] = user_profile
+        self._cache.put(user_id, user_profile)
+        try:
+            await asyncio.shield(committed)
+        except Exception as e:
+            print(f"Error writing knowledge journal: {e}")
+            return False
+        return True
+    
+    async def compact_journal(self) -> int:
+        """
+        דחיסת היומן: שמירת הפרופילים שהשתנו דרכו ומחיקת הקטעים שנכללו בהם
+        
+        Returns:
+            מספר הקטעים שנמחקו (0 אם חלק מהפרופילים לא נשמרו - הקטעים
+            נשארים לדחיסה הבאה או לשחזור)
+        """
+        if self.journal is None:
+            return 0
+        async with self._compact_lock:
+            segments = await self.journal.rotate()
+            if not segments and not self._journaled:
+                return 0
+            profiles, self._journaled = self._journaled, {}
+            for user_id, user_profile in profiles.items():
+                await self._write_behind.mark_dirty(user_id, user_profile)
+            await self._write_behind.flush()
+            unsaved = [user_id for user_id in profiles if user_id in self._write_behind]
+            if unsaved:
+                for user_id in unsaved:
+                    self._journaled.setdefault(user_id, profiles[user_id])
+                return 0
+            await self.journal.remove(segments)
+            self.compactions += 1
+            return len(segments)
+    
+    async def recover_journal(self) -> int:
+        """
+        שחזור מהיומן אחרי כיבוי לא מסודר: החלת אירועים שעוד לא נכללו
+        בפרופילים השמורים, ודחיסה (לקריאה בהפעלה, לפני טיפול בעדכונים)
+        
+        Returns:
+            מספר האירועים שהוחלו
+        """
+        if self.journal is None:
+            return 0
+        segments = await self.journal.rotate()
+        if not segments:
+            return 0
+        applied = 0
+        for event in await self.journal.read(segments):
+            user_profile = await self.get_user(event.user_id)
+            if user_profile is None:
+                user_profile = {"user_id": event.user_id}
+                self._cache.put(event.user_id, user_profile)
+            # אירוע שכבר נכלל בפרופיל השמור (הדחיסה לא הספיקה למחוק את הקטע)
+            if event.ts <= user_profile.get(JOURNAL_TS_FIELD, 0):
+                continue
+            self.update_word_knowledge(user_profile, event.word_id, event.delta)
+            user_profile[JOURNAL_TS_FIELD] = event.ts
+            self._journaled[event.user_id] = user_profile
+            applied += 1
+        self.replayed += applied
+        await self.compact_journal()
+        return applied
+    
+    @staticmethod
+    def update_word_knowledge(user_profile: Dict, word_id: str, delta: int) -> int:
+        """
+        שינוי ציון הידע של מילה בפרופיל, עם עדכון המונה progress.words_learned
+        
+        Args:
+            user_profile: פרופיל המשתמש (משתנה במקום; השמירה על הקורא)
+            word_id: מזהה המילה
+            delta: השינוי בציון (+1 אם זכר, -1 אם לא)
             
-            if "word_progress" not in user_data:
-                user_data["word_progress"] = []
+        Returns:
+            הציון החדש
+        """
+        progress = _knowledge_counters(user_profile)
+        knowledge = user_profile.setdefault("words_knowledge", {})
+        old_score = knowledge.get(word_id, 0)
+        new_score = old_score + delta
+        knowledge[word_id] = new_score
+        progress["words_learned"] += (new_score > 0) - (old_score > 0)
+        return new_score
+    
+    @staticmethod
+    def words_learned(user_profile: Dict) -> int:
+        """מספר המילים עם ציון ידע חיובי (נספר פעם אחת אם המונה חסר)"""
+        return _knowledge_counters(user_profile)["words_learned"]
+    
+    async def warm_up(self, limit: int) -> int:
+        """
+        טעינה מוקדמת למטמון של הפרופילים שעודכנו לאחרונה
+        
+        Args:
+            limit: מספר הפרופילים המקסימלי לטעינה
             
-            # עדכון או הוספת התקדמות המילה
-            updated = False
-            for wp in user_data["word_progress"]:
-                if wp["word_id"] == word_progress.word_id:
-                    wp.update(word_progress.to_dict())
-                    updated = True
-                    break
+        Returns:
+            מספר הפרופילים שנטענו
+        """
+        loaded = 0
+        for user_id in await self.backend.recent_user_ids(limit):
+            if not self._cache.has_room():
+                break
+            if user_id in self._cache:
+                continue
+            user_profile = await self.backend.load(user_id)
+            if user_profile is not None:
+                self._cache_loaded(user_id, user_profile)
+                loaded += 1
+        return loaded
+    
+    def start(self) -> None:
+        """
+        טעינת הסשנים ואינדקס החזרות מההפעלה הקודמת, והתחלת הכתיבה התקופתית,
+        דחיסת היומן ושמירת אינדקס החזרות ברקע
+
+        אם אינדקס החזרות לא נשמר (הפעלה ראשונה, או קובץ שנמחק), הוא נבנה ברקע מהאחסון.
+        """
+        try:
+            self.sessions.load()
+        except (OSError, ValueError) as e:
+            print(f"Error loading user sessions: {e}")
+        try:
+            self.due_index.load()
+        except (OSError, ValueError) as e:
+            print(f"Error loading review index: {e}")
+        self._write_behind.start()
+        loop = asyncio.get_running_loop()
+        if self.journal is not None and self._compact_task is None and self.compact_interval > 0:
+            self._compact_task = loop.create_task(self._compact_periodically())
+        self._review_index_complete = self.due_index.loaded
+        if not self._review_index_complete and self._review_rebuild_task is None:
+            # המעקב מתחיל כבר עכשיו - לפני שהמשימה מתחילה לרוץ
+            self.due_index.track_updates()
+            self._review_rebuild_task = loop.create_task(self.rebuild_review_index())
+        if self.due_index.path and self._review_save_task is None and self.review_index_interval > 0:
+            self._review_save_task = loop.create_task(self._save_review_index_periodically())
+        if self.sessions.path and self._session_save_task is None and self.session_save_interval > 0:
+            self._session_save_task = loop.create_task(self._save_sessions_periodically())
+
+    async def rebuild_review_index(self) -> int:
+        """
+        בניית אינדקס החזרות ממועדי החזרה השמורים באחסון
+
+        משתמשים שהמועדים שלהם עודכנו בזמן הבנייה נשארים כפי שהם בזיכרון.
+
+        Returns:
+            מספר המשתמשים שנוספו לאינדקס או השתנו בו
+        """
+        self.due_index.track_updates()
+        try:
+            earliest = await self.backend.earliest_reviews()
+        except Exception as e:
+            print(f"Error rebuilding review index: {e}")
+            self.due_index.merge({})
+            return 0
+        merged = self.due_index.merge(earliest)
+        self._review_index_complete = True
+        return merged
+
+    async def _save_review_index_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.review_index_interval)
+            if not (self._review_index_complete and self.due_index.changed):
+                continue
+            try:
+                # העותק נלקח על הלולאה; הסידור והכתיבה בתהליכון
+                await loop.run_in_executor(None, self.due_index.save, self.due_index.snapshot())
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Error saving review index: {e}")
+
+    async def _save_sessions_periodically(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.session_save_interval)
+            if not self.sessions.changed:
+                continue
+            try:
+                # הקידוד על הלולאה (הסשנים משתנים במקום); הכתיבה בתהליכון
+                await loop.run_in_executor(None, self.sessions.save, self.sessions.snapshot())
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Error saving user sessions: {e}")
+
+    @staticmethod
+    async def _cancel(task: Optional[asyncio.Task]) -> None:
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact_journal()
+            except Exception as e:
+                print(f"Error compacting knowledge journal: {e}")
+    
+    async def flush(self) -> int:
+        """כתיבה מיידית של כל הפרופילים שהשתנו"""
+        return await self._write_behind.flush()
+    
+    async def close(self) -> None:
+        """עצירת הכתיבה התקופתית וכתיבת כל מה שממתין (לקריאה בכיבוי)"""
+        for task in (self._compact_task, self._review_rebuild_task, self._review_save_task, self._session_save_task):
+            await self._cancel(task)
+        self._compact_task = self._review_rebuild_task = self._review_save_task = self._session_save_task = None
+        if self.journal is not None:
+            await self.compact_journal()
+        await self._write_behind.stop()
+        if self.journal is not None:
+            await self.journal.close()
+        await self.backend.close()
+        try:
+            self.sessions.save()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving user sessions: {e}")
+        if self._review_index_complete:
+            # אינדקס חלקי (הבנייה מהאחסון לא הסתיימה) לא נשמר - הוא ייבנה שוב בהפעלה הבאה
+            try:
+                self.due_index.save()
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Error saving review index: {e}")
+    
+    async def get_users_due_for_review(self, until: Optional[str] = None, since: Optional[str] = None) -> List[int]:
+        """
+        מזהי המשתמשים שיש להם מילים לחזרה עד תאריך מסוים
+        
+        התשובה מגיעה מאינדקס החזרות בזיכרון (בכל סוגי האחסון), בלי שאילתה על
+        כל הפרופילים. עד שהאינדקס נבנה מהאחסון (בהפעלה בלי קובץ אינדקס) התשובה
+        מגיעה משאילתה על האחסון.
+        
+        Args:
+            until: תאריך או זמן בפורמט ISO (ברירת מחדל: סוף היום)
+            since: רק משתמשים שהמועד הקרוב שלהם אחרי הזמן הזה (ISO)
+        """
+        until = until or datetime.now().strftime("%Y-%m-%dT23:59:59")
+        if self._review_index_complete:
+            return self.due_index.due_users(until, since)
+        if not since:
+            return await self.backend.users_due_for_review(until)
+        earliest = await self.backend.earliest_reviews()
+        return sorted(user_id for user_id, moment in earliest.items() if since < moment <= until)
+    
+    def _review_queue(self, user_id: int, progress_map: Dict[str, Dict]) -> ReviewQueue:
+        """ערימת מועדי החזרה של משתמש (נבנית מ-word_progress אם אינה בזיכרון)"""
+        queue = self._review_queues.get(user_id)
+        if queue is None:
+            queue = self._review_queues[user_id] = ReviewQueue(progress_map)
+            while len(self._review_queues) > self.review_queues:
+                self._review_queues.popitem(last=False)
+        self._review_queues.move_to_end(user_id)
+        return queue
+    
+    def due_words(self, user_profile: Dict, count: int, until: Optional[str] = None) -> List[str]:
+        """
+        המילים הבאות לחזרה של משתמש, מהמוקדמת למאוחרת
+        
+        Args:
+            user_profile: פרופיל המשתמש
+            count: מספר המילים המקסימלי
+            until: רק מילים שמועד החזרה שלהן עד הזמן הזה (ISO; ברירת מחדל: עכשיו)
+        """
+        progress_map = _word_progress_map(user_profile)
+        if not progress_map:
+            return []
+        until = until or datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+        return self._review_queue(user_profile["user_id"], progress_map).due(progress_map, until, count)
+    
+    def stats(self) -> Dict[str, int]:
+        """מוני הכתיבה המושהית, המטמון (עם הקידומת cache_), הסשנים, אינדקס החזרות והיומן (journal_)"""
+        stats = self._write_behind.stats()
+        stats.update({f"cache_{name}": value for name, value in self._cache.stats().items()})
+        stats.update(self.sessions.stats())
+        stats.update(self.due_index.stats())
+        if self.journal is not None:
+            stats.update({f"journal_{name}": value for name, value in self.journal.stats().items()})
+            stats.update(journal_compactions=self.compactions, journal_replayed=self.replayed)
+        return stats
+    
+    async def update_user_word_progress(self, user_id: int, word_progress: UserWordProgress) -> bool:
+        """עדכון התקדמות המשתמש במילה"""
+        return await self.update_user_words_progress(user_id, [word_progress])
+
+    async def update_user_words_progress(self, user_id: int, progresses: Iterable[UserWordProgress]) -> bool:
+        """
+        עדכון ההתקדמות של כמה מילים יחד (למשל כל המילים של סשן) - קריאה אחת ושמירה אחת
+        
+        Args:
+            user_id: מזהה המשתמש בטלגרם
+            progresses: אובייקטי UserWordProgress של המילים שהשתנו
             
-            if not updated:
-                user_data["word_progress"].append(word_progress.to_dict())
+        Returns:
+            האם הפרופיל נשמר בהצלחה
+        """
+        try:
+            user_data = await self.get_user(user_id)
             
-            # עדכון מונה המילים שנלמדו
-            mastered_count = 0
-            for wp in user_data["word_progress"]:
-                if wp["status"] == WordStatus.MASTERED.value:
-                    mastered_count += 1
+            if not user_data:
+                user_data = {"user_id": user_id}
             
-            user_data["progress"] = {"words_mastered": mastered_count}
+            self._apply_words_progress(user_data, progresses)
             
             # שמירת הנתונים המעודכנים
             return await self.save_user(user_data)
@@ -258,6 +1086,22 @@ class UserRepository:
             print(f"Error updating word progress: {e}")
             return False
     
+    def _apply_words_progress(self, user_data: Dict, progresses: Iterable[UserWordProgress]) -> None:
+        """עדכון ההתקדמות במילים בפרופיל (בזיכרון), במונים ובאינדקסים של מועדי החזרה"""
+        user_id = user_data["user_id"]
+        progress_map = _word_progress_map(user_data)
+        counters = _progress_counters(user_data)
+        queue = self._review_queue(user_id, progress_map)
+        for word_progress in progresses:
+            old = progress_map.get(word_progress.word_id)
+            new = word_progress.to_dict()
+            # רק מעבר סטטוס משנה את המונים - אין צורך לספור מחדש את כל המילים
+            _count_status(counters, old["status"] if old else None, -1)
+            _count_status(counters, new["status"], 1)
+            progress_map[word_progress.word_id] = new
+            queue.push(word_progress.word_id, word_progress.next_review)
+        self.due_index.update(user_id, queue.earliest(progress_map))
+    
     async def get_user_word_progress(self, user_id: int, word_id: str) -> Optional[UserWordProgress]:
         """
         קבלת התקדמות של מילה מסוימת עבור משתמש
@@ -275,10 +1119,11 @@ class UserRepository:
         if not user_data:
             return UserWordProgress(word_id)
         
-        # חיפוש התקדמות קיימת
-        for wp_data in user_data.get("word_progress", []):
-            if wp_data["word_id"] == word_id:
-                return UserWordProgress.from_dict(wp_data)
-        
-        # אם לא נמצאה התקדמות, מחזירים התקדמות חדשה
-        return UserWordProgress(word_id) 
\ No newline at end of file
+        return self.word_progress(user_data, word_id)
+    
+    def word_progress(self, user_profile: Dict, word_id: str) -> UserWordProgress:
+        """ההתקדמות במילה מתוך פרופיל שכבר נטען (התקדמות חדשה אם המילה עוד לא תורגלה)"""
+        wp_data = _word_progress_map(user_profile).get(word_id)
+        if wp_data is not None:
+            return UserWordProgress.from_dict(wp_data)
+        return UserWordProgress(word_id)
@@ -3,17 +3,18 @@
 """
 from typing import Dict, Optional
 from enum import Enum
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes
 
 # ייבוא ישיר של UserStates
 from modules.user.user_module import UserStates
-from modules.games import GamesModule
+from modules.user.profile_context import ProfileContext
+from modules.games import GamesModule, MEMORY_DIFFICULTY_KEYBOARD, MEMORY_DIFFICULTY_TEXT
 
 class CommandsModule:
     """מחלקה לניהול פקודות הבוט"""
     
-    def __init__(self, user_module, practice_module, states_enum):
+    def __init__(self, user_module, practice_module, states_enum, words_repo):
         """
         אתחול מודול הפקודות
         
@@ -21,15 +22,17 @@ class CommandsModule:
             user_module: מודול ניהול המשתמשים
             practice_module: מודול התרגול
             states_enum: מחלקת ה-Enum של מצבי השיחה הראשיים
+            words_repo: מאגר המילים המשותף של האפליקציה
         """
         self.user_module = user_module
         self.practice_module = practice_module
         self.States = states_enum
-        self.games_module = GamesModule(user_module)
+        self.games_module = GamesModule(user_module, words_repo, practice_module.word_sampler)
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """טיפול בפקודת ההתחלה /start"""
-        user_state = await self.user_module.start_command(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            user_state = await self.user_module.start_command(update, context, profile)
         
         # השוואה ישירה עם UserStates
         if user_state == UserStates.MAIN_MENU:
@@ -42,7 +45,8 @@ class CommandsModule:
     
     async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, use_reply: bool = False):
         """הצגת התפריט הראשי"""
-        user_state = await self.user_module.show_main_menu(update, context, use_reply)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            user_state = await self.user_module.show_main_menu(update, context, profile, use_reply)
         # המרת מצב UserStates למצב States
         if user_state == self.user_module.UserStates.MAIN_MENU:
             return self.States.MAIN_MENU
@@ -82,11 +86,13 @@ class CommandsModule:
     
     async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """טיפול בפקודת הפרופיל /profile"""
-        await self.user_module.profile_command(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            await self.user_module.profile_command(update, context, profile)
     
     async def practice_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """טיפול בפקודת התרגול /practice"""
-        practice_state = await self.practice_module.start_practice(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            practice_state = await self.practice_module.start_practice(update, context, profile)
         # המרת מצב PracticeStates למצב States
         if practice_state == self.practice_module.States.PRACTICING:
             return self.States.PRACTICING
@@ -94,7 +100,8 @@ class CommandsModule:
     
     async def word_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """טיפול בפקודת המילה /word"""
-        practice_state = await self.practice_module.show_random_word(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            practice_state = await self.practice_module.show_random_word(update, context, profile)
         # המרת מצב PracticeStates למצב States
         if practice_state == self.practice_module.States.PRACTICING:
             return self.States.PRACTICING
@@ -102,7 +109,8 @@ class CommandsModule:
     
     async def home_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """טיפול בפקודת הבית /home"""
-        user_state = await self.user_module.home_command(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            user_state = await self.user_module.home_command(update, context, profile)
         
         # השוואה ישירה עם UserStates במקום דרך user_module
         if user_state == UserStates.MAIN_MENU:
@@ -110,14 +118,24 @@ class CommandsModule:
         return self.States.MAIN_MENU
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """טיפול בלחיצות על כפתורים"""
+        """
+        טיפול בלחיצות על כפתורים
+        
+        כל המודולים מקבלים את אותו הקשר פרופיל: הפרופיל נטען פעם אחת (רק אם
+        מישהו צריך אותו) ונשמר לכל היותר פעם אחת, אחרי הטיפול בלחיצה
+        """
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            return await self._handle_button(update, context, profile)
+    
+    async def _handle_button(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext):
+        """ניתוב לחיצה על כפתור למודול שמטפל בה"""
         query = update.callback_query
         callback_data = query.data
         
         # בדיקה אם זה חזרה לתפריט הראשי מסיום משחק הזיכרון
         if callback_data == "back_to_menu" and query.message.text and "סיום!" in query.message.text and "משחק הזיכרון" in query.message.text:
             # שליחת הודעה חדשה עם התפריט הראשי
-            await self.user_module.show_main_menu(update, context, use_reply=True)
+            await self.user_module.show_main_menu(update, context, profile, use_reply=True)
             return self.States.MAIN_MENU
             
         # בדיקה אם זה "משחק חדש" מסיום משחק הזיכרון
@@ -127,27 +145,19 @@ class CommandsModule:
             # ושולחים הודעה חדשה עם תפריט בחירת רמת הקושי
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
-                text="בחר את רמת הקושי למשחק הזיכרון:\n\n"
-                     "🟢 *קל* - מילים בסיסיות וקלות\n"
-                     "🟡 *בינוני* - מילים שכבר למדת\n"
-                     "🔴 *קשה* - מילים אקראיות מהמאגר המלא",
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🟢 קל", callback_data="memory_difficulty_easy")],
-                    [InlineKeyboardButton("🟡 בינוני", callback_data="memory_difficulty_medium")],
-                    [InlineKeyboardButton("🔴 קשה", callback_data="memory_difficulty_hard")],
-                    [InlineKeyboardButton("🔙 חזרה למשחקים", callback_data="games")]
-                ]),
+                text=MEMORY_DIFFICULTY_TEXT,
+                reply_markup=MEMORY_DIFFICULTY_KEYBOARD,
                 parse_mode="Markdown"
             )
             return self.States.PLAYING_GAME
         
         # טיפול בחזרה לתפריט הראשי
         if callback_data == "back_to_menu" or callback_data == "main_menu":
-            await self.user_module.show_main_menu(update, context)
+            await self.user_module.show_main_menu(update, context, profile)
             return self.States.MAIN_MENU
         
         # בדיקה אם הכפתור קשור למודול המשתמש
-        user_state = await self.user_module.handle_callback(update, context, callback_data)
+        user_state = await self.user_module.handle_callback(update, context, callback_data, profile)
         if user_state is not None:
             # המרת מצב UserStates למצב States
             if callback_data == "back_to_menu" or callback_data == "main_menu":
@@ -162,7 +172,7 @@ class CommandsModule:
         
         # בדיקה אם הכפתור קשור למודול התרגול
         if callback_data.startswith("practice_") or callback_data == "practice":
-            practice_state = await self.practice_module.handle_practice_callback(update, context, callback_data)
+            practice_state = await self.practice_module.handle_practice_callback(update, context, callback_data, profile)
             return self.States.PRACTICING if practice_state else self.States.MAIN_MENU
         
         # טיפול בכפתורים של משחקים
@@ -174,7 +184,7 @@ class CommandsModule:
             return self.States.PLAYING_GAME
         elif callback_data.startswith("memory_card_") or callback_data == "memory_empty" or callback_data.startswith("memory_difficulty_"):
             # טיפול בלחיצות על כרטיסיות במשחק הזיכרון או בחירת רמת קושי
-            handled = await self.games_module.handle_callback(update, context, callback_data)
+            handled = await self.games_module.handle_callback(update, context, callback_data, profile)
             return self.States.PLAYING_GAME if handled else self.States.MAIN_MENU
         
         # טיפול בכפתורים אחרים
@@ -194,7 +204,8 @@ class CommandsModule:
     
     async def show_practice_word(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """הצגת מילה לתרגול"""
-        practice_state = await self.practice_module.show_practice_word(update, context)
+        async with self.user_module.profile_context(update.effective_user.id) as profile:
+            practice_state = await self.practice_module.show_practice_word(update, context, profile)
         # המרת מצב PracticeStates למצב States
         if practice_state == self.practice_module.States.PRACTICING:
             return self.States.PRACTICING
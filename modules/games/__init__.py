@@ -4,44 +4,53 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from modules.games.memory_game.memory_game import MemoryGame
-import json
-import os
+from modules.practice.word_sampler import review_weight
+from modules.user.profile_context import ProfileContext
+import logging
 import random
 
+logger = logging.getLogger(__name__)
+
+# המקלדות של התפריטים לא משתנות (ואובייקטי המקלדת של telegram לא ניתנים לשינוי),
+# ולכן הן נבנות פעם אחת
+GAMES_MENU_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🎮 משחק הזיכרון", callback_data="game_memory")],
+    [InlineKeyboardButton("🎲 משחק 2", callback_data="game_2")],
+    [InlineKeyboardButton("🎯 משחק 3", callback_data="game_3")],
+    [InlineKeyboardButton("🎪 משחק 4", callback_data="game_4")],
+    [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
+])
+
+MEMORY_DIFFICULTY_TEXT = (
+    "בחר את רמת הקושי למשחק הזיכרון:\n\n"
+    "🟢 *קל* - מילים בסיסיות וקלות\n"
+    "🟡 *בינוני* - מילים שכבר למדת\n"
+    "🔴 *קשה* - מילים אקראיות מהמאגר המלא"
+)
+MEMORY_DIFFICULTY_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🟢 קל", callback_data="memory_difficulty_easy")],
+    [InlineKeyboardButton("🟡 בינוני", callback_data="memory_difficulty_medium")],
+    [InlineKeyboardButton("🔴 קשה", callback_data="memory_difficulty_hard")],
+    [InlineKeyboardButton("🔙 חזרה למשחקים", callback_data="games")]
+])
+
 class GamesModule:
     """מחלקה לניהול משחקים"""
     
-    def __init__(self, user_module):
+    def __init__(self, user_module, words_repo, word_sampler=None):
         """
         אתחול מודול המשחקים
         
         Args:
             user_module: מודול ניהול המשתמשים
+            words_repo: מאגר המילים המשותף של האפליקציה
+            word_sampler: הדוגמים המשוקללים של המשתמשים (WordSamplers), לבחירת
+                          המילים שנלמדו ברמה הבינונית
         """
         self.user_module = user_module
-        self.memory_game = MemoryGame()  # יצירת מופע של משחק הזיכרון
-        
-        # טעינת מאגר המילים המלא (אם קיים)
-        self.all_words = []
-        words_file_path = "data/words/words_complete_unique_ids.json"
-        if os.path.exists(words_file_path):
-            try:
-                with open(words_file_path, 'r', encoding='utf-8') as f:
-                    loaded_words = json.load(f)
-                
-                # בדיקה והתאמה של מבנה המילים
-                for word in loaded_words:
-                    # בדיקה אם המילה מכילה את השדות הנדרשים
-                    if isinstance(word, dict) and "english" in word and "hebrew" in word:
-                        # וידוא שיש שדה word_id
-                        if "word_id" not in word:
-                            continue  # דילוג על מילים ללא מזהה
-                        self.all_words.append(word)
-                
-                print(f"DEBUG: נטענו {len(self.all_words)} מילים מהמאגר המלא")
-                
-            except Exception as e:
-                print(f"שגיאה בטעינת קובץ המילים המלא: {e}")
+        self.words_repo = words_repo
+        self.word_sampler = word_sampler
+        self.memory_game = MemoryGame(word_sampler)  # יצירת מופע של משחק הזיכרון
         
         # מילים לרמה קלה
         self.easy_words = [
@@ -66,18 +75,9 @@ class GamesModule:
         """הצגת תפריט המשחקים"""
         query = update.callback_query
         
-        keyboard = [
-            [InlineKeyboardButton("🎮 משחק הזיכרון", callback_data="game_memory")],
-            [InlineKeyboardButton("🎲 משחק 2", callback_data="game_2")],
-            [InlineKeyboardButton("🎯 משחק 3", callback_data="game_3")],
-            [InlineKeyboardButton("🎪 משחק 4", callback_data="game_4")],
-            [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await query.edit_message_text(
             text="מה משחקים עכשיו? 🎮",
-            reply_markup=reply_markup
+            reply_markup=GAMES_MENU_KEYBOARD
         )
         
         return True  # מציין שהפעולה טופלה בהצלחה
@@ -86,20 +86,9 @@ class GamesModule:
         """הצגת מסך בחירת רמת קושי למשחק הזיכרון"""
         query = update.callback_query
         
-        keyboard = [
-            [InlineKeyboardButton("🟢 קל", callback_data="memory_difficulty_easy")],
-            [InlineKeyboardButton("🟡 בינוני", callback_data="memory_difficulty_medium")],
-            [InlineKeyboardButton("🔴 קשה", callback_data="memory_difficulty_hard")],
-            [InlineKeyboardButton("🔙 חזרה למשחקים", callback_data="games")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await query.edit_message_text(
-            text="בחר את רמת הקושי למשחק הזיכרון:\n\n"
-                 "🟢 *קל* - מילים בסיסיות וקלות\n"
-                 "🟡 *בינוני* - מילים שכבר למדת\n"
-                 "🔴 *קשה* - מילים אקראיות מהמאגר המלא",
-            reply_markup=reply_markup,
+            text=MEMORY_DIFFICULTY_TEXT,
+            reply_markup=MEMORY_DIFFICULTY_KEYBOARD,
             parse_mode="Markdown"
         )
         
@@ -125,9 +114,8 @@ class GamesModule:
         
         return True  # מציין שהפעולה טופלה בהצלחה
     
-    async def start_memory_game(self, update: Update, context: ContextTypes.DEFAULT_TYPE, difficulty: str):
+    async def start_memory_game(self, update: Update, context: ContextTypes.DEFAULT_TYPE, difficulty: str, profile: ProfileContext):
         """התחלת משחק הזיכרון ברמת קושי מסוימת"""
-        user_id = update.effective_user.id
         words = []
         
         # המרת קוד הקושי לטקסט בעברית
@@ -142,78 +130,36 @@ class GamesModule:
             words = self.easy_words
         elif difficulty == "medium":
             # רמה בינונית - מילים שהמשתמש למד
-            user_profile = await self.user_module.get_user_profile(user_id)
-            words_knowledge = user_profile.get("words_knowledge", {})
-            
-            # בחירת מילים שהמשתמש כבר למד (עם ציון חיובי)
-            learned_word_ids = [word_id for word_id, score in words_knowledge.items() if score > 0]
-            print(f"DEBUG: מספר המילים שנלמדו עם ציון חיובי: {len(learned_word_ids)}")
-            print(f"DEBUG: מזהי המילים שנלמדו: {learned_word_ids[:5]}...")
+            user_profile = await profile.get()
             
-            # אם יש מספיק מילים שנלמדו, השתמש בהן
-            if len(learned_word_ids) >= 8:
-                print(f"DEBUG: יש מספיק מילים שנלמדו ({len(learned_word_ids)})")
-                # המרת מזהי המילים למחרוזות (כי הם מאוחסנים כמחרוזות ב-JSON)
-                learned_word_ids_str = [str(word_id) for word_id in learned_word_ids]
-                
-                # מציאת המילים המתאימות מתוך מאגר המילים המלא
-                learned_words = []
-                print(f"DEBUG: מספר המילים במאגר המלא: {len(self.all_words)}")
-                print(f"DEBUG: דוגמה למבנה מילה במאגר: {self.all_words[0] if self.all_words else 'אין מילים'}")
-                
-                # איסוף כל המילים שנלמדו
-                for word in self.all_words:
-                    # בדיקה אם המילה מכילה את השדה word_id
-                    word_id_str = str(word.get("word_id", ""))
-                    if word_id_str in learned_word_ids_str:
-                        # יצירת מבנה מילה תואם למשחק הזיכרון
-                        learned_words.append({
-                            "id": word_id_str,
-                            "english": word.get("english", ""),
-                            "hebrew": word.get("hebrew", "")
-                        })
-                        print(f"DEBUG: נמצאה מילה מתאימה: {word.get('english')} (id: {word_id_str})")
+            if self.word_sampler:
+                # מילים שנלמדו, החלשות ואלה שהגיע מועד החזרה עליהן קודם
+                # (מילים בלי תרגום לעברית לא מתאימות למשחק - נדגמות עוד מילים)
+                learned_words = self.words_repo.current().get_game_words(
+                    self.word_sampler.sample(user_profile, 16, weight=review_weight))[:8]
+            else:
+                words_knowledge = user_profile.get("words_knowledge", {})
                 
-                print(f"DEBUG: מספר המילים שנמצאו במאגר: {len(learned_words)}")
+                # בחירת מילים שהמשתמש כבר למד (עם ציון חיובי)
+                learned_word_ids = [str(word_id) for word_id, score in words_knowledge.items() if score > 0]
                 
-                # אם מצאנו מספיק מילים
-                if len(learned_words) >= 8:
-                    # בחירת 8 מילים באקראי מתוך המילים שנלמדו
-                    words = random.sample(learned_words, 8)
-                    print(f"DEBUG: נבחרו 8 מילים באקראי מתוך {len(learned_words)} מילים שנלמדו")
-                else:
-                    # אם אין מספיק מילים במאגר, השלם עם מילים קלות
-                    words = self.easy_words
-                    print(f"DEBUG: אין מספיק מילים במאגר, משתמשים במילים קלות")
+                # איסוף המילים שנלמדו מתוך מאגר המילים המשותף
+                learned_words = self.words_repo.current().get_game_words(learned_word_ids)
+            logger.debug(f"Memory game: {len(learned_words)} learned words found")
+            
+            if len(learned_words) >= 8:
+                # בחירת 8 מילים באקראי מתוך המילים שנלמדו
+                words = random.sample(learned_words, 8)
             else:
                 # אם אין מספיק מילים שנלמדו, השלם עם מילים קלות
                 words = self.easy_words
-                print(f"DEBUG: אין מספיק מילים שנלמדו ({len(learned_word_ids)}), משתמשים במילים קלות")
+                logger.debug(f"Memory game: only {len(learned_words)} learned words, using easy words")
         elif difficulty == "hard":
-            # רמה קשה - מילים אקראיות מהמאגר המלא
-            if self.all_words:
-                # בחירת 15 מילים אקראיות מהמאגר המלא
-                random_words = random.sample(self.all_words, min(15, len(self.all_words)))
-                
-                # התאמת המילים למבנה הנדרש
-                words = []
-                for i, word in enumerate(random_words):
-                    # בדיקה אם המילה מכילה את כל השדות הנדרשים
-                    if "english" in word and "hebrew" in word:
-                        # בדיקה אם המילה כבר מכילה שדה id
-                        if "id" in word:
-                            words.append(word)
-                        else:
-                            # יצירת עותק של המילה עם שדה id
-                            word_copy = word.copy()
-                            word_copy["id"] = i + 1000  # מספר גדול כדי למנוע התנגשויות
-                            words.append(word_copy)
-                
-                # אם אין מספיק מילים תקינות, השלם עם מילים קלות
-                if len(words) < 8:
-                    words = self.easy_words
-            else:
-                # אם אין מאגר מילים מלא, השתמש במילים קלות
+            # רמה קשה - 15 מילים אקראיות מהמאגר המלא
+            words = self.words_repo.current().get_random_game_words(15)
+            
+            # אם אין מספיק מילים תקינות, השלם עם מילים קלות
+            if len(words) < 8:
                 words = self.easy_words
         
         # קבלת message_id מהקריאה הנוכחית (אם זו קריאת callback)
@@ -225,12 +171,12 @@ class GamesModule:
         await self.memory_game.start_game(update, context, words, difficulty_text, message_id)
         return True
     
-    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str):
+    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str, profile: ProfileContext):
         """טיפול בקריאות חוזרות מהמשחקים"""
         
         # בדיקה אם זו קריאה ממשחק הזיכרון
         if callback_data.startswith("memory_card_"):
-            return await self.memory_game.handle_callback(update, context)
+            return await self.memory_game.handle_callback(update, context, profile)
         
         # בדיקה אם זה משחק זיכרון שהסתיים
         user_id = update.effective_user.id
@@ -256,7 +202,7 @@ class GamesModule:
             
             # אם זו בחירת רמת קושי, נתחיל משחק חדש
             difficulty = callback_data.split("_")[-1]  # easy, medium, hard
-            return await self.start_memory_game(update, context, difficulty)
+            return await self.start_memory_game(update, context, difficulty, profile)
         
         # אם זו בחירת משחק
         if callback_data.startswith("game_"):
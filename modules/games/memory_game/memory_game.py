@@ -7,13 +7,20 @@ import random
 import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from modules.user.profile_context import ProfileContext
 
 class MemoryGame:
     """מחלקה למשחק זיכרון"""
     
-    def __init__(self):
-        """אתחול המשחק"""
+    def __init__(self, word_sampler=None):
+        """
+        אתחול המשחק
+        
+        word_sampler (WordSamplers) מקבל את תוצאות המשחק, כדי שהמשקלים של
+        המילים בדגימה יתעדכנו
+        """
         self.active_games = {}  # מילון לשמירת מצב המשחק לכל משתמש
+        self.word_sampler = word_sampler
     
     async def start_game(self, update: Update, context: ContextTypes.DEFAULT_TYPE, words: List[Dict], difficulty: str = "קל", message_id: Optional[int] = None) -> None:
         """התחלת משחק חדש"""
@@ -123,8 +130,8 @@ class MemoryGame:
         
         return InlineKeyboardMarkup(keyboard)
     
-    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
-        """טיפול בלחיצות על כפתורים במשחק"""
+    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext) -> bool:
+        """טיפול בלחיצות על כפתורים במשחק (profile - הקשר הפרופיל של העדכון)"""
         query = update.callback_query
         user_id = update.effective_user.id
         callback_data = query.data
@@ -169,7 +176,7 @@ class MemoryGame:
                 
                 # בדיקה אם המשחק הסתיים
                 if len(game_state["matched"]) == len(game_state["cards"]):
-                    await self._end_game(context, user_id)
+                    await self._end_game(context, user_id, profile)
                 else:
                     await query.answer("מצאת התאמה! 🎉")
                     await self._update_game_message(context, user_id)
@@ -252,7 +259,7 @@ class MemoryGame:
             if "Message is not modified" not in str(e):
                 print(f"שגיאה בעדכון הודעת המשחק: {e}")
     
-    async def _end_game(self, context: ContextTypes.DEFAULT_TYPE, user_id: int) -> None:
+    async def _end_game(self, context: ContextTypes.DEFAULT_TYPE, user_id: int, profile: ProfileContext) -> None:
         """סיום המשחק"""
         game_state = self.active_games.get(user_id)
         if not game_state:
@@ -305,28 +312,24 @@ class MemoryGame:
         
         # עדכון רשימת המילים שהמשתמש למד
         try:
-            # קבלת פרופיל המשתמש מהמודול המתאים
-            user_profile = await context.bot_data.get("user_module").get_user_profile(user_id)
-            
-            # וידוא שיש מילון words_knowledge
-            if "words_knowledge" not in user_profile:
-                user_profile["words_knowledge"] = {}
+            # פרופיל המשתמש מהקשר העדכון
+            user_module = context.bot_data.get("user_module")
+            user_profile = await profile.get()
             
             # הוספת המילים שנמצאו במשחק לרשימת המילים שהמשתמש למד
+            changes = []
             for pair_id in matched_ids:
                 # מציאת המילה המתאימה
                 for card in game_state["cards"]:
                     if card["pair_id"] == pair_id and card["type"] == "english":
-                        # אם המילה לא קיימת במילון, נאתחל אותה ל-0
-                        if pair_id not in user_profile["words_knowledge"]:
-                            user_profile["words_knowledge"][pair_id] = 0
-                        
-                        # עדכון הציון: +1 עבור כל זוג שנמצא במשחק
-                        user_profile["words_knowledge"][pair_id] += 1
+                        # עדכון הציון: +1 עבור כל זוג שנמצא במשחק (מילה חדשה מתחילה מ-0)
+                        changes.append((pair_id, 1))
                         break
             
-            # שמירת הפרופיל המעודכן
-            await context.bot_data.get("user_module").save_user_profile(user_profile)
+            # רישום התוצאות ביומן הידע (הפרופיל נשמר בדחיסה הבאה של היומן)
+            await user_module.user_repo.record_knowledge(user_profile, changes, "memory_game")
+            if self.word_sampler:
+                self.word_sampler.record(user_profile, [word_id for word_id, _ in changes])
         except Exception as e:
             print(f"שגיאה בעדכון רמת הידע של המילים: {e}")
         
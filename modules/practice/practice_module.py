@@ -2,13 +2,16 @@
 מודול לתרגול מילים - תרגול אוצר מילים באנגלית
 """
 
-from typing import Dict, List, Tuple, Union, Optional
-import random
+from typing import Dict, List, Union
 import logging  # הוספת ייבוא
+import secrets
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from enum import Enum
 
+from modules.practice.word_cards import WordCardCache
+from modules.user.profile_context import ProfileContext
+
 # הגדרת logger
 logger = logging.getLogger(__name__)
 
@@ -17,147 +20,182 @@ class States(Enum):
     MAIN_MENU = 1
     PRACTICING = 2
 
+# רמת המשתמש שנבחרה ברישום -> רמת הקושי של המילים (נקבעת ב-analytics/difficulty.py)
+LEVEL_DIFFICULTY = {"beginner": 1, "intermediate": 2, "advanced": 3}
+
+# מספר המילים בסבב מהיר (כל המילים בהודעה אחת). מה שהמשתמש סימן נשמר כמסכת
+# ביטים בכפתורים עצמם, כך שהמספר מוגבל באורך ה-callback_data (64 בתים)
+QUIZ_WORDS = 8
+
+PRACTICE_INTRO_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("👉 הצג את המילה הראשונה", callback_data="practice_show_word")],
+    [InlineKeyboardButton("📋 כל המילים בהודעה אחת", callback_data="practice_quiz")]
+])
+
+PRACTICE_SUMMARY_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ כן, תן לי עוד", callback_data="practice")],
+    [InlineKeyboardButton("📋 סבב מהיר בהודעה אחת", callback_data="practice_quiz")],
+    [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
+])
+
+
+def _practice_intro_text(count: int) -> str:
+    return (
+        "🔤 *התחלת סבב תרגול מילים*\n\n"
+        f"בחרתי {count} מילים עבורך לתרגול.\n"
+        "אציג כל מילה עם הפירוש והדוגמאות שלה, ואתה תסמן אם ידעת אותה או לא.\n"
+        "אפשר גם לראות את כל המילים בהודעה אחת ולסמן בבת אחת את אלה שידעת.\n\n"
+        "בוא נתחיל!"
+    )
+
 class PracticeModule:
     """מחלקה לתרגול מילים"""
     
-    def __init__(self, words_repo, user_repo, get_user_profile, save_user_profile, ensure_session_data):
-        """אתחול המודול"""
+    def __init__(self, words_repo, user_repo, scheduler=None, word_sampler=None):
+        """
+        אתחול המודול
+        
+        הפרופיל של המשתמש מגיע למטפלים בהקשר הפרופיל של העדכון (ProfileContext):
+        שינויים במצב הסשן (המילה הנוכחית, התוצאות, המשוב) רק מסומנים בו, והוא
+        נשמר פעם אחת בסוף העדכון.
+        scheduler (SpacedRepetition) מכניס לסבבים מילים שהגיע מועד החזרה עליהן
+        ומתזמן אותן לפי התשובות; בלעדיו המילים בסבב אקראיות.
+        word_sampler (WordSamplers) משלים את הסבב במילים לפי מה שהמשתמש כבר
+        יודע - מילים חדשות וחלשות קודם; בלעדיו ההשלמה אקראית.
+        """
         self.active_sessions = {}  # מילון לשמירת מצב התרגול לכל משתמש
         self.words_repo = words_repo
         self.user_repo = user_repo
-        self.get_user_profile = get_user_profile
-        self.save_user_profile = save_user_profile
-        self.ensure_session_data = ensure_session_data
+        self.scheduler = scheduler
+        self.word_sampler = word_sampler
+        self.word_cards = WordCardCache(words_repo)
+    
+    def _random_words(self, count: int, user_profile: Dict) -> List:
+        """
+        מילים אקראיות ברמת הקושי של המשתמש
+        
+        אם אין מילים ברמה הזו (למשל לפני שהרמות כוילו) - מכל הרמות
+        """
+        difficulty = LEVEL_DIFFICULTY.get(user_profile.get("level"))
+        words = self.words_repo.current().get_random_words(count, difficulty=difficulty)
+        if not words and difficulty is not None:
+            words = self.words_repo.current().get_random_words(count)
+        return words
     
-    async def start_practice(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> States:
+    def _session_words(self, user_profile: Dict, count: int) -> List[str]:
+        """
+        מילים לסבב תרגול: קודם מילים שהגיע מועד החזרה עליהן, ואת השאר -
+        מילים ברמת המשתמש שלא מתוזמנות לחזרה (לפי המשקלים שלו, אם יש דוגם)
+        """
+        word_ids = self.scheduler.due_words(user_profile, count) if self.scheduler else []
+        if len(word_ids) < count and self.word_sampler:
+            word_ids += self.word_sampler.sample(
+                user_profile, count - len(word_ids),
+                difficulty=LEVEL_DIFFICULTY.get(user_profile.get("level")), exclude=word_ids)
+        elif len(word_ids) < count:
+            scheduled = user_profile.get("word_progress") or {}
+            for word in self._random_words(2 * count, user_profile):
+                if len(word_ids) >= count:
+                    break
+                if word.word_id not in word_ids and word.word_id not in scheduled:
+                    word_ids.append(word.word_id)
+        return word_ids
+    
+    async def _record_results(self, user_profile: Dict, answers: Dict[str, bool], profile: ProfileContext) -> None:
+        """
+        רישום התוצאות של סבב שלם: רמת הידע של כל מילה (מילה חדשה מתחילה מ-0)
+        עולה ב-1 אם זכר ויורדת ב-1 אם לא, ומועד החזרה הבא שלה נקבע לפי
+        התשובה. כל התוצאות נכנסות לפרופיל בזיכרון (והשינויים בציונים גם ליומן
+        הידע), והפרופיל נשמר פעם אחת בסוף העדכון.
+        """
+        changes = [(word_id, 1 if remembered else -1) for word_id, remembered in answers.items()]
+        progresses = await self.scheduler.reviews(user_profile, answers) if self.scheduler else []
+        await self.user_repo.record_results(user_profile, changes, progresses, "practice")
+        profile.changed()
+        # המשקלים של המילים בדגימה של הסבבים הבאים
+        if self.word_sampler:
+            self.word_sampler.record(user_profile, list(answers))
+    
+    def _session_summary(self, word_ids: List[str], answers: Dict[str, bool]) -> str:
+        """סיכום סבב: כמה מילים המשתמש ידע, ומה התוצאה בכל מילה"""
+        correct = sum(1 for remembered in answers.values() if remembered)
+        summary = (
+            f"כל הכבוד! סיימת את מפגש התרגול 🎉\n"
+            f"ידעת {correct} מתוך {len(word_ids)} מילים!\n\n"
+            "סיכום המילים:\n"
+        )
+        
+        # עוברים על כל המילים ומציגים את התוצאה האמיתית מהתרגול
+        for i, word_id in enumerate(word_ids, 1):
+            word = self.words_repo.current().get_word(word_id)
+            if not word:
+                continue
+            mark = "✅" if answers.get(word_id, False) else "❌"
+            summary += f"{i}. {word.english} - {word.hebrew} {mark}\n"
+        
+        return summary + "\nרוצה לתרגל עוד מילים?"
+    
+    async def start_practice(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext) -> States:
         """פקודה להתחלת תרגול מילים"""
-        user = update.effective_user
-        user_profile = await self.get_user_profile(user.id)
-        user_profile = self.ensure_session_data(user_profile)
-        level = user_profile["level"]
+        user_profile = await profile.get()
         
-        # בחירת 5 מילים אקראיות לתרגול
-        words = self.words_repo.get_random_words(5, difficulty=level)
-        word_ids = [word.word_id for word in words]
+        # בחירת 5 מילים לתרגול
+        word_ids = self._session_words(user_profile, 5)
         
         # שמירת המילים הנוכחיות למשתמש
         user_profile["session_data"]["current_word_set"] = word_ids
         user_profile["session_data"]["current_word_index"] = 0
-        self.save_user_profile(user_profile)
+        profile.session_changed()
         
         # הצגת הודעת פתיחה לתרגול
-        practice_intro_text = (
-            "🔤 *התחלת סבב תרגול מילים*\n\n"
-            f"בחרתי {len(word_ids)} מילים עבורך לתרגול.\n"
-            "אציג כל מילה עם הפירוש והדוגמאות שלה, ואתה תסמן אם ידעת אותה או לא.\n\n"
-            "בוא נתחיל!"
-        )
-        
-        keyboard = [
-            [InlineKeyboardButton("👉 הצג את המילה הראשונה", callback_data="practice_show_word")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(practice_intro_text, reply_markup=reply_markup, parse_mode='Markdown')
+        await update.message.reply_text(_practice_intro_text(len(word_ids)), reply_markup=PRACTICE_INTRO_KEYBOARD,
+                                        parse_mode='Markdown')
         
         return States.PRACTICING
     
-    async def show_random_word(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> States:
+    async def show_random_word(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext) -> States:
         """פקודה להצגת מילה אקראית ללימוד"""
-        user = update.effective_user
-        user_profile = await self.get_user_profile(user.id)
-        user_profile = self.ensure_session_data(user_profile)
-        level = user_profile["level"]
+        user_profile = await profile.get()
         
         # בחירת מילה אקראית
-        words = self.words_repo.get_random_words(1, difficulty=level)
+        words = self._random_words(1, user_profile)
         if not words:
             await update.message.reply_text("לא נמצאו מילים מתאימות. אנא נסה שוב מאוחר יותר.")
             return States.MAIN_MENU
         
         word = words[0]
         
-        # הכנת הטקסט למילה
-        word_text = (
-            f"📝 *מילה אקראית*: *{word.english}*\n"
-        )
-        
-        # אם יש תרגום באנגלית, מציגים אותו
-        if word.translation:
-            word_text += f"🔤 תרגום באנגלית: *{word.translation}*\n"
-        
-        # אם יש תרגום לעברית, מציגים אותו
-        if word.hebrew:
-            word_text += f"🔤 תרגום לעברית: *{word.hebrew}*\n"
-        
-        # אם יש חלק דיבור, מציגים אותו
-        if word.part_of_speech:
-            word_text += f"📋 חלק דיבור: *{word.part_of_speech}*\n"
-        
-        # אם יש דוגמאות, מציגים אותן
-        if word.examples:
-            word_text += "\n📚 דוגמאות:\n"
-            for i, example in enumerate(word.examples[:2], 1):
-                word_text += f"{i}. {example}\n"
-        
-        # אם יש מילים נרדפות, מציגים אותן
-        if word.synonyms:
-            word_text += f"\n🔄 מילים נרדפות: {', '.join(word.synonyms)}"
-        
-        # כפתורים למשתמש
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{word.word_id}"),
-                InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{word.word_id}")
-            ],
-            [
-                InlineKeyboardButton("🔄 מילה אקראית נוספת", callback_data="practice_random"),
-                InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
-            ]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.message.reply_text(word_text, reply_markup=reply_markup, parse_mode='Markdown')
+        # הכרטיס של המילה מוכן מראש (נבנה בהצגה הראשונה שלה)
+        card = self.word_cards.card(word)
+        await update.message.reply_text(card.random_text, reply_markup=card.random_keyboard, parse_mode='Markdown')
         
         return States.PRACTICING
     
-    async def handle_practice_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> Union[States, None]:
+    async def handle_practice_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str,
+                                       profile: ProfileContext) -> Union[States, None]:
         """טיפול בלחיצות על כפתורים הקשורים לתרגול מילים"""
         query = update.callback_query
         
         if callback_data == "practice":
             # התחלת תרגול מילים חדש
-            user = query.from_user
-            user_profile = await self.get_user_profile(user.id)
-            user_profile = self.ensure_session_data(user_profile)
+            user_profile = await profile.get()
             
             # איפוס נתוני הסשן
             user_profile["session_data"]["current_word_set"] = []
             user_profile["session_data"]["current_word_index"] = 0
             user_profile["session_data"]["session_results"] = {}  # הוספנו איפוס של התוצאות
+            user_profile["session_data"].pop("quiz", None)
             if "last_feedback" in user_profile["session_data"]:
                 del user_profile["session_data"]["last_feedback"]
             
-            # בחירת 5 מילים אקראיות לתרגול
-            words = self.words_repo.get_random_words(5)
-            word_ids = [word.word_id for word in words]
+            # בחירת 5 מילים לתרגול
+            word_ids = self._session_words(user_profile, 5)
             user_profile["session_data"]["current_word_set"] = word_ids
-            await self.save_user_profile(user_profile)
+            profile.session_changed()
             
             # הצגת הודעת פתיחה לתרגול
-            practice_intro_text = (
-                "🔤 *התחלת סבב תרגול מילים*\n\n"
-                f"בחרתי {len(word_ids)} מילים עבורך לתרגול.\n"
-                "אציג כל מילה עם הפירוש והדוגמאות שלה, ואתה תסמן אם ידעת אותה או לא.\n\n"
-                "בוא נתחיל!"
-            )
-            
-            keyboard = [
-                [InlineKeyboardButton("👉 הצג את המילה הראשונה", callback_data="practice_show_word")]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(practice_intro_text, reply_markup=reply_markup, parse_mode='Markdown')
+            await query.edit_message_text(_practice_intro_text(len(word_ids)), reply_markup=PRACTICE_INTRO_KEYBOARD,
+                                          parse_mode='Markdown')
             
             return States.PRACTICING
         
@@ -168,59 +206,52 @@ class PracticeModule:
         
         elif callback_data == "practice_show_word":
             # הצגת מילה לתרגול
-            return await self.show_practice_word(update, context)
+            return await self.show_practice_word(update, context, profile)
         
         elif callback_data == "practice_next":
             # מעבר למילה הבאה בתרגול
-            user_profile = await self.get_user_profile(query.from_user.id)
-            user_profile = self.ensure_session_data(user_profile)
+            user_profile = await profile.get()
             user_profile["session_data"]["current_word_index"] += 1
-            self.save_user_profile(user_profile)
-            return await self.show_practice_word(update, context)
+            profile.session_changed()
+            return await self.show_practice_word(update, context, profile)
         
         elif callback_data.startswith("practice_remembered_") or callback_data.startswith("practice_forgot_"):
             word_id = callback_data.split("_")[-1]
             remembered = callback_data.startswith("practice_remembered_")
             
             # שמירת התוצאה במילון התוצאות
-            user_id = query.from_user.id
-            user_profile = await self.get_user_profile(user_id)
-            user_profile = self.ensure_session_data(user_profile)
+            user_profile = await profile.get()
             
             # וידוא שיש מילון תוצאות
             if "session_results" not in user_profile["session_data"]:
                 user_profile["session_data"]["session_results"] = {}
             
-            # שמירת התוצאה
-            word = self.words_repo.get_word(word_id)
+            # שמירת התוצאה (מילה שהוסרה מקובץ המילים מאז שהוצגה נשמרת בלי הטקסט)
+            word = self.words_repo.current().get_word(word_id)
             user_profile["session_data"]["session_results"][word_id] = {
-                "word": word.english,
-                "hebrew": word.hebrew,
+                "word": word.english if word else "",
+                "hebrew": word.hebrew if word else "",
                 "remembered": remembered  # True אם זכר, False אם לא
             }
             
-            # עדכון האינדקס והשמירה
+            # עדכון האינדקס והמשוב למילה הבאה (נשמרים בסוף העדכון)
             user_profile["session_data"]["current_word_index"] += 1
-            await self.save_user_profile(user_profile)  # חשוב! לשמור את השינויים
-            
-            # מעבר ישיר למילה הבאה עם המשוב המתאים
-            user_profile = await self.get_user_profile(user_id)
-            user_profile = self.ensure_session_data(user_profile)
             user_profile["session_data"]["last_feedback"] = "✅ מצוין! המשך כך!\n\n" if remembered else "👨‍🎓 לא נורא, זה חלק מתהליך הלמידה!\n\n"
-            await self.save_user_profile(user_profile)
+            profile.session_changed()
             
             # מעבר ישיר למילה הבאה
-            return await self.show_practice_word(update, context)
+            return await self.show_practice_word(update, context, profile)
+        
+        elif callback_data.startswith("practice_quiz"):
+            # סבב מהיר: כל המילים בהודעה אחת
+            return await self.handle_quiz_callback(update, context, callback_data, profile)
         
         elif callback_data == "practice_random":
             # הצגת מילה אקראית חדשה
-            user = query.from_user
-            user_profile = await self.get_user_profile(user.id)
-            user_profile = self.ensure_session_data(user_profile)
-            level = user_profile["level"]
+            user_profile = await profile.get()
             
             # בחירת מילה אקראית
-            words = self.words_repo.get_random_words(1, difficulty=level)
+            words = self._random_words(1, user_profile)
             if not words:
                 await query.edit_message_text(
                     "לא נמצאו מילים מתאימות. אנא נסה שוב מאוחר יותר.",
@@ -232,59 +263,18 @@ class PracticeModule:
             
             word = words[0]
             
-            # הכנת הטקסט למילה
-            word_text = (
-                f"📝 *מילה אקראית*: *{word.english}*\n"
-            )
-            
-            # אם יש תרגום באנגלית, מציגים אותו
-            if word.translation:
-                word_text += f"🔤 תרגום באנגלית: *{word.translation}*\n"
-            
-            # אם יש תרגום לעברית, מציגים אותו
-            if word.hebrew:
-                word_text += f"🔤 תרגום לעברית: *{word.hebrew}*\n"
-            
-            # אם יש חלק דיבור, מציגים אותו
-            if word.part_of_speech:
-                word_text += f"📋 חלק דיבור: *{word.part_of_speech}*\n"
-            
-            # אם יש דוגמאות, מציגים אותן
-            if word.examples:
-                word_text += "\n📚 דוגמאות:\n"
-                for i, example in enumerate(word.examples[:2], 1):
-                    word_text += f"{i}. {example}\n"
-            
-            # אם יש מילים נרדפות, מציגים אותן
-            if word.synonyms:
-                word_text += f"\n🔄 מילים נרדפות: {', '.join(word.synonyms)}"
-            
-            # כפתורים למשתמש
-            keyboard = [
-                [
-                    InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{word.word_id}"),
-                    InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{word.word_id}")
-                ],
-                [
-                    InlineKeyboardButton("🔄 מילה אקראית נוספת", callback_data="practice_random"),
-                    InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
-                ]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(word_text, reply_markup=reply_markup, parse_mode='Markdown')
+            card = self.word_cards.card(word)
+            await query.edit_message_text(card.random_text, reply_markup=card.random_keyboard, parse_mode='Markdown')
             
             return States.PRACTICING
         
         # אם הגענו לכאן, הכפתור לא טופל
         return None
     
-    async def show_practice_word(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> States:
+    async def show_practice_word(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext) -> States:
         """הצגת מילה לתרגול"""
         query = update.callback_query
-        user_id = query.from_user.id
-        user_profile = await self.get_user_profile(user_id)
-        user_profile = self.ensure_session_data(user_profile)
+        user_profile = await profile.get()
         
         # קבלת מידע על המילה הנוכחית
         word_ids = user_profile["session_data"]["current_word_set"]
@@ -293,103 +283,129 @@ class PracticeModule:
         # בדיקה אם סיימנו את הסט
         if current_index >= len(word_ids):
             results = user_profile["session_data"].get("session_results", {})
-            total_words = len(word_ids)
-            correct = sum(1 for r in results.values() if r.get("remembered", False))
-            
-            summary = (
-                f"כל הכבוד! סיימת את מפגש התרגול 🎉\n"
-                f"ידעת {correct} מתוך {total_words} מילים!\n\n"
-                "סיכום המילים:\n"
-            )
-            
-            # עוברים על כל המילים ומציגים את התוצאה האמיתית מהתרגול
-            for i, word_id in enumerate(word_ids, 1):
-                word = self.words_repo.get_word(word_id)
-                result = results.get(word_id, {})
-                mark = "✅" if result.get("remembered", False) else "❌"
-                summary += f"{i}. {word.english} - {word.hebrew} {mark}\n"
+            answers = {word_id: result.get("remembered", False) for word_id, result in results.items()}
             
             # עדכון רשימת המילים שהמשתמש למד
-            if correct > 0 or total_words > 0:  # אם יש תוצאות כלשהן
-                # וידוא שיש מילון words_knowledge
-                if "words_knowledge" not in user_profile:
-                    user_profile["words_knowledge"] = {}
-                
-                # עדכון רמת הידע של כל מילה בהתאם לתוצאות
-                for word_id, result in results.items():
-                    # אם המילה לא קיימת במילון, נאתחל אותה ל-0
-                    if word_id not in user_profile["words_knowledge"]:
-                        user_profile["words_knowledge"][word_id] = 0
-                    
-                    # עדכון הציון: +1 אם זכר, -1 אם לא זכר
-                    if result.get("remembered", False):
-                        user_profile["words_knowledge"][word_id] += 1
-                    else:
-                        user_profile["words_knowledge"][word_id] -= 1
-                
-                # שמירת הפרופיל המעודכן
-                await self.save_user_profile(user_profile)
-            
-            summary += "\nרוצה לתרגל עוד מילים?"
+            if answers:
+                await self._record_results(user_profile, answers, profile)
             
-            await query.edit_message_text(
-                summary,
-                reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("✅ כן, תן לי עוד", callback_data="practice")],
-                    [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
-                ])
-            )
+            await query.edit_message_text(self._session_summary(word_ids, answers),
+                                          reply_markup=PRACTICE_SUMMARY_KEYBOARD)
             return States.MAIN_MENU
         
         # קבלת המילה הנוכחית
         current_word_id = word_ids[current_index]
-        word = self.words_repo.get_word(current_word_id)
+        word = self.words_repo.current().get_word(current_word_id)
         
         if not word:
             logger.error(f"לא נמצאה מילה עם מזהה {current_word_id}")
             user_profile["session_data"]["current_word_index"] += 1
-            await self.save_user_profile(user_profile)
-            return await self.show_practice_word(update, context)
-        
-        # הכנת הטקסט למילה
-        word_text = ""
-        
-        # הוספת המשוב מהמילה הקודמת אם קיים
-        if "last_feedback" in user_profile["session_data"]:
-            word_text += user_profile["session_data"]["last_feedback"]
-            del user_profile["session_data"]["last_feedback"]  # מחיקת המשוב אחרי השימוש
-            await self.save_user_profile(user_profile)
-        
-        word_text += f"📝 מילה #{current_index + 1}/{len(word_ids)}: *{word.english}*\n"
-        word_text += f"🔤 תרגום לעברית: *{word.hebrew}*\n\n"
-        
-        # אם יש דוגמאות, מציגים אותן
-        if word.examples:
-            word_text += "📚 דוגמאות:\n"
-            for i, example in enumerate(word.examples[:2], 1):
-                word_text += f"{i}. {example}\n"
-            word_text += "\n"
-        
-        # אם יש חלק דיבור, מציגים אותו
-        if word.part_of_speech:
-            word_text += f"({word.part_of_speech})\n"
-        
-        # אם יש מילים נרדפות, מציגים אותן
-        if word.synonyms:
-            word_text += f"\n🔄 מילים נרדפות: {', '.join(word.synonyms)}"
-        
-        # כפתורים למשתמש
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{current_word_id}"),
-                InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{current_word_id}")
-            ],
-            [
-                InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
-            ]
+            profile.session_changed()
+            return await self.show_practice_word(update, context, profile)
+        
+        # המשוב מהמילה הקודמת, אם קיים, מוצג פעם אחת
+        feedback = user_profile["session_data"].pop("last_feedback", "")
+        if feedback:
+            profile.session_changed()
+        
+        word_text = self.word_cards.practice_text(word, current_index, len(word_ids), feedback)
+        card = self.word_cards.card(word)
+        await query.edit_message_text(word_text, reply_markup=card.practice_keyboard, parse_mode='Markdown')
+        
+        return States.PRACTICING
+    
+    def _quiz_keyboard(self, words: List, nonce: str, mask: int) -> InlineKeyboardMarkup:
+        """
+        המקלדת של סבב מהיר: כפתור סימון לכל מילה וכפתור שליחה (None - מילה
+        שהוסרה מקובץ המילים מאז שהסבב התחיל)
+        
+        הביט ה-i במסכה דולק אם המשתמש סימן שידע את המילה ה-i. כל כפתור
+        נושא את המסכה הנוכחית, כך שסימון לא צריך לשמור דבר בסשן, ואת המזהה
+        של הסבב (nonce) - לחיצה בהודעה של סבב אחר נדחית.
+        """
+        buttons = [
+            InlineKeyboardButton(f"{'✅' if mask >> i & 1 else '⬜'} {word.english if word else '…'}",
+                                 callback_data=f"practice_quiz_t_{nonce}_{mask}_{i}")
+            for i, word in enumerate(words)
         ]
+        keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+        keyboard.append([
+            InlineKeyboardButton("📨 שליחה", callback_data=f"practice_quiz_done_{nonce}_{mask}"),
+            InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
+        ])
+        return InlineKeyboardMarkup(keyboard)
+    
+    async def handle_quiz_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str,
+                                   profile: ProfileContext) -> States:
+        """
+        סבב מהיר: כל המילים מוצגות בהודעה אחת, המשתמש מסמן את המילים שידע
+        ושולח פעם אחת. סימון רק מחליף את המקלדת של ההודעה, והתוצאות של כל
+        הסבב נרשמות בשמירה אחת של הפרופיל.
+        """
+        query = update.callback_query
+        user_profile = await profile.get()
+        session = user_profile["session_data"]
+        
+        if callback_data == "practice_quiz":
+            word_ids = session.get("current_word_set") or []
+            if session.get("current_word_index", 0) > 0 or not word_ids:
+                # הסבב הנוכחי כבר התחיל (או הסתיים) - מילים חדשות
+                word_ids = self._session_words(user_profile, QUIZ_WORDS)
+            word_ids = [word_id for word_id in word_ids[:QUIZ_WORDS] if self.words_repo.current().get_word(word_id)]
+            if not word_ids:
+                await query.edit_message_text(
+                    "לא נמצאו מילים מתאימות. אנא נסה שוב מאוחר יותר.",
+                    reply_markup=InlineKeyboardMarkup([
+                        [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
+                    ])
+                )
+                return States.MAIN_MENU
+            
+            session["current_word_set"] = word_ids
+            session["current_word_index"] = 0
+            session["session_results"] = {}
+            session.pop("last_feedback", None)
+            # מזהה הסבב - הלחיצות נבדקות מולו, כך שהודעה ישנה לא משנה את הסבב הנוכחי
+            session["quiz"] = nonce = secrets.token_hex(4)
+            profile.session_changed()
+            
+            words = [self.words_repo.current().get_word(word_id) for word_id in word_ids]
+            quiz_text = (
+                "📋 *סבב מהיר*\n\n"
+                "סמן את המילים שידעת ולחץ על שליחה:\n\n"
+                + "".join(f"{i}. {self.word_cards.card(word).quiz_line}\n" for i, word in enumerate(words, 1))
+            )
+            await query.edit_message_text(quiz_text, reply_markup=self._quiz_keyboard(words, nonce, 0),
+                                          parse_mode='Markdown')
+            return States.PRACTICING
+        
+        word_ids = session.get("current_word_set") or []
+        parts = callback_data.split("_")
+        nonce = session.get("quiz")
+        try:
+            mask = int(parts[4])
+            index = int(parts[5]) if parts[2] == "t" else 0
+        except (IndexError, ValueError):
+            mask = index = -1
+        if not nonce or parts[3] != nonce or not 0 <= mask < 1 << len(word_ids) or not 0 <= index < len(word_ids):
+            # ההודעה שייכת לסבב שכבר נשלח או הוחלף בסבב אחר
+            await query.answer("הסבב הזה כבר הסתיים")
+            return States.MAIN_MENU
+        
+        if parts[2] == "t":
+            # סימון או ביטול סימון של מילה - רק המקלדת משתנה
+            mask ^= 1 << index
+            words = [self.words_repo.current().get_word(word_id) for word_id in word_ids]
+            await query.edit_message_reply_markup(reply_markup=self._quiz_keyboard(words, nonce, mask))
+            return States.PRACTICING
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(word_text, reply_markup=reply_markup, parse_mode='Markdown')
+        # שליחה: סיום הסבב לפני הרישום, כך שלחיצה כפולה לא תרשום פעמיים
+        answers = {word_id: bool(mask >> i & 1) for i, word_id in enumerate(word_ids)}
+        session.pop("quiz", None)
+        session["current_word_set"] = []
+        session["current_word_index"] = 0
+        await self._record_results(user_profile, answers, profile)
         
-        return States.PRACTICING
\ No newline at end of file
+        await query.edit_message_text(self._session_summary(word_ids, answers),
+                                      reply_markup=PRACTICE_SUMMARY_KEYBOARD)
+        return States.MAIN_MENU
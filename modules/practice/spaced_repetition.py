@@ -0,0 +1,101 @@
+"""
+חזרה מרווחת (spaced repetition) בשיטת SM-2
+
+כל תשובה על מילה קובעת מתי לחזור עליה: תשובה נכונה מגדילה את המרווח
+(יום, שישה ימים, ואחר כך המרווח הקודם כפול מקדם הגדילה של המילה), ותשובה
+שגויה מחזירה את המילה לחזרה בעוד כמה דקות ומקטינה את מקדם הגדילה שלה.
+התשובות הן "זכרתי" / "לא זכרתי", ולכן הן מתורגמות לציוני האיכות של SM-2 (4 ו-1).
+
+ההתקדמות נשמרת ב-word_progress של הפרופיל (UserWordProgress), ומועדי החזרה
+נשלפים מהערימה של המשתמש ב-UserRepository.due_words.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from models import UserWordProgress, WordStatus
+
+# ציוני האיכות של SM-2 (0-5) לתשובה נכונה ולתשובה שגויה
+QUALITY_REMEMBERED = 4
+QUALITY_FORGOT = 1
+MIN_EASE = 1.3
+# מרווחים בימים: אחרי התשובה הנכונה הראשונה והשנייה, ואחרי תשובה שגויה
+FIRST_INTERVAL = 1.0
+SECOND_INTERVAL = 6.0
+RELEARN_INTERVAL = 10 / (24 * 60)
+# מילה שהמרווח שלה הגיע לכך (בימים) נחשבת נלמדה
+MASTERED_INTERVAL = 21.0
+REVIEW_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def review(progress: UserWordProgress, remembered: bool, now: datetime) -> UserWordProgress:
+    """
+    עדכון ההתקדמות במילה לפי תשובה אחת
+
+    Args:
+        progress: ההתקדמות הנוכחית במילה (לא משתנה)
+        remembered: האם המשתמש זכר את המילה
+        now: זמן התשובה
+
+    Returns:
+        ההתקדמות החדשה, עם מועד החזרה הבא
+    """
+    quality = QUALITY_REMEMBERED if remembered else QUALITY_FORGOT
+    ease = max(MIN_EASE, progress.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if not remembered:
+        interval = RELEARN_INTERVAL
+    elif progress.interval < FIRST_INTERVAL:
+        interval = FIRST_INTERVAL
+    elif progress.interval < SECOND_INTERVAL:
+        interval = SECOND_INTERVAL
+    else:
+        interval = round(progress.interval * ease, 1)
+    repetitions = progress.repetitions + 1
+    return UserWordProgress(
+        progress.word_id,
+        status=WordStatus.MASTERED if interval >= MASTERED_INTERVAL else WordStatus.LEARNING,
+        repetitions=repetitions,
+        success_rate=round((progress.success_rate * progress.repetitions + remembered) / repetitions, 3),
+        next_review=(now + timedelta(days=interval)).strftime(REVIEW_TIME_FORMAT),
+        interval=interval,
+        ease=round(ease, 2),
+    )
+
+
+class SpacedRepetition:
+    """תזמון החזרות של המשתמשים מעל מאגר המשתמשים"""
+
+    def __init__(self, user_repo):
+        self.user_repo = user_repo
+
+    def due_words(self, user_profile: Dict, count: int, now: Optional[datetime] = None) -> List[str]:
+        """עד count מילים שהגיע מועד החזרה עליהן, מהמוקדמת למאוחרת"""
+        now = now or datetime.now()
+        return self.user_repo.due_words(user_profile, count, now.strftime(REVIEW_TIME_FORMAT))
+
+    async def reviews(self, user_profile: Dict, answers: Dict[str, bool],
+                      now: Optional[datetime] = None) -> List[UserWordProgress]:
+        """
+        ההתקדמות החדשה של המילים לפי התשובות של סבב (בלי לשמור)
+
+        Args:
+            user_profile: פרופיל המשתמש
+            answers: מזהה מילה -> האם המשתמש זכר אותה
+        """
+        now = now or datetime.now()
+        # ההתקדמות נקראת מהפרופיל שכבר בידי הקורא - בלי קריאה נוספת של הפרופיל לכל מילה
+        return [
+            review(self.user_repo.word_progress(user_profile, word_id), remembered, now)
+            for word_id, remembered in answers.items()
+        ]
+
+    async def record_answers(self, user_profile: Dict, answers: Dict[str, bool],
+                             now: Optional[datetime] = None) -> bool:
+        """
+        עדכון מועדי החזרה לפי התשובות של סבב (כל תשובה מעדכנת את המילה שלה)
+
+        Returns:
+            האם הפרופיל נשמר בהצלחה
+        """
+        updated = await self.reviews(user_profile, answers, now)
+        return await self.user_repo.update_user_words_progress(user_profile["user_id"], updated)
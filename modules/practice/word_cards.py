@@ -0,0 +1,128 @@
+"""
+כרטיסי מילים מוכנים מראש להודעות התרגול
+
+הטקסט של כרטיס (אנגלית, תרגום, עברית, חלק דיבור, שתי דוגמאות ומילים נרדפות)
+והמקלדות שלו נבנים פעם אחת לכל מילה, עם הבריחה של תווי ה-Markdown, ונשמרים
+לפי word_id. בכל לחיצה נשאר רק להוסיף את הכותרת המשתנה (מספר המילה בסבב
+והמשוב על התשובה הקודמת). המקלדות של telegram לא ניתנות לשינוי, ולכן אותו
+אובייקט משמש את כל ההודעות.
+
+כשמאגר המילים נטען מחדש (הגרסה שלו משתנה) כל הכרטיסים נבנים מחדש.
+"""
+
+from typing import Dict, NamedTuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
+
+from models import Word
+
+
+class WordCard(NamedTuple):
+    """הטקסטים והמקלדות של מילה, מוכנים לשליחה"""
+    random_text: str                       # כרטיס "מילה אקראית" המלא
+    random_keyboard: InlineKeyboardMarkup
+    practice_title: str                    # המילה באנגלית, לשורת הכותרת של סבב התרגול
+    practice_body: str                     # שאר הכרטיס בסבב התרגול
+    practice_keyboard: InlineKeyboardMarkup
+    quiz_line: str                         # המילה והתרגום, לשורה ברשימה של סבב מהיר
+
+
+def _plain(text: str) -> str:
+    """טקסט מחוץ להדגשה - בריחה של תווי ה-Markdown"""
+    return escape_markdown(text, version=1)
+
+
+def _bold(text: str) -> str:
+    """טקסט מודגש - ב-Markdown הישן אין בריחה בתוך הדגשה, ולכן רק '*' מוסר"""
+    return f"*{text.replace('*', '')}*"
+
+
+def _answer_row(word_id: str) -> list:
+    return [
+        InlineKeyboardButton("✅ זכרתי", callback_data=f"practice_remembered_{word_id}"),
+        InlineKeyboardButton("❌ לא זכרתי", callback_data=f"practice_forgot_{word_id}")
+    ]
+
+
+def build_card(word: Word) -> WordCard:
+    """בניית הכרטיס של מילה"""
+    examples = [f"{i}. {_plain(example)}\n" for i, example in enumerate(word.examples[:2], 1)]
+    synonyms = _plain(", ".join(word.synonyms))
+
+    random_text = f"📝 *מילה אקראית*: {_bold(word.english)}\n"
+    if word.translation:
+        random_text += f"🔤 תרגום באנגלית: {_bold(word.translation)}\n"
+    if word.hebrew:
+        random_text += f"🔤 תרגום לעברית: {_bold(word.hebrew)}\n"
+    if word.part_of_speech:
+        random_text += f"📋 חלק דיבור: {_bold(word.part_of_speech)}\n"
+    if examples:
+        random_text += "\n📚 דוגמאות:\n" + "".join(examples)
+    if word.synonyms:
+        random_text += f"\n🔄 מילים נרדפות: {synonyms}"
+
+    practice_body = f"🔤 תרגום לעברית: {_bold(word.hebrew)}\n\n" if word.hebrew else "\n"
+    if examples:
+        practice_body += "📚 דוגמאות:\n" + "".join(examples) + "\n"
+    if word.part_of_speech:
+        practice_body += f"({_plain(word.part_of_speech)})\n"
+    if word.synonyms:
+        practice_body += f"\n🔄 מילים נרדפות: {synonyms}"
+
+    return WordCard(
+        random_text=random_text,
+        random_keyboard=InlineKeyboardMarkup([
+            _answer_row(word.word_id),
+            [
+                InlineKeyboardButton("🔄 מילה אקראית נוספת", callback_data="practice_random"),
+                InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")
+            ]
+        ]),
+        practice_title=_bold(word.english),
+        practice_body=practice_body,
+        practice_keyboard=InlineKeyboardMarkup([
+            _answer_row(word.word_id),
+            [InlineKeyboardButton("🔙 חזרה לתפריט", callback_data="back_to_menu")]
+        ]),
+        quiz_line=f"{_bold(word.english)} - {_plain(word.hebrew)}" if word.hebrew else _bold(word.english),
+    )
+
+
+class WordCardCache:
+    """הכרטיסים של המילים שהוצגו, לפי word_id, לגרסה הנוכחית של מאגר המילים"""
+
+    def __init__(self, words_repo):
+        self.words_repo = words_repo
+        self._cards: Dict[str, WordCard] = {}
+        self._version = words_repo.version
+        self.hits = 0
+        self.builds = 0
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def card(self, word: Word) -> WordCard:
+        """הכרטיס של מילה (נבנה בהצגה הראשונה שלה)"""
+        if self.words_repo.current().version != self.words_repo.version:
+            # עדכון שהתחיל לפני טעינה מחדש של המילים - הכרטיס לא נשמר במטמון של הגרסה החדשה
+            return build_card(word)
+        if self._version != self.words_repo.version:
+            # המילים נטענו מחדש - כרטיס ישן יכול להציג נתונים שהשתנו
+            self._cards = {}
+            self._version = self.words_repo.version
+        card = self._cards.get(word.word_id)
+        if card is None:
+            card = self._cards[word.word_id] = build_card(word)
+            self.builds += 1
+        else:
+            self.hits += 1
+        return card
+
+    def practice_text(self, word: Word, index: int, total: int, feedback: str = "") -> str:
+        """הטקסט של מילה בסבב תרגול: המשוב על התשובה הקודמת, הכותרת והכרטיס"""
+        card = self.card(word)
+        return f"{feedback}📝 מילה #{index + 1}/{total}: {card.practice_title}\n{card.practice_body}"
+
+    def stats(self) -> Dict[str, int]:
+        return {"cards": len(self._cards), "card_hits": self.hits, "card_builds": self.builds}
@@ -0,0 +1,282 @@
+"""
+דגימה משוקללת של מילים לפי מה שהמשתמש כבר יודע
+
+לכל משתמש פעיל נבנה עץ פנוויק (Fenwick tree) של משקלים מעל המילים המועמדות:
+מילים שלא נראו, מילים חלשות (ציון ידע לא חיובי) ומילים שהגיע מועד החזרה עליהן
+מקבלות משקל גבוה, ומילה ידועה מקבלת משקל שקטן ככל שהציון שלה עולה.
+דגימה של מילה היא O(log n), ועדכון המשקל של מילה אחרי תשובה הוא O(log n) -
+בלי לבנות מחדש את העץ.
+
+רשימת המילים המועמדות והמיקום של כל מילה בה (WordCandidates) משותפות לכל
+המשתמשים באותה גרסה של מאגר המילים ובאותה רמת קושי; לכל משתמש נשמרים רק
+המשקלים והעץ, במערכי float צפופים.
+
+המשקלים מחושבים לפי words_knowledge ו-word_progress של הפרופיל. מילה שמועד
+החזרה עליה הגיע אחרי בניית העץ שומרת את המשקל הקודם שלה עד העדכון הבא שלה -
+את המילים האלה מכניס לסבבים התזמון (SpacedRepetition).
+"""
+
+import random
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from modules.practice.spaced_repetition import REVIEW_TIME_FORMAT
+
+WEIGHT_DUE = 6.0
+WEIGHT_WEAK = 5.0
+WEIGHT_UNSEEN = 4.0
+# משקל מילה ידועה: WEIGHT_KNOWN / (1 + ציון)
+WEIGHT_KNOWN = 2.0
+
+# פונקציית משקל: (ציון הידע או None, ההתקדמות במילה או None, הזמן הנוכחי) -> משקל
+WeightFunction = Callable[[Optional[int], Optional[Dict], str], float]
+
+
+def practice_weight(score: Optional[int], progress: Optional[Dict], now: str) -> float:
+    """
+    משקל מילה בסבב תרגול
+
+    מילה שמתוזמנת לחזרה בעתיד לא נדגמת (משקל 0) - היא תחזור במועד שלה.
+    """
+    next_review = progress.get("next_review") if progress else None
+    if next_review:
+        return WEIGHT_DUE if next_review <= now else 0.0
+    if score is None:
+        return WEIGHT_UNSEEN
+    if score <= 0:
+        return WEIGHT_WEAK
+    return WEIGHT_KNOWN / (1 + score)
+
+
+def review_weight(score: Optional[int], progress: Optional[Dict], now: str) -> float:
+    """משקל מילה בחזרה על מילים שנלמדו: רק מילים עם ציון חיובי, והחלשות מביניהן קודם"""
+    if not score or score <= 0:
+        return 0.0
+    next_review = progress.get("next_review") if progress else None
+    if next_review and next_review <= now:
+        return WEIGHT_DUE
+    return WEIGHT_KNOWN / score
+
+
+class FenwickTree:
+    """סכומי קידומת של משקלים, עם עדכון משקל וחיפוש לפי סכום ב-O(log n)"""
+
+    def __init__(self, weights: Sequence[float]):
+        self.weights = array('d', weights)
+        size = len(self.weights)
+        tree = array('d', [0.0]) + self.weights
+        # בנייה ב-O(n): כל צומת מעביר את הסכום שלו להורה שלו
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._top = 1 << (size.bit_length() - 1) if size else 0
+        self.total = sum(self.weights)
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def set(self, index: int, weight: float) -> None:
+        """קביעת המשקל של פריט"""
+        delta = weight - self.weights[index]
+        if not delta:
+            return
+        self.weights[index] = weight
+        self.total += delta
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def find(self, target: float) -> int:
+        """הפריט שבו סכום הקידומת עובר את target (0 <= target < total)"""
+        tree = self._tree
+        position = 0
+        step = self._top
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] <= target:
+                position = following
+                target -= tree[following]
+            step >>= 1
+        return position
+
+
+class WordCandidates:
+    """המילים המועמדות לדגימה והמיקום של כל אחת מהן - משותפות לדוגמים של כל המשתמשים"""
+
+    def __init__(self, word_ids: Sequence[str]):
+        self.word_ids = tuple(word_ids)
+        self.positions = {word_id: position for position, word_id in enumerate(self.word_ids)}
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+
+class WordSampler:
+    """דגימה משוקללת, בלי חזרות, מתוך מילים מועמדות של משתמש אחד"""
+
+    def __init__(self, candidates: Union[WordCandidates, Sequence[str]], user_profile: Dict,
+                 weight: WeightFunction, now: Optional[str] = None):
+        """
+        Args:
+            candidates: המילים המועמדות (WordCandidates משותף, או רשימת מזהים)
+            user_profile: פרופיל המשתמש (words_knowledge ו-word_progress)
+            weight: פונקציית המשקל של מילה
+        """
+        now = now or datetime.now().strftime(REVIEW_TIME_FORMAT)
+        if not isinstance(candidates, WordCandidates):
+            candidates = WordCandidates(candidates)
+        self.word_ids = candidates.word_ids
+        self.weight = weight
+        self._positions = candidates.positions
+        knowledge = user_profile.get("words_knowledge") or {}
+        progress_map = user_profile.get("word_progress") or {}
+        self._tree = FenwickTree([
+            weight(knowledge.get(word_id), progress_map.get(word_id), now) for word_id in self.word_ids
+        ])
+        self.available = sum(1 for value in self._tree.weights if value > 0)
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    def update(self, word_id: str, user_profile: Dict, now: Optional[str] = None) -> None:
+        """חישוב מחדש של המשקל של מילה אחרי שהציון או ההתקדמות שלה השתנו"""
+        position = self._positions.get(word_id)
+        if position is None:
+            return
+        now = now or datetime.now().strftime(REVIEW_TIME_FORMAT)
+        progress = (user_profile.get("word_progress") or {}).get(word_id)
+        score = (user_profile.get("words_knowledge") or {}).get(word_id)
+        self._set(position, self.weight(score, progress, now))
+
+    def _set(self, position: int, weight: float) -> None:
+        self.available += (weight > 0) - (self._tree.weights[position] > 0)
+        self._tree.set(position, weight)
+
+    def sample(self, count: int, exclude: Sequence[str] = (), rng: Optional[random.Random] = None) -> List[str]:
+        """
+        עד count מילים שונות, כל אחת בהסתברות יחסית למשקל שלה
+
+        Args:
+            exclude: מילים שלא ייבחרו (למשל מילים שכבר בסבב)
+        """
+        rng = rng or random
+        tree = self._tree
+        removed: List[Tuple[int, float]] = []
+        for word_id in exclude:
+            position = self._positions.get(word_id)
+            if position is not None and tree.weights[position] > 0:
+                removed.append((position, tree.weights[position]))
+                self._set(position, 0.0)
+        chosen: List[str] = []
+        try:
+            while len(chosen) < count and self.available:
+                position = tree.find(rng.random() * tree.total)
+                if position >= len(tree) or tree.weights[position] <= 0:
+                    # שגיאת עיגול בסכומים - הגרלה חוזרת
+                    continue
+                chosen.append(self.word_ids[position])
+                # מילה שנבחרה יוצאת מההגרלה עד סוף הדגימה
+                removed.append((position, tree.weights[position]))
+                self._set(position, 0.0)
+        finally:
+            for position, weight in removed:
+                self._set(position, weight)
+        return chosen
+
+
+class WordSamplers:
+    """הדוגמים של המשתמשים הפעילים, במטמון LRU לפי משתמש"""
+
+    def __init__(self, words_repo, max_users: int = 1000):
+        """
+        Args:
+            words_repo: מאגר המילים (הדוגמים נבנים מחדש כשהמאגר נטען מחדש)
+            max_users: מספר המשתמשים המקסימלי שהדוגמים שלהם נשמרים
+        """
+        self.words_repo = words_repo
+        self.max_users = max_users
+        self._users: "OrderedDict[int, Tuple[int, Dict[tuple, WordSampler]]]" = OrderedDict()
+        # המילים המועמדות לפי רמת קושי, לגרסה הנוכחית של המאגר
+        self._candidates: Tuple[int, Dict[Optional[int], WordCandidates]] = (-1, {})
+        self.builds = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _user_samplers(self, user_id: int) -> Dict[tuple, WordSampler]:
+        version = self.words_repo.version
+        entry = self._users.get(user_id)
+        if entry is None or entry[0] != version:
+            entry = self._users[user_id] = (version, {})
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self.evictions += 1
+        return entry[1]
+
+    def candidates(self, difficulty: Optional[int] = None) -> WordCandidates:
+        """
+        המילים המועמדות ברמת קושי (None - כל המילים), משותפות לכל המשתמשים
+
+        אם אין מילים ברמה הזו (למשל לפני שהרמות כוילו) - כל המילים.
+        """
+        version = self.words_repo.version
+        if self._candidates[0] != version:
+            self._candidates = (version, {})
+        by_difficulty = self._candidates[1]
+        candidates = by_difficulty.get(difficulty)
+        if candidates is None:
+            word_ids = self.words_repo.get_word_ids(difficulty)
+            if word_ids or difficulty is None:
+                candidates = WordCandidates(word_ids)
+            else:
+                candidates = self.candidates()
+            by_difficulty[difficulty] = candidates
+        return candidates
+
+    def sampler(self, user_profile: Dict, weight: WeightFunction = practice_weight,
+                difficulty: Optional[int] = None) -> WordSampler:
+        """
+        הדוגם של המשתמש למילים ברמת קושי (None - כל המילים) ולפונקציית משקל
+
+        אם אין מילים ברמה הזו (למשל לפני שהרמות כוילו) - הדוגם הוא מעל כל המילים.
+        """
+        words = self.words_repo.current()
+        if words.version != self.words_repo.version:
+            # עדכון שהתחיל לפני טעינה מחדש של המילים - דוגם זמני מהגרסה שלו, מחוץ למטמון
+            word_ids = words.get_word_ids(difficulty) or words.get_word_ids()
+            return WordSampler(word_ids, user_profile, weight)
+        samplers = self._user_samplers(user_profile["user_id"])
+        key = (weight, difficulty)
+        sampler = samplers.get(key)
+        if sampler is None:
+            sampler = samplers[key] = WordSampler(self.candidates(difficulty), user_profile, weight)
+            self.builds += 1
+        return sampler
+
+    def sample(self, user_profile: Dict, count: int, weight: WeightFunction = practice_weight,
+               difficulty: Optional[int] = None, exclude: Sequence[str] = ()) -> List[str]:
+        """עד count מילים שונות לפי המשקלים של המשתמש"""
+        return self.sampler(user_profile, weight, difficulty).sample(count, exclude)
+
+    def record(self, user_profile: Dict, word_ids: Sequence[str]) -> None:
+        """עדכון המשקלים של מילים שהציון או ההתקדמות שלהן השתנו, בכל הדוגמים של המשתמש"""
+        entry = self._users.get(user_profile["user_id"])
+        if entry is None or entry[0] != self.words_repo.version:
+            return
+        now = datetime.now().strftime(REVIEW_TIME_FORMAT)
+        for sampler in entry[1].values():
+            for word_id in word_ids:
+                sampler.update(word_id, user_profile, now)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sampler_users": len(self._users), "sampler_candidate_lists": len(self._candidates[1]),
+                "sampler_builds": self.builds,
+                "sampler_evictions": self.evictions}
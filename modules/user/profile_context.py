@@ -0,0 +1,133 @@
+"""
+הפרופיל של משתמש לאורך עדכון אחד מטלגרם (unit of work)
+
+המטפל הראשי פותח ProfileContext לכל עדכון ומעביר אותו למודולים. הפרופיל
+נטען בפעם הראשונה שמודול מבקש אותו, וכל המודולים עובדים על אותו עותק;
+מודול שמשנה את הפרופיל רק מסמן זאת, והשמירה נעשית פעם אחת בסוף העדכון -
+שמירה של מצב הסשן בלבד, או של כל הפרופיל אם השתנו בו שדות אחרים.
+
+בזמן שההקשר פתוח נספרות כל הקריאות והשמירות של פרופילים ב-UserRepository
+(get_user, get_user_fields, save_user ו-save_session), גם כאלה שעוקפות את
+ההקשר או נעשות בתוך פעולות של המאגר, ועדכון שקרא או שמר יותר מפעם אחת
+נרשם ביומן.
+"""
+
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from storage.access_counters import start_counting, stop_counting
+
+logger = logging.getLogger(__name__)
+
+# מספר הקריאות והשמירות של פרופילים שעדכון אחד אמור להסתפק בהן
+READS_PER_UPDATE = 1
+WRITES_PER_UPDATE = 1
+
+
+class ProfileAccessStats:
+    """מוני הקריאות והשמירות של פרופילים, לפי עדכונים"""
+
+    def __init__(self):
+        self.updates = 0
+        self.reads = 0
+        self.writes = 0
+        self.max_reads = 0
+        self.max_writes = 0
+        self.over_budget = 0  # עדכונים שקראו או שמרו יותר מהמותר
+
+    def record(self, profile: "ProfileContext") -> None:
+        self.updates += 1
+        self.reads += profile.reads
+        self.writes += profile.writes
+        self.max_reads = max(self.max_reads, profile.reads)
+        self.max_writes = max(self.max_writes, profile.writes)
+        if profile.reads > READS_PER_UPDATE or profile.writes > WRITES_PER_UPDATE:
+            self.over_budget += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"profile_updates": self.updates, "profile_reads": self.reads, "profile_writes": self.writes,
+                "profile_max_reads": self.max_reads, "profile_max_writes": self.max_writes,
+                "profile_over_budget": self.over_budget}
+
+
+class ProfileContext:
+    """
+    טעינה אחת ושמירה אחת (לכל היותר) של פרופיל בעדכון
+
+    שימוש:
+        async with user_module.profile_context(user_id) as profile:
+            user_profile = await profile.get()
+            ...
+            profile.session_changed()
+    """
+
+    def __init__(self, user_id: int, load: Callable[[int], Awaitable[Tuple[Dict, bool]]],
+                 save_profile: Callable[[Dict], Awaitable[bool]],
+                 save_session: Callable[[Dict], Awaitable[bool]],
+                 access_stats: Optional[ProfileAccessStats] = None):
+        """
+        Args:
+            user_id: מזהה המשתמש של העדכון
+            load: טעינת הפרופיל (כולל מצב הסשן); מחזירה גם האם הפרופיל חדש ועוד לא נשמר
+            save_profile: שמירת כל הפרופיל
+            save_session: שמירת מצב הסשן בלבד
+            access_stats: מונים משותפים שהעדכון נוסף אליהם בסגירה
+        """
+        self.user_id = user_id
+        self._load = load
+        self._save_profile = save_profile
+        self._save_session = save_session
+        self.access_stats = access_stats
+        self._profile: Optional[Dict] = None
+        self._changed = False
+        self._session_changed = False
+        self._token = None
+        self.reads = 0
+        self.writes = 0
+
+    async def __aenter__(self) -> "ProfileContext":
+        self._token = start_counting(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            # גם אם המטפל נכשל - השינויים שכבר נעשו נשמרים, כמו בשמירה אחרי כל שינוי
+            await self.commit()
+        finally:
+            stop_counting(self._token)
+            if self.access_stats is not None:
+                self.access_stats.record(self)
+            if self.reads > READS_PER_UPDATE or self.writes > WRITES_PER_UPDATE:
+                logger.warning(
+                    f"Update for user {self.user_id} read the profile {self.reads} times "
+                    f"and saved it {self.writes} times"
+                )
+
+    async def get(self) -> Dict:
+        """הפרופיל של המשתמש, עם מבנה הסשן המלא (נטען בקריאה הראשונה בלבד)"""
+        if self._profile is None:
+            self._profile, created = await self._load(self.user_id)
+            if created:
+                self._changed = True
+        return self._profile
+
+    def changed(self) -> None:
+        """סימון שהשתנו שדות בפרופיל עצמו (לא רק מצב הסשן)"""
+        self._changed = True
+
+    def session_changed(self) -> None:
+        """סימון שמצב הסשן (session_data) השתנה"""
+        self._session_changed = True
+
+    async def commit(self) -> bool:
+        """
+        שמירה של מה שהשתנה מאז השמירה הקודמת
+
+        Returns:
+            האם השמירה הצליחה (True אם לא היה מה לשמור)
+        """
+        if self._profile is None or not (self._changed or self._session_changed):
+            return True
+        save = self._save_profile if self._changed else self._save_session
+        self._changed = self._session_changed = False
+        return await save(self._profile)
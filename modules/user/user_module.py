@@ -2,12 +2,14 @@
 מודול לניהול משתמשים ופרופילים
 """
 
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable
 from enum import Enum, auto
 from datetime import datetime
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 
+from modules.user.profile_context import ProfileAccessStats, ProfileContext
+
 class UserStates(Enum):
     """מצבי שיחה הקשורים למשתמש"""
     MAIN_MENU = auto()
@@ -15,6 +17,21 @@ class UserStates(Enum):
     SETTINGS = auto()
     PRACTICING = auto()
 
+# מקלדת התפריט הראשי לא משתנה - נבנית פעם אחת
+MAIN_MENU_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🎯 תרגול מילים", callback_data="practice"),
+        InlineKeyboardButton("🎮 משחקים", callback_data="games")
+    ],
+    [
+        InlineKeyboardButton("📖 סיפורים", callback_data="stories"),
+        InlineKeyboardButton("✍️ כתיבה", callback_data="writing")
+    ],
+    [
+        InlineKeyboardButton("⚙️ הגדרות", callback_data="settings")
+    ]
+])
+
 class UserModule:
     """מחלקה לניהול משתמשים ופרופילים"""
     
@@ -26,9 +43,26 @@ class UserModule:
             user_repo: מאגר נתוני המשתמשים
         """
         self.user_repo = user_repo
+        self.access_stats = ProfileAccessStats()
+    
+    def profile_context(self, user_id: int) -> ProfileContext:
+        """הקשר הפרופיל של עדכון אחד של המשתמש (טעינה אחת ושמירה אחת לכל היותר)"""
+        return ProfileContext(user_id, self._load_session_profile, self.save_user_profile,
+                              self.save_session_data, self.access_stats)
     
-    async def get_user_profile(self, user_id: int) -> Dict:
-        """קבלת פרופיל משתמש לפי מזהה"""
+    async def _load_session_profile(self, user_id: int) -> Tuple[Dict, bool]:
+        """הפרופיל עם מבנה הסשן המלא, והאם הוא חדש (פרופיל חדש נשמר בסוף העדכון)"""
+        created = []
+        user_profile = await self.get_user_profile(user_id, on_create=created.append)
+        return self.ensure_session_data(user_profile), bool(created)
+    
+    async def get_user_profile(self, user_id: int, on_create: Optional[Callable[[Dict], Any]] = None) -> Dict:
+        """
+        קבלת פרופיל משתמש לפי מזהה
+        
+        למשתמש חדש נוצר פרופיל ונשמר מיד, אלא אם הועבר on_create - ואז הפרופיל
+        החדש מועבר אליו במקום להישמר
+        """
         user_profile = await self.user_repo.get_user(user_id)
         
         if not user_profile:
@@ -46,7 +80,10 @@ class UserModule:
                     "conversation_context": {}
                 }
             }
-            await self.save_user_profile(user_profile)
+            if on_create is not None:
+                on_create(user_profile)
+            else:
+                await self.save_user_profile(user_profile)
         
         return user_profile
     
@@ -66,6 +103,22 @@ class UserModule:
             print(f"Error in save_user_profile: {e}")
             return False
     
+    async def save_session_data(self, user_profile: Dict) -> bool:
+        """
+        שמירת מצב הסשן של המשתמש בלבד (session_data), בלי לכתוב את שאר הפרופיל
+        
+        Args:
+            user_profile: פרופיל המשתמש שמצב הסשן שלו השתנה
+            
+        Returns:
+            האם השמירה הצליחה
+        """
+        try:
+            return await self.user_repo.save_session(user_profile)
+        except Exception as e:
+            print(f"Error in save_session_data: {e}")
+            return False
+    
     def ensure_session_data(self, user_profile: Dict) -> Dict:
         """
         וידוא שהמשתמש מכיל את כל הנתונים הדרושים למפגש הנוכחי
@@ -90,7 +143,8 @@ class UserModule:
         
         return user_profile
     
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> UserStates:
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                            profile: ProfileContext) -> UserStates:
         """טיפול בפקודת ההתחלה /start"""
         welcome_text = f"""
 ברוך הבא לבוט לימוד האנגלית, {update.effective_user.first_name}! 🎉
@@ -101,24 +155,30 @@ class UserModule:
         keyboard = [[InlineKeyboardButton("בוא נתחיל! 🚀", callback_data="back_to_menu")]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
+        # טעינת הפרופיל כבר עכשיו - פרופיל של משתמש שחוזר אחרי זמן רב משוחזר
+        # מהארכיון ונכנס למטמון לפני הלחיצה הבאה (ופרופיל חדש נשמר בסוף העדכון)
+        await profile.get()
+        
         await update.message.reply_text(welcome_text, reply_markup=reply_markup)
         return UserStates.MAIN_MENU
     
-    async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, use_reply: bool = False) -> UserStates:
+    async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext,
+                             use_reply: bool = False) -> UserStates:
         """
         הצגת התפריט הראשי
         
         Args:
             update: העדכון מהמשתמש
             context: הקונטקסט של השיחה
+            profile: הקשר הפרופיל של העדכון
             use_reply: האם לשלוח הודעה חדשה גם כאשר מדובר בקריאה מכפתור
         """
         user = update.effective_user
-        user_profile = await self.get_user_profile(user.id)
+        # הפרופיל מההקשר של העדכון - משתמש חדש נשמר פעם אחת, בסוף העדכון
+        user_profile = await profile.get()
         
         # חישוב סטטיסטיקות בסיסיות
-        words_knowledge = user_profile.get("words_knowledge", {})
-        words_learned = sum(1 for score in words_knowledge.values() if score > 0)
+        words_learned = self.user_repo.words_learned(user_profile)
         daily_streak = user_profile.get("daily_streak", 0)
         
         menu_text = f"""
@@ -134,21 +194,7 @@ class UserModule:
 מה תרצה לעשות היום?
 """
         
-        keyboard = [
-            [
-                InlineKeyboardButton("🎯 תרגול מילים", callback_data="practice"),
-                InlineKeyboardButton("🎮 משחקים", callback_data="games")
-            ],
-            [
-                InlineKeyboardButton("📖 סיפורים", callback_data="stories"),
-                InlineKeyboardButton("✍️ כתיבה", callback_data="writing")
-            ],
-            [
-                InlineKeyboardButton("⚙️ הגדרות", callback_data="settings")
-            ]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = MAIN_MENU_KEYBOARD
         
         if update.callback_query and not use_reply:
             # אם זו קריאה מכפתור, עדכן את ההודעה הקיימת
@@ -169,12 +215,10 @@ class UserModule:
         
         return UserStates.MAIN_MENU
     
-    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    async def profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, profile: ProfileContext) -> None:
         """טיפול בפקודת הפרופיל /profile"""
         user = update.effective_user
-        user_profile = await self.get_user_profile(user.id)
-        user_profile = self.ensure_session_data(user_profile)
-        await self.save_user_profile(user_profile)
+        user_profile = await profile.get()
         
         # חישוב אחוז התקדמות
         words_mastered = user_profile['progress']['words_mastered']
@@ -222,11 +266,13 @@ class UserModule:
                 parse_mode='Markdown'
             )
     
-    async def home_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> UserStates:
+    async def home_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                           profile: ProfileContext) -> UserStates:
         """טיפול בפקודת הבית /home"""
-        return await self.show_main_menu(update, context)
+        return await self.show_main_menu(update, context, profile)
     
-    async def handle_registration(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> UserStates:
+    async def handle_registration(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str,
+                                  profile: ProfileContext) -> UserStates:
         """
         טיפול בתהליך הרישום
         
@@ -234,18 +280,17 @@ class UserModule:
             update: עדכון מטלגרם
             context: הקשר השיחה
             callback_data: נתוני הכפתור שנלחץ
+            profile: הקשר הפרופיל של העדכון
             
         Returns:
             מצב השיחה הבא
         """
-        user = update.effective_user
-        user_profile = await self.get_user_profile(user.id)
-        
         # טיפול בבחירת רמה
         if callback_data.startswith("register_"):
+            user_profile = await profile.get()
             level = callback_data.replace("register_", "")
             user_profile["level"] = level
-            await self.save_user_profile(user_profile)
+            profile.changed()
             
             # הודעת אישור רישום
             level_emoji = {
@@ -295,25 +340,8 @@ class UserModule:
         
         return UserStates.MAIN_MENU
     
-    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> Optional[UserStates]:
-        """
-        טיפול בלחיצות על כפתורים הקשורים למשתמש
-        
-        Args:
-            update: עדכון מטלגרם
-            context: הקשר השיחה
-            callback_data: נתוני הכפתור שנלחץ
-            
-        Returns:
-            מצב השיחה הבא או None אם הכפתור לא טופל
-        """
-        if callback_data == "back_to_menu":
-            await self.show_main_menu(update, context)
-            return UserStates.MAIN_MENU
-        
-        return None
-    
-    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str) -> Optional[UserStates]:
+    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback_data: str,
+                              profile: ProfileContext) -> Optional[UserStates]:
         """
         טיפול בלחיצות על כפתורים הקשורים למשתמש
         
@@ -321,23 +349,23 @@ class UserModule:
             update: עדכון מטלגרם
             context: הקשר השיחה
             callback_data: נתוני הכפתור שנלחץ
+            profile: הקשר הפרופיל של העדכון
             
         Returns:
             מצב השיחה הבא או None אם הכפתור לא טופל
         """
         # טיפול בכפתורים הקשורים לרישום
         if callback_data.startswith("register_") or callback_data == "first_practice":
-            return await self.handle_registration(update, context, callback_data)
+            return await self.handle_registration(update, context, callback_data, profile)
         
         # טיפול בכפתורים הקשורים לפרופיל
         elif callback_data == "profile":
-            await self.profile_command(update, context)
+            await self.profile_command(update, context, profile)
             return UserStates.MAIN_MENU
         
         # טיפול בכפתורים הקשורים לסטטיסטיקות
         elif callback_data == "detailed_stats":
-            user = update.effective_user
-            user_profile = await self.get_user_profile(user.id)
+            user_profile = await profile.get()
             
             stats_text = f"""
 📊 *סטטיסטיקות מפורטות*:
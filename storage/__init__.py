@@ -0,0 +1,3 @@
+"""
+שכבות אחסון לנתוני המשתמשים - מטמון, כתיבה מושהית וגישה לקבצים
+"""
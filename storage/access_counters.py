@@ -0,0 +1,45 @@
+"""
+ספירת קריאות ושמירות של פרופילים לפי עדכון
+
+המאגר (UserRepository) מדווח כאן על כל קריאה ושמירה של פרופיל, בלי לדעת מי
+סופר אותן. מי שרוצה לספור (ProfileContext של עדכון מטלגרם) מתחיל ספירה עם
+אובייקט שיש לו מונים reads ו-writes, והספירה חלה על כל מה שרץ באותו הקשר
+של asyncio עד שהיא נעצרת.
+"""
+
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+_counter: ContextVar[Optional[Any]] = ContextVar("profile_access_counter", default=None)
+
+
+def start_counting(counter: Any) -> Token:
+    """
+    התחלת ספירה של הקריאות והשמירות בהקשר הנוכחי
+
+    Args:
+        counter: אובייקט עם מונים reads ו-writes
+
+    Returns:
+        אסימון לעצירת הספירה
+    """
+    return _counter.set(counter)
+
+
+def stop_counting(token: Token) -> None:
+    """עצירת הספירה שהתחילה עם האסימון"""
+    _counter.reset(token)
+
+
+def count_read() -> None:
+    """ספירת קריאה של פרופיל (אם יש ספירה פעילה)"""
+    counter = _counter.get()
+    if counter is not None:
+        counter.reads += 1
+
+
+def count_write() -> None:
+    """ספירת שמירה של פרופיל (אם יש ספירה פעילה)"""
+    counter = _counter.get()
+    if counter is not None:
+        counter.writes += 1
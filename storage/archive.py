@@ -0,0 +1,167 @@
+"""
+ארכיון של פרופילים לא פעילים - קובץ zip דחוס לכל תיקיית shard
+
+פרופיל שלא נכתב N ימים עובר מקובץ משלו לארכיון של ה-shard שלו. בטעינה הבאה
+(בדרך כלל ב-/start) הוא נקרא מהארכיון ונכתב שוב כקובץ רגיל. העותק שנשאר
+בארכיון מתיישן ונמחק בסבב הארכוב הבא של אותו shard.
+
+הרצה ידנית מתיקיית הפרויקט:
+    python -m storage.archive data/users --days 90
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import zipfile
+from typing import Dict, Iterable, Optional
+
+from storage.file_io import write_file_atomic
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_NAME = "archive.zip"
+
+
+def read_archived(archive_path: str, name: str) -> Optional[bytes]:
+    """קריאת קובץ מהארכיון (None אם אין ארכיון או שהקובץ לא בו)"""
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            return archive.read(name)
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def update_archive(archive_path: str, files: Dict[str, bytes], stale: Iterable[str] = ()) -> None:
+    """
+    כתיבת הארכיון מחדש: הקבצים הקיימים, בלי הישנים, ועם הקבצים החדשים
+
+    הארכיון נבנה בזיכרון ומחליף את הקודם בכתיבה אטומית, כך שקורא תמיד רואה ארכיון שלם.
+
+    Args:
+        archive_path: נתיב הארכיון
+        files: שם הקובץ בארכיון -> התוכן (מחליף קובץ קיים באותו שם)
+        stale: שמות קבצים להסרה מהארכיון (למשל פרופילים ששוחזרו)
+    """
+    drop = set(files).union(stale)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+        try:
+            with zipfile.ZipFile(archive_path) as source:
+                for info in source.infolist():
+                    if info.filename not in drop:
+                        target.writestr(info, source.read(info))
+        except FileNotFoundError:
+            pass
+        for name, data in files.items():
+            target.writestr(name, data)
+    write_file_atomic(archive_path, buffer.getvalue())
+
+
+class ArchiveReader:
+    """קריאה של קבצים מכמה ארכיונים, כשכל ארכיון נפתח פעם אחת (לסריקה של הרבה פרופילים)"""
+
+    def __init__(self):
+        self._archives: Dict[str, Optional[zipfile.ZipFile]] = {}
+
+    def read(self, archive_path: str, name: str) -> Optional[bytes]:
+        """קריאת קובץ מהארכיון (None אם אין ארכיון או שהקובץ לא בו)"""
+        if archive_path not in self._archives:
+            try:
+                self._archives[archive_path] = zipfile.ZipFile(archive_path)
+            except FileNotFoundError:
+                self._archives[archive_path] = None
+        archive = self._archives[archive_path]
+        if archive is None:
+            return None
+        try:
+            return archive.read(name)
+        except KeyError:
+            return None
+
+    def close(self) -> None:
+        for archive in self._archives.values():
+            if archive is not None:
+                archive.close()
+        self._archives = {}
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ProfileArchiver:
+    """ארכוב תקופתי ברקע של פרופילים שלא נכתבו זמן רב"""
+
+    def __init__(self, backend, max_idle_days: float = 90.0, interval: float = 24 * 3600.0):
+        """
+        Args:
+            backend: אחסון הקבצים (FileProfileBackend)
+            max_idle_days: אחרי כמה ימים בלי כתיבה פרופיל עובר לארכיון
+            interval: כל כמה שניות לחפש פרופילים לארכוב
+        """
+        self.backend = backend
+        self.max_idle_days = max_idle_days
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.archived = 0
+
+    async def archive_inactive(self) -> int:
+        """
+        סבב ארכוב אחד
+
+        Returns:
+            מספר הפרופילים שהועברו לארכיון
+        """
+        archived = await self.backend.archive_inactive(self.max_idle_days * 24 * 3600)
+        self.archived += archived
+        return archived
+
+    def start(self) -> None:
+        """התחלת הארכוב התקופתי ברקע (הסבב הראשון מיד)"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                archived = await self.archive_inactive()
+                if archived:
+                    logger.info(f"Archived {archived} inactive user profiles")
+            except Exception as e:
+                logger.error(f"Archiving inactive user profiles failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def main():
+    from storage.backends import FileProfileBackend
+
+    parser = argparse.ArgumentParser(description="העברת פרופילים לא פעילים לארכיון")
+    parser.add_argument("data_dir", help="תיקיית קבצי המשתמשים")
+    parser.add_argument("--days", type=float, default=90, help="אחרי כמה ימים בלי כתיבה פרופיל עובר לארכיון")
+    args = parser.parse_args()
+
+    async def run() -> int:
+        backend = FileProfileBackend(args.data_dir)
+        try:
+            await backend.migrate_layout()
+            return await ProfileArchiver(backend, args.days).archive_inactive()
+        finally:
+            await backend.close()
+
+    print(f"הועברו לארכיון {asyncio.run(run())} פרופילים.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+ממשק לאחסון פרופילי משתמשים, והמימוש הבסיסי שלו - קובץ לכל משתמש
+"""
+
+import asyncio
+import functools
+import hashlib
+import os
+import time
+import zipfile
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+from storage.archive import ARCHIVE_NAME, ArchiveReader, read_archived, update_archive
+from storage.file_io import FileIOExecutor, read_first, write_file_atomic
+from storage.review_index import earliest_review
+from storage.serializers import PROFILE_EXTENSIONS, WordIdTable, create_serializer, loads_profile
+
+
+class ProfileBackend:
+    """ממשק משותף לכל סוגי האחסון של פרופילי משתמשים"""
+
+    async def load(self, user_id: int) -> Optional[Dict]:
+        """טעינת פרופיל (None אם אין כזה)"""
+        raise NotImplementedError
+
+    async def load_fields(self, user_id: int, fields: Tuple[str, ...]) -> Optional[Dict]:
+        """
+        טעינה של חלק משדות הפרופיל בלבד (None אם אין פרופיל)
+
+        המימוש הבסיסי טוען את כל הפרופיל; אחסון שיודע לקרוא רק חלק ממנו
+        (למשל בלי שורות המילים) מחליף אותו.
+        """
+        profile = await self.load(user_id)
+        if profile is None:
+            return None
+        return {field: profile[field] for field in fields if field in profile}
+
+    async def store_many(self, profiles: List[Dict]) -> List[bool]:
+        """
+        שמירת כמה פרופילים יחד
+
+        Returns:
+            לכל פרופיל - האם נשמר בהצלחה
+        """
+        raise NotImplementedError
+
+    async def store(self, profile: Dict) -> bool:
+        """שמירת פרופיל אחד"""
+        return (await self.store_many([profile]))[0]
+
+    async def recent_user_ids(self, limit: int) -> List[int]:
+        """מזהי המשתמשים שהפרופיל שלהם עודכן לאחרונה (לחימום המטמון)"""
+        return []
+
+    async def user_ids(self) -> List[int]:
+        """מזהי כל המשתמשים שיש להם פרופיל, ממוינים"""
+        raise NotImplementedError
+
+    async def scan_profiles(self, fields: Optional[Tuple[str, ...]] = None,
+                            batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        מעבר על כל הפרופילים באחסון, באצוות (לעבודות אצווה ולכלי תחזוקה)
+
+        הפרופילים לא נכנסים למטמון של הבוט ולא משמשים בסיס לשמירה הבאה.
+
+        Args:
+            fields: רק השדות האלה מכל פרופיל (ו-user_id תמיד); None - הפרופיל המלא
+            batch_size: מספר הפרופילים שנקראים יחד
+        """
+        user_ids = await self.user_ids()
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            if fields is None:
+                profiles = await asyncio.gather(*(self.load(user_id) for user_id in batch))
+            else:
+                profiles = await asyncio.gather(*(self.load_fields(user_id, fields) for user_id in batch))
+            for user_id, profile in zip(batch, profiles):
+                if profile is not None:
+                    profile["user_id"] = user_id
+                    yield profile
+
+    async def earliest_reviews(self) -> Dict[int, str]:
+        """
+        מועד החזרה הקרוב ביותר (ISO) של כל משתמש שיש לו מילים לחזרה
+
+        המימוש הבסיסי סורק את word_progress של כל הפרופילים; אחסון עם אינדקס
+        על מועדי החזרה מחליף אותו בשאילתה.
+        """
+        earliest = {}
+        async for profile in self.scan_profiles(("word_progress",)):
+            moment = earliest_review(profile.get("word_progress"))
+            if moment:
+                earliest[profile["user_id"]] = moment
+        return earliest
+
+    async def users_due_for_review(self, until: str) -> List[int]:
+        """
+        מזהי המשתמשים שיש להם מילה לחזרה עד התאריך until (בפורמט ISO), ממוינים
+
+        המימוש הבסיסי סורק את כל הפרופילים (earliest_reviews); אחסון עם אינדקס
+        על מועדי החזרה מחליף אותו בשאילתה.
+        """
+        earliest = await self.earliest_reviews()
+        return sorted(user_id for user_id, moment in earliest.items() if moment <= until)
+
+    async def close(self) -> None:
+        """שחרור המשאבים של האחסון"""
+
+
+class FileProfileBackend(ProfileBackend):
+    """
+    קובץ לכל משתמש, בפורמט השמירה שנבחר, בתיקיות shard לפי גיבוב של מזהה המשתמש:
+    data/users/ab/cd/user_<id>.json - כך שאף תיקייה לא מחזיקה מאות אלפי קבצים
+
+    קבצים מהמבנה השטוח הישן (data/users/user_<id>.json) נקראים כרגיל ועוברים
+    ל-shard בשמירה הבאה או ב-migrate_layout. פרופילים שלא נכתבו זמן רב עוברים
+    לארכיון דחוס של ה-shard העליון (archive_inactive), ומשוחזרים בטעינה הבאה.
+    """
+
+    def __init__(self, data_dir: str = "data/users", io_workers: int = 4, profile_format: str = "json"):
+        """
+        Args:
+            data_dir: תיקיית קבצי המשתמשים
+            io_workers: מספר פעולות הקבצים שרצות במקביל
+            profile_format: פורמט השמירה - json, compact או binary (הקריאה מזהה כל פורמט).
+                            ברירת המחדל היא הפורמט המקורי; compact ו-binary לא
+                            נקראים בגרסאות קודמות של הבוט, ולכן מופעלים רק במפורש
+        """
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        # קריאה וכתיבה של קבצים רצות במאגר תהליכונים ולא על לולאת האירועים
+        self._io = FileIOExecutor(io_workers)
+        # מזהי המילים בפרופילים נשמרים כמספרים קטנים מטבלה משותפת
+        self._word_ids = WordIdTable(os.path.join(data_dir, "word_ids.txt"))
+        self._serializer = create_serializer(profile_format, self._word_ids)
+        self._shard_dirs = set()  # תיקיות shard שכבר ידוע שקיימות
+        self.restored = 0
+
+    def _shard(self, user_id: int) -> Tuple[str, str]:
+        """שתי רמות תיקיות ה-shard של משתמש (שני תווים הקסדצימליים כל אחת)"""
+        digest = hashlib.blake2b(str(user_id).encode(), digest_size=2).hexdigest()
+        return digest[:2], digest[2:]
+
+    def _get_user_file_path(self, user_id: int, extension: str = None) -> str:
+        """מחזיר את הנתיב לקובץ המשתמש (בפורמט השמירה הנוכחי, אלא אם צוינה סיומת)"""
+        return os.path.join(self.data_dir, *self._shard(user_id),
+                            f"user_{user_id}{extension or self._serializer.extension}")
+
+    def _other_user_file_paths(self, user_id: int) -> List[str]:
+        """נתיבי הקובץ של המשתמש בסיומות של שאר הפורמטים, וגם במבנה השטוח הישן"""
+        paths = [self._get_user_file_path(user_id, extension) for extension in PROFILE_EXTENSIONS
+                 if extension != self._serializer.extension]
+        return paths + self._legacy_user_file_paths(user_id)
+
+    def _legacy_user_file_paths(self, user_id: int) -> List[str]:
+        return [os.path.join(self.data_dir, f"user_{user_id}{extension}") for extension in PROFILE_EXTENSIONS]
+
+    def _user_file_paths(self, user_id: int) -> List[str]:
+        """כל הנתיבים האפשריים של קובץ המשתמש, מהפורמט הנוכחי ועד המבנה השטוח הישן"""
+        return [self._get_user_file_path(user_id)] + self._other_user_file_paths(user_id)
+
+    def _archive_path(self, user_id: int) -> str:
+        return os.path.join(self.data_dir, self._shard(user_id)[0], ARCHIVE_NAME)
+
+    def _decode_profile(self, data: bytes) -> Dict:
+        return loads_profile(data, self._word_ids)
+
+    def _read_profile(self, user_id: int) -> Optional[Dict]:
+        data = read_first(self._user_file_paths(user_id))
+        if data is not None:
+            return self._decode_profile(data)
+        # פרופיל לא פעיל - שחזור מהארכיון לקובץ רגיל
+        for extension in PROFILE_EXTENSIONS:
+            data = read_archived(self._archive_path(user_id), f"user_{user_id}{extension}")
+            if data is not None:
+                path = self._get_user_file_path(user_id, extension)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_file_atomic(path, data)
+                self.restored += 1
+                return self._decode_profile(data)
+        return None
+
+    async def load(self, user_id: int) -> Optional[Dict]:
+        try:
+            return await self._io.run(self._read_profile, user_id)
+        except Exception as e:
+            print(f"Error reading user file: {e}")
+        return None
+
+    async def store(self, profile: Dict) -> bool:
+        try:
+            user_id = profile["user_id"]
+            path = self._get_user_file_path(user_id)
+            directory = os.path.dirname(path)
+            if directory not in self._shard_dirs:
+                await self._io.run(functools.partial(os.makedirs, directory, exist_ok=True))
+                self._shard_dirs.add(directory)
+            # קובץ ישן של המשתמש בפורמט אחר או במבנה השטוח נמחק, כדי שלא ייקרא במקום החדש.
+            # מזהי מילים חדשים מהקידוד נכתבים לטבלה שלהם לפני הפרופיל, בתהליכון הכתיבה
+            await self._io.write(path, profile, self._serializer.dumps, self._other_user_file_paths(user_id),
+                                 before=self._word_ids.flush)
+            return True
+        except Exception as e:
+            print(f"Error saving user file: {e}")
+            return False
+
+    async def store_many(self, profiles: List[Dict]) -> List[bool]:
+        # כל קובץ נכתב בנפרד; מאגר התהליכונים מגביל כמה רצים במקביל
+        return list(await asyncio.gather(*(self.store(profile) for profile in profiles)))
+
+    def _profile_files(self) -> Iterator[Tuple[int, os.DirEntry]]:
+        """כל קבצי הפרופילים (ב-shards ובמבנה השטוח), עם מזהה המשתמש של כל אחד"""
+        directories = [self.data_dir]
+        for top in os.scandir(self.data_dir):
+            if top.is_dir() and len(top.name) == 2:
+                directories.extend(entry.path for entry in os.scandir(top.path)
+                                   if entry.is_dir() and len(entry.name) == 2)
+        for directory in directories:
+            for entry in os.scandir(directory):
+                if entry.name.startswith("user_") and entry.name.endswith(PROFILE_EXTENSIONS):
+                    try:
+                        yield int(os.path.splitext(entry.name)[0][len("user_"):]), entry
+                    except ValueError:
+                        continue
+
+    async def recent_user_ids(self, limit: int) -> List[int]:
+        def scan() -> List[int]:
+            entries = list(self._profile_files())
+            entries.sort(key=lambda item: item[1].stat().st_mtime, reverse=True)
+            user_ids = []
+            for user_id, _ in entries:
+                if user_id not in user_ids:
+                    user_ids.append(user_id)
+                if len(user_ids) >= limit:
+                    break
+            return user_ids
+
+        try:
+            return await self._io.run(scan)
+        except OSError as e:
+            print(f"Error listing user files: {e}")
+            return []
+
+    def _archived_user_ids(self) -> Set[int]:
+        """מזהי המשתמשים שיש להם פרופיל בארכיונים של ה-shards"""
+        user_ids = set()
+        for top in os.scandir(self.data_dir):
+            archive_path = os.path.join(top.path, ARCHIVE_NAME)
+            if not (top.is_dir() and len(top.name) == 2 and os.path.exists(archive_path)):
+                continue
+            with zipfile.ZipFile(archive_path) as archive:
+                for name in archive.namelist():
+                    if name.startswith("user_") and name.endswith(PROFILE_EXTENSIONS):
+                        try:
+                            user_ids.add(int(os.path.splitext(name)[0][len("user_"):]))
+                        except ValueError:
+                            continue
+        return user_ids
+
+    async def user_ids(self) -> List[int]:
+        """מזהי כל המשתמשים - בקבצים רגילים וגם בארכיונים של פרופילים לא פעילים"""
+        def scan() -> List[int]:
+            live = {user_id for user_id, _ in self._profile_files()}
+            return sorted(live | self._archived_user_ids())
+        return await self._io.run(scan)
+
+    def _read_stored_batch(self, user_ids: List[int], fields: Optional[Tuple[str, ...]]) -> List[Dict]:
+        """
+        קריאה של כמה פרופילים מהקבצים, ומהארכיון אם אין קובץ רגיל - בלי לשחזר
+        פרופילים מהארכיון (סריקה לא הופכת משתמש לא פעיל לפעיל)
+        """
+        profiles = []
+        with ArchiveReader() as archives:
+            for user_id in user_ids:
+                try:
+                    data = read_first(self._user_file_paths(user_id))
+                    for extension in PROFILE_EXTENSIONS if data is None else ():
+                        data = archives.read(self._archive_path(user_id), f"user_{user_id}{extension}")
+                        if data is not None:
+                            break
+                    if data is None:
+                        continue
+                    profile = self._decode_profile(data)
+                except Exception as e:
+                    print(f"Error reading user file {user_id}: {e}")
+                    continue
+                if fields is not None:
+                    profile = {field: profile[field] for field in fields if field in profile}
+                profile["user_id"] = user_id
+                profiles.append(profile)
+        return profiles
+
+    async def scan_profiles(self, fields: Optional[Tuple[str, ...]] = None,
+                            batch_size: int = 500) -> AsyncIterator[Dict]:
+        """
+        מעבר על כל הפרופילים, כולל פרופילים לא פעילים בארכיון (שנקראים משם
+        בלי לחזור לקובץ רגיל)
+        """
+        user_ids = await self.user_ids()
+        for start in range(0, len(user_ids), batch_size):
+            for profile in await self._io.run(self._read_stored_batch, user_ids[start:start + batch_size], fields):
+                yield profile
+
+    async def migrate_layout(self) -> int:
+        """
+        העברת הקבצים מהמבנה השטוח הישן לתיקיות ה-shard
+
+        Returns:
+            מספר הקבצים שהועברו
+        """
+        def migrate() -> int:
+            moved = 0
+            for entry in list(os.scandir(self.data_dir)):
+                if not (entry.name.startswith("user_") and entry.name.endswith(PROFILE_EXTENSIONS)):
+                    continue
+                name, extension = os.path.splitext(entry.name)
+                try:
+                    user_id = int(name[len("user_"):])
+                except ValueError:
+                    continue
+                target = self._get_user_file_path(user_id, extension)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if os.path.exists(target):
+                    # כבר נשמרה גרסה חדשה יותר ב-shard
+                    os.remove(entry.path)
+                else:
+                    os.replace(entry.path, target)
+                    moved += 1
+            return moved
+        return await self._io.run(migrate)
+
+    async def archive_inactive(self, max_idle_seconds: float) -> int:
+        """
+        העברת פרופילים שלא נכתבו max_idle_seconds שניות לארכיון של ה-shard העליון שלהם
+
+        בכל ארכיון שמתעדכן נמחקים גם עותקים ישנים של פרופילים ששוחזרו ממנו
+        (שיש להם שוב קובץ רגיל).
+
+        Returns:
+            מספר הפרופילים שהועברו לארכיון
+        """
+        def archive() -> int:
+            deadline = time.time() - max_idle_seconds
+            by_archive: Dict[str, Dict[str, os.DirEntry]] = {}
+            live: Dict[str, List[str]] = {}
+            for user_id, entry in self._profile_files():
+                archive_path = self._archive_path(user_id)
+                live.setdefault(archive_path, []).append(entry.name)
+                if entry.stat().st_mtime < deadline:
+                    by_archive.setdefault(archive_path, {})[entry.name] = entry
+            archived = 0
+            for archive_path, entries in by_archive.items():
+                files = {}
+                for name, entry in entries.items():
+                    with open(entry.path, 'rb') as f:
+                        files[name] = f.read()
+                stale = [name for name in live[archive_path] if name not in entries]
+                update_archive(archive_path, files, stale)
+                for name, entry in entries.items():
+                    # פרופיל שנכתב בזמן הארכוב נשאר כקובץ רגיל (והעותק בארכיון יתיישן)
+                    if os.stat(entry.path).st_mtime < deadline:
+                        os.remove(entry.path)
+                        archived += 1
+            return archived
+        return await self._io.run(archive)
+
+    async def close(self) -> None:
+        self._io.shutdown()
+        self._word_ids.flush()
@@ -0,0 +1,105 @@
+"""
+גישה לקבצים מחוץ ללולאת האירועים - מאגר תהליכונים מוגבל וכתיבה אטומית
+"""
+
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+
+def read_first(paths: Iterable[str]) -> Optional[bytes]:
+    """קריאת התוכן של הקובץ הראשון שקיים מתוך רשימת נתיבים (None אם אף אחד לא קיים)"""
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def write_file_atomic(path: str, data: bytes, replaces: Iterable[str] = (), fsync: bool = True) -> None:
+    """
+    כתיבת קובץ בצורה אטומית - כתיבה לקובץ זמני באותה תיקייה והחלפה שלו
+    במקום הקובץ המקורי, כך שקורא לעולם לא רואה קובץ חלקי
+
+    Args:
+        path: נתיב הקובץ
+        data: התוכן לכתיבה
+        replaces: קבצים ישנים של אותו תוכן (למשל בפורמט אחר) שיימחקו אחרי הכתיבה
+        fsync: האם לוודא שהתוכן הגיע לדיסק לפני ההחלפה
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    for old_path in replaces:
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+
+
+class FileIOExecutor:
+    """מאגר תהליכונים ייעודי לפעולות קבצים, כך שדיסק איטי לא עוצר את הבוט"""
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers: מספר הפעולות המקסימלי שרצות על הדיסק במקביל
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-io")
+        # מגביל גם את הקידוד על הלולאה, כדי שסבב כתיבה גדול לא יתבצע ברצף אחד
+        self._slots = asyncio.Semaphore(max_workers)
+
+    async def run(self, function: Callable, *args) -> Any:
+        """הרצת פונקציה חוסמת במאגר והמתנה לתוצאה בלי לחסום את הלולאה"""
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def read(self, paths: Iterable[str], decode: Callable[[bytes], Any]) -> Optional[Any]:
+        """קריאה ופענוח (במאגר) של הקובץ הראשון שקיים מתוך רשימת נתיבים"""
+        def read_and_decode():
+            data = read_first(paths)
+            return None if data is None else decode(data)
+        return await self.run(read_and_decode)
+
+    async def write(self, path: str, value: Any, encode: Callable[[Any], bytes],
+                    replaces: Iterable[str] = (), before: Optional[Callable[[], Any]] = None) -> None:
+        """
+        קידוד וכתיבה אטומית של ערך
+
+        הקידוד נעשה על הלולאה, כדי שהתהליכון יכתוב עותק שלא משתנה באמצע;
+        רק הכתיבה לדיסק עצמה רצה במאגר.
+
+        Args:
+            before: פעולה חוסמת שרצה במאגר לפני הכתיבה (למשל שמירת נתונים
+                    שהתוכן המקודד מפנה אליהם)
+        """
+        def write_after():
+            if before is not None:
+                before()
+            write_file_atomic(path, data, replaces)
+
+        async with self._slots:
+            data = encode(value)
+            replaces = tuple(replaces)
+            await asyncio.get_running_loop().run_in_executor(self._executor, write_after)
+
+    def shutdown(self) -> None:
+        """סגירת המאגר אחרי שכל הפעולות הממתינות הסתיימו"""
+        self._executor.shutdown(wait=True)
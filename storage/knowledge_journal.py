@@ -0,0 +1,209 @@
+"""
+יומן אירועי ידע - כל תוצאת למידה נרשמת כשורה בסוף קובץ, במקום כתיבה של כל הפרופיל
+
+רשומה לכל אירוע: ts, user_id, word_id, delta, source (מופרדים בטאב).
+ts הוא זמן במיקרו-שניות שעולה ממש מאירוע לאירוע, ולכן משמש גם כמספר סידורי:
+הפרופיל שומר את ה-ts של האירוע האחרון שנכלל בו (journal_ts), ושחזור מהיומן
+מדלג על אירועים שכבר נכללו.
+
+כתיבות מתקבצות (group commit): בזמן שקבוצה אחת נכתבת ומסונכרנת לדיסק,
+אירועים חדשים מצטברים ונכתבים יחד בסבב הבא - write ו-fsync אחד לכל סבב.
+
+היומן מחולק לקטעים (segments). דחיסה סוגרת את הקטע הפעיל, והקטעים הסגורים
+נמחקים אחרי שהפרופילים שהשתנו בהם נשמרו - או עוברים לתיקיית היסטוריה, ממנה
+הם נקראים לסטטיסטיקות השימוש (analytics/usage_stats.py).
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+SEGMENT_PREFIX = "knowledge-"
+SEGMENT_SUFFIX = ".log"
+
+
+class KnowledgeEvent(NamedTuple):
+    """תוצאת למידה אחת: שינוי בציון הידע של מילה אצל משתמש"""
+    ts: int
+    user_id: int
+    word_id: str
+    delta: int
+    source: str
+
+
+def format_event(event: KnowledgeEvent) -> str:
+    return f"{event.ts}\t{event.user_id}\t{event.word_id}\t{event.delta}\t{event.source}\n"
+
+
+def read_events(path: str) -> Iterator[KnowledgeEvent]:
+    """
+    קריאת האירועים מקטע של היומן
+
+    שורה אחרונה חלקית (כתיבה שנקטעה בקריסה) לא נקראת - היא מעולם לא אושרה
+    למי שכתב אותה.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            ts, user_id, word_id, delta, source = line.rstrip("\n").split("\t")
+            yield KnowledgeEvent(int(ts), int(user_id), word_id, int(delta), source)
+
+
+class KnowledgeJournal:
+    """יומן אירועי ידע בתיקייה, עם כתיבה מקובצת בתהליכון ייעודי"""
+
+    def __init__(self, directory: str = "data/journal", fsync: bool = True, history_dir: Optional[str] = None):
+        """
+        Args:
+            directory: תיקיית קטעי היומן
+            fsync: האם לסנכרן לדיסק כל סבב כתיבה (בלי זה אירוע מאושר עוד לפני שהגיע לדיסק)
+            history_dir: לאן להעביר קטעים שנדחסו (None - הם נמחקים)
+        """
+        self.directory = directory
+        self.fsync = fsync
+        self.history_dir = history_dir
+        os.makedirs(directory, exist_ok=True)
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+        # כל הגישה לקבצים עוברת בתהליכון אחד, כך שהכתיבות והסגירה של קטע שומרות על הסדר
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self._file = None
+        self._pending: List[Tuple[List[KnowledgeEvent], asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._last_ts = 0
+        # מונים לדיווח
+        self.appends = 0
+        self.commits = 0
+        self.bytes = 0
+
+    def _next_ts(self) -> int:
+        self._last_ts = max(self._last_ts + 1, time.time_ns() // 1000)
+        return self._last_ts
+
+    def advance(self, ts: int) -> None:
+        """אירועים חדשים יקבלו ts גדול מ-ts (גם אם השעון של המחשב חזר אחורה)"""
+        self._last_ts = max(self._last_ts, ts)
+
+    async def append(self, user_id: int, word_id: str, delta: int, source: str) -> KnowledgeEvent:
+        """רישום אירוע אחד; חוזר אחרי שנכתב לדיסק"""
+        return (await self.append_many([(user_id, word_id, delta, source)]))[0]
+
+    async def append_many(self, records: Iterable[Tuple[int, str, int, str]]) -> List[KnowledgeEvent]:
+        """
+        רישום כמה אירועים יחד (למשל כל התוצאות של סבב תרגול)
+
+        Args:
+            records: רשומות (user_id, word_id, delta, source)
+
+        Returns:
+            האירועים שנרשמו, עם ה-ts שלהם; חוזר אחרי שנכתבו לדיסק
+        """
+        events, committed = self.submit(records)
+        # ביטול של מי שממתין לא מבטל את הכתיבה של שאר הקבוצה
+        await asyncio.shield(committed)
+        return events
+
+    def submit(self, records: Iterable[Tuple[int, str, int, str]]) -> Tuple[List[KnowledgeEvent], asyncio.Future]:
+        """
+        רישום אירועים בלי להמתין לכתיבה
+
+        ה-ts של האירועים נקבע מיד, כך שהקורא יכול להחיל אותם על הפרופיל
+        לפני שהם נכתבים - ואז כל אירוע שנמצא בקטע סגור כבר נכלל בפרופיל בזיכרון.
+
+        Returns:
+            האירועים, ו-future שמסתיים כשהם נכתבו לדיסק
+        """
+        loop = asyncio.get_running_loop()
+        events = [KnowledgeEvent(self._next_ts(), *record) for record in records]
+        committed = loop.create_future()
+        if not events:
+            committed.set_result(None)
+            return events, committed
+        self._pending.append((events, committed))
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._commit_pending())
+        return events, committed
+
+    async def _commit_pending(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            data = "".join(format_event(event) for events, _ in batch for event in events).encode('utf-8')
+            try:
+                await loop.run_in_executor(self._executor, self._write, data)
+            except Exception as e:
+                for _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+                continue
+            self.commits += 1
+            self.appends += sum(len(events) for events, _ in batch)
+            self.bytes += len(data)
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+    def _write(self, data: bytes) -> None:
+        if self._file is None:
+            name = f"{SEGMENT_PREFIX}{time.time_ns():020d}{SEGMENT_SUFFIX}"
+            self._file = open(os.path.join(self.directory, name), 'ab')
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _segments(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    async def rotate(self) -> List[str]:
+        """
+        סגירת הקטע הפעיל (אירועים חדשים ייכתבו לקטע חדש)
+
+        Returns:
+            כל הקטעים הסגורים, מהישן לחדש - כל אירוע שאושר עד עכשיו נמצא באחד מהם
+        """
+        def close_segment() -> List[str]:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            return self._segments()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, close_segment)
+
+    async def read(self, segments: Iterable[str]) -> List[KnowledgeEvent]:
+        """קריאת כל האירועים בקטעים (בתהליכון של היומן)"""
+        def read_all() -> List[KnowledgeEvent]:
+            return [event for path in segments for event in read_events(path)]
+        events = await asyncio.get_running_loop().run_in_executor(self._executor, read_all)
+        if events:
+            self.advance(max(event.ts for event in events))
+        return events
+
+    async def remove(self, segments: Iterable[str]) -> None:
+        """מחיקת קטעים סגורים שכבר נכללו בפרופילים השמורים (או העברתם לתיקיית ההיסטוריה)"""
+        def remove_all() -> None:
+            for path in segments:
+                try:
+                    if self.history_dir:
+                        os.replace(path, os.path.join(self.history_dir, os.path.basename(path)))
+                    else:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+        await asyncio.get_running_loop().run_in_executor(self._executor, remove_all)
+
+    async def close(self) -> None:
+        """כתיבת מה שממתין וסגירת הקטע הפעיל (הקטעים נשארים לשחזור או לדחיסה)"""
+        if self._writer is not None:
+            await self._writer
+        await self.rotate()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """מוני היומן: אירועים שנרשמו, סבבי כתיבה (כל סבב - fsync אחד) ובתים"""
+        return {"appends": self.appends, "commits": self.commits, "bytes": self.bytes}
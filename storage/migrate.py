@@ -0,0 +1,58 @@
+"""
+העברת פרופילי משתמשים מקבצים (data/users/*) למסד SQLite
+
+הרצה מתיקיית הפרויקט:
+    python -m storage.migrate data/users data/users.sqlite3
+"""
+
+import argparse
+import asyncio
+import os
+
+from storage.backends import FileProfileBackend
+from storage.sqlite_backend import SQLiteProfileBackend
+
+
+async def migrate_files_to_sqlite(data_dir: str, db_path: str, batch_size: int = 500) -> int:
+    """
+    העתקת כל הפרופילים מתיקיית הקבצים למסד (פרופיל קיים במסד מוחלף)
+
+    Returns:
+        מספר הפרופילים שהועברו
+    """
+    source = FileProfileBackend(data_dir)
+    target = SQLiteProfileBackend(db_path)
+    migrated = 0
+    try:
+        # כולל פרופילים לא פעילים מהארכיונים
+        total = len(await source.user_ids())
+        batch = []
+        async for profile in source.scan_profiles(batch_size=batch_size):
+            batch.append(profile)
+            if len(batch) >= batch_size:
+                migrated += sum(await target.store_many(batch))
+                batch = []
+                print(f"הועברו {migrated} מתוך {total} פרופילים")
+        if batch:
+            migrated += sum(await target.store_many(batch))
+            print(f"הועברו {migrated} מתוך {total} פרופילים")
+    finally:
+        await source.close()
+        await target.close()
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="העברת פרופילי משתמשים מקבצים למסד SQLite")
+    parser.add_argument("data_dir", help="תיקיית קבצי המשתמשים")
+    parser.add_argument("db_path", help="נתיב קובץ המסד")
+    parser.add_argument("--batch-size", type=int, default=500, help="מספר הפרופילים בכל טרנזקציה")
+    args = parser.parse_args()
+
+    migrated = asyncio.run(migrate_files_to_sqlite(args.data_dir, args.db_path, args.batch_size))
+    print(f"ההעברה הסתיימה: {migrated} פרופילים.")
+    print(f"נתיב המסד: {os.path.abspath(args.db_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+אחסון פרופילי משתמשים ב-MongoDB
+
+מסמך לכל משתמש באוסף users (עם אינדקס ייחודי על user_id). לקוח אחד עם מאגר
+חיבורים משותף לכל הבוט; הפעולות של pymongo חוסמות, ולכן הן רצות במאגר
+תהליכונים בגודל מאגר החיבורים.
+
+בשמירה נשלחים רק השדות שהשתנו מאז הגרסה האחרונה שנשמרה או נטענה:
+ציוני words_knowledge שהשתנו נשלחים כ-$inc של ההפרש, רשומות word_progress
+שהשתנו כ-$set של המילה בלבד, ושאר השדות כ-$set/$unset.
+פרופיל שאין לו גרסה קודמת בזיכרון נכתב במלואו. כל סבב שמירה נשלח כ-bulk_write אחד.
+סבבי שמירה של אותו משתמש לא חופפים: כל סבב מחזיק את המנעולים של המשתמשים
+שלו מחישוב העדכון ועד סוף הכתיבה, כך ש-$inc לא מחושב פעמיים מול אותו בסיס.
+"""
+
+import asyncio
+import itertools
+from contextlib import AsyncExitStack
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pymongo
+from pymongo import ReplaceOne, UpdateOne
+
+from storage.backends import ProfileBackend
+from storage.user_locks import UserLocks
+
+DEFAULT_DATABASE = "english_learning_bot"
+KNOWLEDGE_FIELD = "words_knowledge"
+PROGRESS_FIELD = "word_progress"
+# שדות שהם מילון לפי מזהה מילה - מתעדכנים מילה-מילה ולא כשדה שלם
+_PER_WORD_FIELDS = (KNOWLEDGE_FIELD, PROGRESS_FIELD)
+# זמן העדכון האחרון של המסמך (לחימום המטמון) - לא מוחזר כחלק מהפרופיל
+UPDATED_AT_FIELD = "_updated_at"
+_PROFILE_PROJECTION = {"_id": False, UPDATED_AT_FIELD: False}
+
+
+def _snapshot(value: Any) -> Any:
+    """עותק עמוק של מבנה JSON (מילונים ורשימות), כבסיס להשוואה בשמירה הבאה"""
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    return value
+
+
+def _is_field_name(key: Any) -> bool:
+    """האם אפשר להשתמש במפתח כחלק מנתיב שדה ב-MongoDB"""
+    return isinstance(key, str) and key and "." not in key and not key.startswith("$")
+
+
+def profile_update(previous: Dict, profile: Dict) -> Dict[str, Dict]:
+    """
+    חישוב עדכון חלקי ($set/$inc/$unset) מהגרסה הקודמת של פרופיל לגרסה החדשה
+
+    Returns:
+        מסמך העדכון (ריק אם לא השתנה דבר)
+    """
+    set_fields: Dict[str, Any] = {}
+    inc_fields: Dict[str, Any] = {}
+    unset_fields: Dict[str, str] = {}
+
+    for key, value in profile.items():
+        if not _is_field_name(key) or key == UPDATED_AT_FIELD:
+            continue
+        old = previous.get(key)
+        if key in _PER_WORD_FIELDS and isinstance(value, dict) and isinstance(old, dict) \
+                and all(_is_field_name(word_id) for word_id in value):
+            for word_id, item in value.items():
+                old_item = old.get(word_id)
+                if old_item == item and word_id in old:
+                    continue
+                path = f"{key}.{word_id}"
+                if key == KNOWLEDGE_FIELD and type(item) is int and type(old_item) is int:
+                    # הפרש ולא ערך מוחלט - עדכונים ממופעים שונים של הבוט מתחברים
+                    inc_fields[path] = item - old_item
+                else:
+                    set_fields[path] = item
+            for word_id in old:
+                if word_id not in value:
+                    unset_fields[f"{key}.{word_id}"] = ""
+        elif key not in previous or old != value:
+            set_fields[key] = value
+
+    for key in previous:
+        if key not in profile and _is_field_name(key):
+            unset_fields[key] = ""
+
+    if not (set_fields or inc_fields or unset_fields):
+        return {}
+    set_fields[UPDATED_AT_FIELD] = datetime.now(timezone.utc)
+
+    update = {}
+    if set_fields:
+        update["$set"] = set_fields
+    if inc_fields:
+        update["$inc"] = inc_fields
+    if unset_fields:
+        update["$unset"] = unset_fields
+    return update
+
+
+def _due_for_review_query(until: str) -> Dict:
+    """
+    שאילתה למשתמשים שיש להם מילה עם next_review עד until
+
+    word_progress הוא מילון לפי מזהה מילה; פרופילים ישנים שבהם הוא עדיין
+    רשימה נמצאים לפי התנאי הישן.
+    """
+    entries = {"$objectToArray": {
+        "$cond": [{"$isArray": f"${PROGRESS_FIELD}"}, {}, {"$ifNull": [f"${PROGRESS_FIELD}", {}]}],
+    }}
+    # בהשוואת ביטויים null קטן מכל מחרוזת - מילים בלי מועד חזרה לא נחשבות
+    due = {"$and": [
+        {"$gt": ["$$entry.v.next_review", None]},
+        {"$lte": ["$$entry.v.next_review", until]},
+    ]}
+    return {"$or": [
+        {PROGRESS_FIELD: {"$elemMatch": {"next_review": {"$lte": until}}}},
+        {"$expr": {"$gt": [{"$size": {"$filter": {"input": entries, "as": "entry", "cond": due}}}, 0]}},
+    ]}
+
+
+class MongoProfileBackend(ProfileBackend):
+    """פרופילי משתמשים באוסף MongoDB, עם עדכונים חלקיים וכתיבה באצוות"""
+
+    def __init__(self, uri: str, database: Optional[str] = None, collection: str = "users",
+                 pool_size: int = 8, baseline_cache_size: int = 1000,
+                 client: Optional[pymongo.MongoClient] = None):
+        """
+        Args:
+            uri: כתובת ההתחברות (MONGO_URI)
+            database: שם המסד (ברירת מחדל: מתוך הכתובת, או english_learning_bot)
+            collection: שם האוסף
+            pool_size: גודל מאגר החיבורים ומספר הפעולות שרצות במקביל
+            baseline_cache_size: למספר כזה של משתמשים נשמרת בזיכרון הגרסה
+                                 האחרונה שנשמרה, לחישוב עדכונים חלקיים
+            client: לקוח קיים לשימוש משותף (אחרת נוצר לקוח חדש)
+        """
+        self._owns_client = client is None
+        self.client = client or pymongo.MongoClient(uri, maxPoolSize=pool_size)
+        if database:
+            self.collection = self.client[database][collection]
+        else:
+            self.collection = self.client.get_default_database(DEFAULT_DATABASE)[collection]
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="mongo")
+        self.baseline_cache_size = baseline_cache_size
+        self._baselines: "OrderedDict[int, Dict]" = OrderedDict()
+        # סבב שמירה מחזיק את המנעולים של המשתמשים שלו עד שהכתיבה מסתיימת
+        self._write_locks = UserLocks()
+        self._indexed = False
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _ensure_index(self) -> None:
+        if not self._indexed:
+            def create_indexes() -> None:
+                self.collection.create_index("user_id", unique=True)
+                self.collection.create_index(UPDATED_AT_FIELD)
+            await self._run(create_indexes)
+            self._indexed = True
+
+    def _remember(self, user_id: int, snapshot: Dict) -> None:
+        """שמירת הגרסה האחרונה שבמסד, כבסיס לעדכון החלקי הבא"""
+        self._baselines[user_id] = snapshot
+        self._baselines.move_to_end(user_id)
+        while len(self._baselines) > self.baseline_cache_size:
+            self._baselines.popitem(last=False)
+
+    async def load(self, user_id: int) -> Optional[Dict]:
+        try:
+            await self._ensure_index()
+            profile = await self._run(self.collection.find_one, {"user_id": user_id}, _PROFILE_PROJECTION)
+        except Exception as e:
+            print(f"Error reading user from MongoDB: {e}")
+            return None
+        if profile is not None:
+            self._remember(user_id, _snapshot(profile))
+        return profile
+
+    async def load_fields(self, user_id: int, fields: Tuple[str, ...]) -> Optional[Dict]:
+        projection = {field: True for field in fields}
+        projection["_id"] = False
+        try:
+            await self._ensure_index()
+            # פרופיל חלקי לא נשמר כבסיס לעדכון החלקי הבא
+            return await self._run(self.collection.find_one, {"user_id": user_id}, projection)
+        except Exception as e:
+            print(f"Error reading user from MongoDB: {e}")
+            return None
+
+    async def store_many(self, profiles: List[Dict]) -> List[bool]:
+        user_ids = sorted({profile["user_id"] for profile in profiles
+                           if isinstance(profile, dict) and "user_id" in profile})
+        async with AsyncExitStack() as locks:
+            # תמיד באותו סדר, כך ששני סבבים עם משתמשים משותפים לא נתקעים זה על זה
+            for user_id in user_ids:
+                await locks.enter_async_context(self._write_locks.hold(user_id))
+            return await self._store_locked(profiles)
+
+    async def _store_locked(self, profiles: List[Dict]) -> List[bool]:
+        # העדכונים מחושבים על הלולאה, לפני שהפרופילים ממשיכים להשתנות. הבסיס
+        # מתעדכן מיד, כך שאותו משתמש פעמיים באותו סבב לא מקבל את אותו ההפרש פעמיים
+        operations = []
+        written = []
+        results = []
+        for profile in profiles:
+            try:
+                user_id = profile["user_id"]
+                previous = self._baselines.get(user_id)
+                if previous is None:
+                    document = _snapshot(profile)
+                    document[UPDATED_AT_FIELD] = datetime.now(timezone.utc)
+                    operations.append(ReplaceOne({"user_id": user_id}, document, upsert=True))
+                else:
+                    update = profile_update(previous, profile)
+                    if update:
+                        operations.append(UpdateOne({"user_id": user_id}, update, upsert=True))
+                self._remember(user_id, _snapshot(profile))
+                written.append(user_id)
+                results.append(True)
+            except Exception as e:
+                print(f"Error saving user to MongoDB: {e}")
+                results.append(False)
+
+        if operations:
+            try:
+                await self._ensure_index()
+                await self._run(lambda: self.collection.bulk_write(operations, ordered=False))
+            except Exception as e:
+                print(f"Error saving users to MongoDB: {e}")
+                # לא ידוע מה נכתב - ביטול הבסיס, והפרופילים ייכתבו במלואם בפעם הבאה
+                for user_id in written:
+                    self._baselines.pop(user_id, None)
+                return [False] * len(profiles)
+        return results
+
+    async def recent_user_ids(self, limit: int) -> List[int]:
+        def select() -> List[int]:
+            cursor = self.collection.find({}, {"user_id": True, "_id": False}) \
+                .sort(UPDATED_AT_FIELD, pymongo.DESCENDING).limit(limit)
+            return [document["user_id"] for document in cursor]
+        try:
+            await self._ensure_index()
+            return await self._run(select)
+        except Exception as e:
+            print(f"Error listing users in MongoDB: {e}")
+            return []
+
+    async def user_ids(self) -> List[int]:
+        def select() -> List[int]:
+            cursor = self.collection.find({}, {"user_id": True, "_id": False}).sort("user_id", pymongo.ASCENDING)
+            return [document["user_id"] for document in cursor]
+        try:
+            return await self._run(select)
+        except Exception as e:
+            print(f"Error listing users in MongoDB: {e}")
+            return []
+
+    async def scan_profiles(self, fields: Optional[Tuple[str, ...]] = None,
+                            batch_size: int = 500) -> AsyncIterator[Dict]:
+        """מעבר על כל המסמכים בסמן אחד, עם הטלה לשדות המבוקשים"""
+        if fields is None:
+            projection = dict(_PROFILE_PROJECTION)
+        else:
+            projection = {field: True for field in fields}
+            projection.update(user_id=True, _id=False)
+        cursor = self.collection.find({}, projection, batch_size=batch_size)
+        try:
+            while True:
+                batch = await self._run(lambda: list(itertools.islice(cursor, batch_size)))
+                if not batch:
+                    break
+                for profile in batch:
+                    yield profile
+        finally:
+            cursor.close()
+
+    async def users_due_for_review(self, until: str) -> List[int]:
+        def select() -> List[int]:
+            cursor = self.collection.find(
+                _due_for_review_query(until), {"user_id": True, "_id": False},
+            ).sort("user_id", pymongo.ASCENDING)
+            return [document["user_id"] for document in cursor]
+        try:
+            return await self._run(select)
+        except Exception as e:
+            print(f"Error finding users due for review in MongoDB: {e}")
+            return []
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._owns_client:
+            self.client.close()
@@ -0,0 +1,103 @@
+"""
+מטמון LRU לפרופילי משתמשים, מוגבל גם במספר הפרופילים וגם בגודל בזיכרון
+"""
+
+import sys
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Hashable, Optional
+
+# מעל גודל זה, גודל האוסף מוערך מדגימה של האיברים הראשונים במקום מעבר על כולם
+SIZE_SAMPLE_THRESHOLD = 64
+SIZE_SAMPLE = 32
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    הערכת הזיכרון (בבתים) שתופס מבנה JSON - מילונים, רשימות ומחרוזות
+
+    באוספים גדולים (למשל words_knowledge עם אלפי מילים) נמדדת רק דגימה של
+    האיברים והתוצאה מוכפלת, כדי שהחישוב יישאר זול בכל שמירה.
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        items = obj.items()
+        if len(obj) > SIZE_SAMPLE_THRESHOLD:
+            sample = sum(estimate_size(k) + estimate_size(v) for k, v in islice(items, SIZE_SAMPLE))
+            return size + sample * len(obj) // SIZE_SAMPLE
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in items)
+    if isinstance(obj, (list, tuple)):
+        if len(obj) > SIZE_SAMPLE_THRESHOLD:
+            sample = sum(estimate_size(item) for item in islice(obj, SIZE_SAMPLE))
+            return size + sample * len(obj) // SIZE_SAMPLE
+        return size + sum(estimate_size(item) for item in obj)
+    return size
+
+
+class ProfileCache:
+    """מטמון LRU עם מגבלת רשומות ומגבלת בתים, ומוני פגיעות, החטאות ופינויים"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: מספר הפרופילים המקסימלי במטמון
+            max_bytes: הגודל המקסימלי (המוערך) של כל הפרופילים יחד
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """שליפת ערך וסימונו כבשימוש אחרון (None אם לא במטמון)"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """הוספה או עדכון של ערך, ופינוי הערכים הישנים ביותר מעבר למגבלות"""
+        size = estimate_size(value)
+        self.discard(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            # ערך שגדול מכל המטמון לא נשמר בו בכלל
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            old_key, _ = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """הסרת ערך מהמטמון אם הוא קיים"""
+        if self._entries.pop(key, None) is not None:
+            self.bytes -= self._sizes.pop(key)
+
+    def has_room(self) -> bool:
+        """האם יש עוד מקום במטמון (לחימום מוקדם בלי לפנות ערכים)"""
+        return len(self._entries) < self.max_entries and self.bytes < self.max_bytes
+
+    def stats(self) -> Dict[str, int]:
+        """מוני המטמון ומצבו הנוכחי"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
@@ -0,0 +1,250 @@
+"""
+אינדקסים של מועדי החזרה על מילים (next_review ב-word_progress)
+
+    ReviewQueue     - ערימת מינימום של (מועד חזרה, מילה) למשתמש אחד: k המילים
+                      הבאות לחזרה נשלפות ב-O(k log n), בלי לסרוק את כל ההתקדמות
+    DueReviewIndex  - לכל משתמש המועד הקרוב ביותר שלו, בדליים לפי שעה: המשתמשים
+                      שיש להם חזרה עד זמן מסוים נמצאים בלי לסרוק את כל הפרופילים
+
+המועדים הם מחרוזות ISO ‏(YYYY-MM-DDTHH:MM:SS), ומושווים כמחרוזות - כמו בשאילתות
+של האחסון.
+"""
+
+import bisect
+import heapq
+import json
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from storage.file_io import write_file_atomic
+
+
+def earliest_review(word_progress: Any) -> Optional[str]:
+    """
+    מועד החזרה הקרוב ביותר ב-word_progress של פרופיל (None אם אין מילים לחזרה)
+
+    word_progress הוא מילון לפי מזהה מילה, או רשימה בפרופילים ישנים.
+    """
+    if isinstance(word_progress, dict):
+        entries = word_progress.values()
+    elif isinstance(word_progress, list):
+        entries = word_progress
+    else:
+        return None
+    return min((entry["next_review"] for entry in entries if entry.get("next_review")), default=None)
+
+
+class ReviewQueue:
+    """
+    ערימת מינימום של מועדי החזרה של משתמש אחד
+
+    עדכון מילה מוסיף רשומה חדשה בלי להסיר את הקודמת; רשומה שהמועד שלה כבר לא
+    תואם ל-word_progress מתיישנת ונזרקת כשהיא מגיעה לראש הערימה.
+    """
+
+    def __init__(self, progress_map: Dict[str, Dict]):
+        """
+        Args:
+            progress_map: word_progress של המשתמש (מזהה מילה -> התקדמות)
+        """
+        self._heap: List[Tuple[str, str]] = []
+        self._rebuild(progress_map)
+
+    def _rebuild(self, progress_map: Dict[str, Dict]) -> None:
+        self._heap = [
+            (entry["next_review"], word_id) for word_id, entry in progress_map.items() if entry.get("next_review")
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def _current(item: Tuple[str, str], progress_map: Dict[str, Dict]) -> bool:
+        entry = progress_map.get(item[1])
+        return entry is not None and entry.get("next_review") == item[0]
+
+    def push(self, word_id: str, next_review: Optional[str]) -> None:
+        if next_review:
+            heapq.heappush(self._heap, (next_review, word_id))
+
+    def earliest(self, progress_map: Dict[str, Dict]) -> Optional[str]:
+        """מועד החזרה הקרוב ביותר (None אם אין מילים לחזרה)"""
+        heap = self._heap
+        while heap and not self._current(heap[0], progress_map):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def due(self, progress_map: Dict[str, Dict], until: str, count: int) -> List[str]:
+        """
+        עד count מילים שמועד החזרה שלהן עד until, מהמוקדם למאוחר
+
+        המילים נשארות בערימה - הן יוצאות ממנה רק כשהתשובה עליהן קובעת מועד חדש.
+        """
+        heap = self._heap
+        chosen: List[str] = []
+        kept: List[Tuple[str, str]] = []
+        while heap and len(chosen) < count and heap[0][0] <= until:
+            item = heapq.heappop(heap)
+            # רשומה ישנה, או כפילות של מילה שכבר נבחרה
+            if not self._current(item, progress_map) or item[1] in chosen:
+                continue
+            chosen.append(item[1])
+            kept.append(item)
+        for item in kept:
+            heapq.heappush(heap, item)
+        if len(heap) > 2 * len(progress_map) + 64:
+            # יותר מדי רשומות ישנות - בנייה מחדש
+            self._rebuild(progress_map)
+        return chosen
+
+
+def _hour(moment: str) -> str:
+    """הדלי של מועד - התאריך והשעה (YYYY-MM-DDTHH)"""
+    return moment[:13]
+
+
+class DueReviewIndex:
+    """המשתמשים לפי מועד החזרה הקרוב ביותר שלהם, בדליים של שעה"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: קובץ לשמירת האינדקס בין הפעלות (None - בזיכרון בלבד)
+        """
+        self.path = path
+        self.loaded = False  # האם נטען מהקובץ
+        self._earliest: Dict[int, str] = {}
+        self._buckets: Dict[str, Set[int]] = {}
+        self._hours: List[str] = []  # מפתחות הדליים, ממוינים
+        self._changed = False
+        # המשתמשים שעודכנו מאז track_updates (בזמן בנייה מחדש מהאחסון)
+        self._touched: Optional[Set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._earliest)
+
+    def update(self, user_id: int, earliest: Optional[str]) -> None:
+        """
+        עדכון המועד הקרוב ביותר של משתמש
+
+        Args:
+            earliest: מועד החזרה הקרוב ביותר (None - אין למשתמש מילים לחזרה)
+        """
+        if self._touched is not None:
+            self._touched.add(user_id)
+        previous = self._earliest.get(user_id)
+        if previous == earliest:
+            return
+        self._changed = True
+        if previous is not None:
+            hour = _hour(previous)
+            bucket = self._buckets[hour]
+            bucket.discard(user_id)
+            if not bucket:
+                del self._buckets[hour]
+                del self._hours[bisect.bisect_left(self._hours, hour)]
+            del self._earliest[user_id]
+        if earliest:
+            hour = _hour(earliest)
+            bucket = self._buckets.get(hour)
+            if bucket is None:
+                bucket = self._buckets[hour] = set()
+                bisect.insort(self._hours, hour)
+            bucket.add(user_id)
+            self._earliest[user_id] = earliest
+
+    def due_users(self, until: str, since: Optional[str] = None) -> List[int]:
+        """
+        מזהי המשתמשים שיש להם מילה לחזרה עד until, ממוינים
+
+        Args:
+            until: זמן בפורמט ISO
+            since: רק משתמשים שהמועד הקרוב שלהם אחרי הזמן הזה (למשל: מאז סבב
+                   התזכורות הקודם) - נסרקים רק הדליים של השעות שבין השניים
+        """
+        last_hour = _hour(until)
+        first_hour = _hour(since) if since else ""
+        hours = self._hours[bisect.bisect_left(self._hours, first_hour):bisect.bisect_right(self._hours, last_hour)]
+        users: List[int] = []
+        for hour in hours:
+            if hour == last_hour or hour == first_hour:
+                # דלי בקצה הטווח - רק מי שהמועד שלו בתוך הטווח עצמו
+                users.extend(
+                    user_id for user_id in self._buckets[hour]
+                    if (not since or self._earliest[user_id] > since) and self._earliest[user_id] <= until
+                )
+            else:
+                users.extend(self._buckets[hour])
+        return sorted(users)
+
+    def load(self) -> int:
+        """
+        טעינת האינדקס שנשמר בקובץ
+
+        Returns:
+            מספר המשתמשים שנטענו
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        for user_id, earliest in saved.items():
+            if int(user_id) not in self._earliest:
+                self.update(int(user_id), earliest)
+        self.loaded = True
+        return len(saved)
+
+    def track_updates(self) -> None:
+        """תחילת מעקב אחרי המשתמשים שמתעדכנים, לקראת merge של מועדים שנאספו מהאחסון"""
+        if self._touched is None:
+            self._touched = set()
+
+    def merge(self, earliest: Dict[int, str]) -> int:
+        """
+        מיזוג המועדים הקרובים של משתמשים שנאספו מהאחסון
+
+        משתמש שעודכן מאז track_updates לא נדרס - המועד שלו בזיכרון חדש מזה שבאחסון.
+
+        Returns:
+            מספר המשתמשים שנוספו או השתנו
+        """
+        touched = self._touched or set()
+        self._touched = None
+        merged = 0
+        for user_id, moment in earliest.items():
+            if user_id not in touched and self._earliest.get(user_id) != moment:
+                self.update(user_id, moment)
+                merged += 1
+        return merged
+
+    @property
+    def changed(self) -> bool:
+        """האם האינדקס השתנה מאז השמירה האחרונה"""
+        return self._changed
+
+    def snapshot(self) -> Dict[int, str]:
+        """עותק של המועדים לשמירה מתהליכון אחר (האינדקס נחשב שמור מעכשיו)"""
+        self._changed = False
+        return dict(self._earliest)
+
+    def save(self, earliest: Optional[Dict[int, str]] = None) -> int:
+        """
+        שמירת האינדקס לקובץ
+
+        Args:
+            earliest: עותק מ-snapshot לשמירה מחוץ ללולאת האירועים (None - האינדקס עצמו)
+
+        Returns:
+            מספר המשתמשים שנשמרו
+        """
+        if not self.path:
+            return 0
+        if earliest is None:
+            earliest = self.snapshot()
+        write_file_atomic(self.path, json.dumps(earliest, separators=(",", ":")).encode('utf-8'))
+        return len(earliest)
+
+    def stats(self) -> Dict[str, int]:
+        """מספר המשתמשים עם חזרות מתוכננות ומספר הדליים"""
+        return {"review_users": len(self._earliest), "review_hours": len(self._hours)}
@@ -0,0 +1,255 @@
+"""
+פורמטים לשמירת פרופילי משתמשים
+
+    json    - הפורמט המקורי: JSON קריא עם הזחה
+    compact - JSON ללא רווחים, עם גרסת סכמה. מזהי מילים (UUID) מוחלפים במספרים
+              קטנים מטבלה קבועה, ותוצאות הסשן נשמרות כזוגות (מזהה, זכר/לא זכר)
+    binary  - כמו compact, עם כותרת בינארית ועם words_knowledge כמערכי מספרים
+              ארוזים (4 בתים למזהה ו-4 לציון)
+
+הקריאה מזהה את הפורמט לבד, כך שקבצים בפורמט הישן ממשיכים להיקרא כרגיל.
+"""
+
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Any, Dict, List
+
+PROFILE_SCHEMA_VERSION = 1
+# המפתח שמסמן פרופיל בפורמט compact
+SCHEMA_KEY = "_schema"
+
+# מזהה פורמט, גרסת סכמה, אורך חלק ה-JSON, מספר הרשומות ב-words_knowledge
+_BINARY_MAGIC = b"EWUP"
+_BINARY_HEADER = struct.Struct("<4sHII")
+
+
+class WordIdTable:
+    """
+    מיפוי קבוע של מזהי מילים למספרים קטנים
+
+    הטבלה נשמרת כקובץ טקסט עם מזהה אחד בכל שורה, שרק מתארך - המספר של מזהה
+    הוא מספר השורה שלו. מזהה חדש מקבל מספר בזיכרון בזמן הקידוד (על הלולאה,
+    בלי גישה לדיסק), ונכתב לקובץ ב-flush - שרץ בתהליכון הכתיבה לפני שפרופיל
+    שמשתמש בו נשמר.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: נתיב קובץ הטבלה
+        """
+        self.path = path
+        self._ids: List[str] = []
+        self._indexes: Dict[str, int] = {}
+        self._load()
+        self._persisted = len(self._ids)  # מספר המזהים שכבר נמצאים בקובץ
+        self._flush_lock = threading.Lock()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r+', encoding='utf-8') as f:
+            content = f.read()
+            if content and not content.endswith("\n"):
+                # שורה חלקית מכתיבה שנקטעה - אף פרופיל לא מפנה אליה
+                content = content[:content.rfind("\n") + 1]
+                f.seek(0)
+                f.truncate()
+                f.write(content)
+        for word_id in content.splitlines():
+            self._indexes[word_id] = len(self._ids)
+            self._ids.append(word_id)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def index(self, word_id: str) -> int:
+        """המספר של מזהה מילה (מזהה חדש מתווסף לטבלה בזיכרון עד ה-flush הבא)"""
+        index = self._indexes.get(word_id)
+        if index is None:
+            index = len(self._ids)
+            self._indexes[word_id] = index
+            self._ids.append(word_id)
+        return index
+
+    def flush(self) -> int:
+        """
+        כתיבת המזהים החדשים לקובץ (פעולה חוסמת - לתהליכון הכתיבה)
+
+        נכתבים כל המזהים שקיבלו מספר עד עכשיו, כך שפרופיל שקודד לפני הקריאה
+        מפנה רק למזהים שכבר בקובץ.
+
+        Returns:
+            מספר המזהים שנכתבו
+        """
+        with self._flush_lock:
+            count = len(self._ids)
+            if count <= self._persisted:
+                return 0
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(word_id + "\n" for word_id in self._ids[self._persisted:count]))
+                f.flush()
+                os.fsync(f.fileno())
+            written = count - self._persisted
+            self._persisted = count
+            return written
+
+    def word_id(self, index: int) -> str:
+        """מזהה המילה של מספר מהטבלה"""
+        return self._ids[index]
+
+
+class JsonProfileSerializer:
+    """הפורמט המקורי - JSON קריא עם הזחה"""
+
+    name = "json"
+    extension = ".json"
+
+    def __init__(self, word_ids: WordIdTable = None, indent: int = 2):
+        self.indent = indent
+
+    def dumps(self, profile: Dict) -> bytes:
+        return json.dumps(profile, ensure_ascii=False, indent=self.indent).encode('utf-8')
+
+
+class CompactProfileSerializer:
+    """JSON ללא רווחים, עם מספרים קטנים במקום מזהי מילים"""
+
+    name = "compact"
+    extension = ".json"
+
+    def __init__(self, word_ids: WordIdTable):
+        self.word_ids = word_ids
+
+    def dumps(self, profile: Dict) -> bytes:
+        return _dumps_compact(self.pack(profile))
+
+    def pack(self, profile: Dict) -> Dict:
+        """המרת פרופיל למבנה הדחוס (המקור לא משתנה)"""
+        index = self.word_ids.index
+        packed = dict(profile)
+        packed[SCHEMA_KEY] = PROFILE_SCHEMA_VERSION
+
+        knowledge = profile.get("words_knowledge")
+        if isinstance(knowledge, dict):
+            flat = [0] * (2 * len(knowledge))
+            flat[0::2] = map(index, knowledge)
+            flat[1::2] = knowledge.values()
+            packed["words_knowledge"] = flat
+
+        session = profile.get("session_data")
+        if isinstance(session, dict):
+            session = dict(session)
+            word_set = session.get("current_word_set")
+            if isinstance(word_set, list):
+                session["current_word_set"] = [index(word_id) for word_id in word_set]
+            results = session.get("session_results")
+            if isinstance(results, dict):
+                flat = []
+                for word_id, result in results.items():
+                    flat.append(index(word_id))
+                    flat.append(1 if result.get("remembered", False) else 0)
+                session["session_results"] = flat
+            packed["session_data"] = session
+        return packed
+
+    def unpack(self, packed: Dict) -> Dict:
+        """החזרת פרופיל מהמבנה הדחוס למבנה שהמודולים מכירים"""
+        word_id = self.word_ids.word_id
+        packed.pop(SCHEMA_KEY, None)
+
+        flat = packed.get("words_knowledge")
+        if isinstance(flat, list):
+            packed["words_knowledge"] = dict(zip(map(word_id, flat[0::2]), flat[1::2]))
+
+        session = packed.get("session_data")
+        if isinstance(session, dict):
+            word_set = session.get("current_word_set")
+            if isinstance(word_set, list):
+                session["current_word_set"] = [word_id(index) for index in word_set]
+            flat = session.get("session_results")
+            if isinstance(flat, list):
+                session["session_results"] = {
+                    word_id(flat[i]): {"remembered": bool(flat[i + 1])} for i in range(0, len(flat), 2)
+                }
+        return packed
+
+
+class BinaryProfileSerializer(CompactProfileSerializer):
+    """כותרת בינארית עם גרסת סכמה, JSON דחוס, ו-words_knowledge כמערכים ארוזים"""
+
+    name = "binary"
+    extension = ".bin"
+
+    def dumps(self, profile: Dict) -> bytes:
+        packed = self.pack(profile)
+        flat = packed.get("words_knowledge")
+        indexes, scores = array('i'), array('i')
+        if isinstance(flat, list):
+            try:
+                indexes, scores = array('i', flat[0::2]), array('i', flat[1::2])
+                del packed["words_knowledge"]
+            except (TypeError, OverflowError):
+                # ציונים שאינם מספרים שלמים נשארים בחלק ה-JSON
+                indexes, scores = array('i'), array('i')
+        if sys.byteorder != "little":
+            indexes.byteswap()
+            scores.byteswap()
+        body = _dumps_compact(packed)
+        header = _BINARY_HEADER.pack(_BINARY_MAGIC, PROFILE_SCHEMA_VERSION, len(body), len(indexes))
+        return header + body + indexes.tobytes() + scores.tobytes()
+
+    def loads_binary(self, data: bytes) -> Dict:
+        magic, version, body_length, count = _BINARY_HEADER.unpack_from(data, 0)
+        if version > PROFILE_SCHEMA_VERSION:
+            raise ValueError(f"גרסת סכמה לא נתמכת בפרופיל: {version}")
+        offset = _BINARY_HEADER.size
+        packed = json.loads(data[offset:offset + body_length].decode('utf-8'))
+        if count:
+            offset += body_length
+            indexes, scores = array('i'), array('i')
+            indexes.frombytes(data[offset:offset + 4 * count])
+            scores.frombytes(data[offset + 4 * count:offset + 8 * count])
+            if sys.byteorder != "little":
+                indexes.byteswap()
+                scores.byteswap()
+            word_id = self.word_ids.word_id
+            profile = self.unpack(packed)
+            profile["words_knowledge"] = dict(zip(map(word_id, indexes), scores))
+            return profile
+        return self.unpack(packed)
+
+
+SERIALIZERS = {
+    serializer.name: serializer
+    for serializer in (JsonProfileSerializer, CompactProfileSerializer, BinaryProfileSerializer)
+}
+# סיומות הקבצים של כל הפורמטים, לחיפוש קבצים שנשמרו בפורמט אחר
+PROFILE_EXTENSIONS = tuple(dict.fromkeys(serializer.extension for serializer in SERIALIZERS.values()))
+
+
+def create_serializer(name: str, word_ids: WordIdTable):
+    """יצירת המקודד לפי שם הפורמט"""
+    if name not in SERIALIZERS:
+        raise ValueError(f"פורמט פרופיל לא מוכר: {name} (האפשרויות: {', '.join(SERIALIZERS)})")
+    return SERIALIZERS[name](word_ids)
+
+
+def loads_profile(data: bytes, word_ids: WordIdTable) -> Dict:
+    """פענוח פרופיל בכל אחד מהפורמטים (מזוהה לפי תוכן הקובץ)"""
+    if data[:len(_BINARY_MAGIC)] == _BINARY_MAGIC:
+        return BinaryProfileSerializer(word_ids).loads_binary(data)
+    profile = json.loads(data.decode('utf-8'))
+    if isinstance(profile, dict) and SCHEMA_KEY in profile:
+        if profile[SCHEMA_KEY] > PROFILE_SCHEMA_VERSION:
+            raise ValueError(f"גרסת סכמה לא נתמכת בפרופיל: {profile[SCHEMA_KEY]}")
+        return CompactProfileSerializer(word_ids).unpack(profile)
+    return profile
+
+
+def _dumps_compact(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
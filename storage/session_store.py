@@ -0,0 +1,126 @@
+"""
+מצב הסשן של המשתמשים (session_data) - בזיכרון, עם תפוגה
+
+מצב הסשן (המילים בסבב, המילה הנוכחית, המשוב האחרון) משתנה כמעט בכל לחיצה,
+ולכן הוא לא נכתב לאחסון הפרופילים יחד עם words_knowledge וההתקדמות.
+סשן שלא היה בשימוש ttl שניות נמחק. אפשר לשמור את כל הסשנים הפעילים לקובץ
+אחד ולטעון אותו בהפעלה הבאה, כך שסבב תרגול לא נקטע בהפעלה מחדש. הקובץ נשמר
+בכיבוי וגם מדי פעם בזמן הריצה (UserRepository, אם השתנה משהו) - כך שאחרי
+קריסה הולכים לאיבוד רק השינויים מאז השמירה האחרונה.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from storage.file_io import write_file_atomic
+
+
+class SessionStore:
+    """מצב הסשן לכל משתמש, לפי סדר השימוש האחרון, עם מחיקת סשנים שפג זמנם"""
+
+    def __init__(self, ttl: float = 3600.0, path: Optional[str] = None):
+        """
+        Args:
+            ttl: אחרי כמה שניות ללא שימוש סשן נמחק
+            path: קובץ לשמירת הסשנים בין הפעלות (None - בזיכרון בלבד)
+        """
+        self.ttl = ttl
+        self.path = path
+        # מזהה משתמש -> [מצב הסשן, זמן השימוש האחרון]; הישנים בהתחלה
+        self._sessions: "OrderedDict[int, List]" = OrderedDict()
+        self._changed = False
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        """מצב הסשן של משתמש (None אם אין, או שפג זמנו)"""
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            return None
+        now = time.time()
+        if entry[1] < now - self.ttl:
+            del self._sessions[user_id]
+            self.expired += 1
+            return None
+        entry[1] = now
+        self._sessions.move_to_end(user_id)
+        return entry[0]
+
+    def put(self, user_id: int, session: Dict) -> None:
+        """שמירת מצב הסשן של משתמש"""
+        self._sessions[user_id] = [session, time.time()]
+        self._sessions.move_to_end(user_id)
+        self._changed = True
+        self._drop_expired()
+
+    def discard(self, user_id: int) -> None:
+        if self._sessions.pop(user_id, None) is not None:
+            self._changed = True
+
+    def _drop_expired(self) -> None:
+        deadline = time.time() - self.ttl
+        while self._sessions:
+            user_id, entry = next(iter(self._sessions.items()))
+            if entry[1] >= deadline:
+                # הרשימה ממוינת לפי שימוש אחרון - מכאן והלאה כולם חדשים יותר
+                break
+            del self._sessions[user_id]
+            self.expired += 1
+            self._changed = True
+
+    def load(self) -> int:
+        """
+        טעינת הסשנים שנשמרו בקובץ (סשנים שפג זמנם בינתיים לא נטענים)
+
+        Returns:
+            מספר הסשנים שנטענו
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        deadline = time.time() - self.ttl
+        loaded = 0
+        for user_id, last_used, session in sorted(saved, key=lambda item: item[1]):
+            if last_used >= deadline and user_id not in self._sessions:
+                self._sessions[user_id] = [session, last_used]
+                loaded += 1
+        return loaded
+
+    @property
+    def changed(self) -> bool:
+        """האם סשן נשמר, נמחק או פג מאז השמירה האחרונה"""
+        return self._changed
+
+    def snapshot(self) -> bytes:
+        """
+        תוכן הקובץ של הסשנים הפעילים, לכתיבה מתהליכון אחר (הסשנים נחשבים שמורים מעכשיו)
+
+        הסשנים משתנים במקום, ולכן הם מקודדים כאן - על הלולאה - ולא בזמן הכתיבה.
+        """
+        self._drop_expired()
+        self._changed = False
+        saved = [[user_id, last_used, session] for user_id, (session, last_used) in self._sessions.items()]
+        return json.dumps(saved, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+    def save(self, data: Optional[bytes] = None) -> None:
+        """
+        שמירת הסשנים הפעילים לקובץ
+
+        Args:
+            data: תוכן מ-snapshot לשמירה מחוץ ללולאת האירועים (None - הסשנים הנוכחיים)
+        """
+        if not self.path:
+            return
+        if data is None:
+            data = self.snapshot()
+        write_file_atomic(self.path, data)
+
+    def stats(self) -> Dict[str, int]:
+        """מספר הסשנים הפעילים ומספר הסשנים שפג זמנם"""
+        return {"sessions": len(self._sessions), "expired": self.expired}
@@ -0,0 +1,274 @@
+"""
+אחסון פרופילי משתמשים ב-SQLite
+
+הפרופיל נשמר בשתי טבלאות:
+    users          - שורה לכל משתמש עם שאר שדות הפרופיל כ-JSON דחוס
+    word_knowledge - שורה לכל (משתמש, מילה) עם ציון הידע (words_knowledge)
+                     והתקדמות החזרה (word_progress): סטטוס, חזרות, הצלחה, מועד החזרה הבא,
+                     המרווח ומקדם הגדילה שלו
+
+בשמירה נכתבות רק שורות המילים שהשתנו מאז השמירה הקודמת, וכל סבב שמירה
+רץ בטרנזקציה אחת. כל הגישה למסד עוברת בתהליכון ייעודי אחד.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from storage.backends import ProfileBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS word_knowledge (
+    user_id INTEGER NOT NULL,
+    word_id TEXT NOT NULL,
+    score INTEGER,
+    status TEXT,
+    repetitions INTEGER,
+    success_rate REAL,
+    next_review TEXT,
+    interval_days REAL,
+    ease REAL,
+    PRIMARY KEY (user_id, word_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS word_knowledge_next_review ON word_knowledge (next_review);
+CREATE INDEX IF NOT EXISTS users_updated_at ON users (updated_at);
+"""
+
+_UPSERT_USER = (
+    "INSERT INTO users (user_id, profile, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET profile = excluded.profile, updated_at = excluded.updated_at"
+)
+# עמודות שנוספו לטבלת המילים אחרי הגרסה הראשונה - נוספות גם למסד קיים
+_ADDED_WORD_COLUMNS = (("interval_days", "REAL"), ("ease", "REAL"))
+_UPSERT_WORD = (
+    "INSERT INTO word_knowledge (user_id, word_id, score, status, repetitions, success_rate, next_review, "
+    "interval_days, ease) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, word_id) DO UPDATE SET score = excluded.score, status = excluded.status, "
+    "repetitions = excluded.repetitions, success_rate = excluded.success_rate, "
+    "next_review = excluded.next_review, interval_days = excluded.interval_days, ease = excluded.ease"
+)
+_DELETE_WORD = "DELETE FROM word_knowledge WHERE user_id = ? AND word_id = ?"
+_SELECT_USER = "SELECT profile FROM users WHERE user_id = ?"
+_SELECT_WORDS = (
+    "SELECT word_id, score, status, repetitions, success_rate, next_review, interval_days, ease "
+    "FROM word_knowledge WHERE user_id = ?"
+)
+
+# שדות הפרופיל שנשמרים בטבלת המילים
+_WORD_FIELDS = frozenset(("words_knowledge", "word_progress"))
+
+# שדות ההתקדמות של מילה (word_progress) לפי סדר העמודות בטבלה
+_PROGRESS_FIELDS = ("status", "repetitions", "success_rate", "next_review", "interval", "ease")
+
+# שורת מילה: (score, status, repetitions, success_rate, next_review, interval, ease)
+WordRow = Tuple[Any, ...]
+_EMPTY_ROW = (None,) * (1 + len(_PROGRESS_FIELDS))
+
+
+def split_profile(profile: Dict) -> Tuple[str, Dict[str, WordRow]]:
+    """
+    פיצול פרופיל לחלק הכללי (JSON) ולשורות המילים
+
+    words_knowledge ו-word_progress מוחלפים ב-JSON במבנה ריק, כדי שבטעינה
+    יהיה ידוע אילו מהם היו בפרופיל.
+    """
+    rest = dict(profile)
+    rows: Dict[str, List] = {}
+    knowledge = profile.get("words_knowledge")
+    if isinstance(knowledge, dict):
+        rest["words_knowledge"] = {}
+        for word_id, score in knowledge.items():
+            rows[word_id] = [score, *_EMPTY_ROW[1:]]
+    progress = profile.get("word_progress")
+    if isinstance(progress, (dict, list)):
+        # מבנה ריק מאותו סוג (מילון לפי מזהה מילה, או רשימה בפרופילים ישנים)
+        rest["word_progress"] = type(progress)()
+        for entry in progress.values() if isinstance(progress, dict) else progress:
+            row = rows.setdefault(entry["word_id"], list(_EMPTY_ROW))
+            row[1:] = [entry.get(field) for field in _PROGRESS_FIELDS]
+    text = json.dumps(rest, ensure_ascii=False, separators=(",", ":"))
+    return text, {word_id: tuple(row) for word_id, row in rows.items()}
+
+
+def join_profile(text: str, rows: Dict[str, WordRow]) -> Dict:
+    """הרכבת פרופיל מהחלק הכללי ומשורות המילים (ההפך של split_profile)"""
+    profile = json.loads(text)
+    knowledge = profile.get("words_knowledge")
+    progress = profile.get("word_progress")
+    for word_id, (score, *fields) in rows.items():
+        if score is not None and knowledge is not None:
+            knowledge[word_id] = score
+        if fields[0] is not None and progress is not None:
+            entry = {"word_id": word_id}
+            entry.update(zip(_PROGRESS_FIELDS, fields))
+            if isinstance(progress, dict):
+                progress[word_id] = entry
+            else:
+                progress.append(entry)
+    return profile
+
+
+class SQLiteProfileBackend(ProfileBackend):
+    """פרופילי משתמשים במסד SQLite (מצב WAL)"""
+
+    def __init__(self, db_path: str = "data/users.sqlite3", row_cache_size: int = 1000):
+        """
+        Args:
+            db_path: נתיב קובץ המסד
+            row_cache_size: למספר כזה של משתמשים נשמרות בזיכרון שורות המילים
+                            מהשמירה האחרונה, כדי לחשב שינויים בלי לקרוא מהמסד
+        """
+        self.db_path = db_path
+        # החיבור נוצר ומשמש רק בתהליכון של המאגר
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor.submit(self._connect).result()
+        self.row_cache_size = row_cache_size
+        self._stored_rows: "OrderedDict[int, Dict[str, WordRow]]" = OrderedDict()
+
+    def _connect(self) -> None:
+        connection = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=64)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(word_knowledge)")}
+        for column, column_type in _ADDED_WORD_COLUMNS:
+            if column not in columns:
+                connection.execute(f"ALTER TABLE word_knowledge ADD COLUMN {column} {column_type}")
+        self._connection = connection
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _select_rows(self, user_id: int) -> Dict[str, WordRow]:
+        return {row[0]: tuple(row[1:]) for row in self._connection.execute(_SELECT_WORDS, (user_id,))}
+
+    def _remember_rows(self, user_id: int, rows: Dict[str, WordRow]) -> None:
+        self._stored_rows[user_id] = rows
+        self._stored_rows.move_to_end(user_id)
+        while len(self._stored_rows) > self.row_cache_size:
+            self._stored_rows.popitem(last=False)
+
+    def _load(self, user_id: int) -> Optional[Dict]:
+        row = self._connection.execute(_SELECT_USER, (user_id,)).fetchone()
+        if row is None:
+            return None
+        rows = self._select_rows(user_id)
+        self._remember_rows(user_id, rows)
+        return join_profile(row[0], rows)
+
+    def _load_fields(self, user_id: int, fields: Tuple[str, ...]) -> Optional[Dict]:
+        if _WORD_FIELDS.intersection(fields):
+            profile = self._load(user_id)
+        else:
+            # שדות שלא נמצאים בטבלת המילים - קריאה של שורת המשתמש בלבד
+            row = self._connection.execute(_SELECT_USER, (user_id,)).fetchone()
+            profile = json.loads(row[0]) if row is not None else None
+        if profile is None:
+            return None
+        return {field: profile[field] for field in fields if field in profile}
+
+    def _store_many(self, batch: List[Tuple[int, str, Dict[str, WordRow]]]) -> None:
+        connection = self._connection
+        now = time.time()
+        pending = {}
+        connection.execute("BEGIN")
+        try:
+            for user_id, text, rows in batch:
+                connection.execute(_UPSERT_USER, (user_id, text, now))
+                previous = self._stored_rows.get(user_id)
+                if previous is None:
+                    previous = self._select_rows(user_id)
+                changed = [(user_id, word_id) + row for word_id, row in rows.items() if previous.get(word_id) != row]
+                removed = [(user_id, word_id) for word_id in previous if word_id not in rows]
+                if changed:
+                    connection.executemany(_UPSERT_WORD, changed)
+                if removed:
+                    connection.executemany(_DELETE_WORD, removed)
+                pending[user_id] = rows
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            # השורות בזיכרון אולי כבר לא תואמות למסד - ייקראו מחדש בשמירה הבאה
+            for user_id, _, _ in batch:
+                self._stored_rows.pop(user_id, None)
+            raise
+        for user_id, rows in pending.items():
+            self._remember_rows(user_id, rows)
+
+    async def load(self, user_id: int) -> Optional[Dict]:
+        try:
+            return await self._run(self._load, user_id)
+        except Exception as e:
+            print(f"Error reading user from SQLite: {e}")
+            return None
+
+    async def load_fields(self, user_id: int, fields: Tuple[str, ...]) -> Optional[Dict]:
+        try:
+            return await self._run(self._load_fields, user_id, fields)
+        except Exception as e:
+            print(f"Error reading user from SQLite: {e}")
+            return None
+
+    async def store_many(self, profiles: List[Dict]) -> List[bool]:
+        # הפיצול נעשה על הלולאה, כדי שהתהליכון יעבוד על עותק שלא משתנה באמצע
+        batch = []
+        results = []
+        for profile in profiles:
+            try:
+                batch.append((profile["user_id"],) + split_profile(profile))
+                results.append(True)
+            except Exception as e:
+                print(f"Error saving user to SQLite: {e}")
+                results.append(False)
+        if not batch:
+            return results
+        try:
+            await self._run(self._store_many, batch)
+        except Exception as e:
+            print(f"Error saving users to SQLite: {e}")
+            return [False] * len(profiles)
+        return results
+
+    async def recent_user_ids(self, limit: int) -> List[int]:
+        def select() -> List[int]:
+            cursor = self._connection.execute(
+                "SELECT user_id FROM users ORDER BY updated_at DESC LIMIT ?", (limit,))
+            return [row[0] for row in cursor]
+        return await self._run(select)
+
+    async def user_ids(self) -> List[int]:
+        def select() -> List[int]:
+            return [row[0] for row in self._connection.execute("SELECT user_id FROM users ORDER BY user_id")]
+        return await self._run(select)
+
+    async def earliest_reviews(self) -> Dict[int, str]:
+        def select() -> Dict[int, str]:
+            cursor = self._connection.execute(
+                "SELECT user_id, MIN(next_review) FROM word_knowledge WHERE next_review IS NOT NULL GROUP BY user_id")
+            return dict(cursor.fetchall())
+        return await self._run(select)
+
+    async def users_due_for_review(self, until: str) -> List[int]:
+        def select() -> List[int]:
+            cursor = self._connection.execute(
+                "SELECT DISTINCT user_id FROM word_knowledge WHERE next_review <= ? ORDER BY user_id", (until,))
+            return [row[0] for row in cursor]
+        return await self._run(select)
+
+    async def close(self) -> None:
+        def close_connection() -> None:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        await self._run(close_connection)
+        self._executor.shutdown(wait=True)
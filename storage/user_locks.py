@@ -0,0 +1,123 @@
+"""
+נעילה לכל משתמש - עדכונים של אותו משתמש רצים אחד אחרי השני
+
+כך שתי לחיצות מהירות של אותו משתמש לא מבצעות קריאה-שינוי-שמירה של הפרופיל
+במקביל (ואחת דורסת את השנייה), בזמן שעדכונים של משתמשים שונים רצים במקביל.
+מנעולים שלא היו בשימוש זמן מה נמחקים, כך שמספרם נשאר חסום.
+"""
+
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Hashable
+
+
+class _UserLock:
+    """מנעול של משתמש יחיד, עם מספר המחזיקים והממתינים בו"""
+
+    __slots__ = ("lock", "users", "last_used")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+        self.last_used = time.monotonic()
+
+
+class UserLocks:
+    """מנעולי asyncio לפי מזהה משתמש, עם מחיקת מנעולים לא פעילים ומוני המתנה"""
+
+    def __init__(self, idle_timeout: float = 300.0, max_locks: int = 10_000):
+        """
+        Args:
+            idle_timeout: אחרי כמה שניות ללא שימוש מנעול נמחק
+            max_locks: מספר המנעולים שמעליו נמחקים גם מנעולים פנויים שעוד לא פג זמנם
+        """
+        self.idle_timeout = idle_timeout
+        self.max_locks = max_locks
+        # לפי סדר השימוש האחרון - הישנים בהתחלה
+        self._locks: "OrderedDict[Hashable, _UserLock]" = OrderedDict()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, user_id: Hashable):
+        """החזקת המנעול של משתמש לאורך בלוק async with"""
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = _UserLock()
+        self._locks.move_to_end(user_id)
+        entry.users += 1
+        if len(self._locks) > self.max_locks:
+            self._drop_idle(force=True)
+        try:
+            if entry.lock.locked():
+                self.contended += 1
+                start = time.monotonic()
+                await entry.lock.acquire()
+                waited = time.monotonic() - start
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            else:
+                await entry.lock.acquire()
+        except BaseException:
+            entry.users -= 1
+            raise
+        self.acquisitions += 1
+        try:
+            yield
+        finally:
+            entry.lock.release()
+            entry.users -= 1
+            entry.last_used = time.monotonic()
+            if self.acquisitions % 256 == 0:
+                self._drop_idle()
+
+    def _drop_idle(self, force: bool = False) -> None:
+        """
+        מחיקת מנעולים שאף אחד לא מחזיק או ממתין להם ושלא היו בשימוש זמן מה
+
+        Args:
+            force: למחוק גם מנעולים פנויים שעוד לא פג זמנם, עד שחוזרים למגבלה
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        for user_id in list(self._locks):
+            entry = self._locks[user_id]
+            if entry.users:
+                continue
+            over_limit = force and len(self._locks) > self.max_locks
+            if entry.last_used < deadline or over_limit:
+                del self._locks[user_id]
+                self.dropped += 1
+            elif not force:
+                # הרשימה ממוינת לפי שימוש אחרון - מכאן והלאה כולם חדשים יותר
+                break
+
+    def serialized(self, handler: Callable) -> Callable:
+        """עטיפת handler של טלגרם (update, context) כך שירוץ תחת המנעול של המשתמש"""
+        @functools.wraps(handler)
+        async def wrapper(update, context, *args, **kwargs):
+            user = getattr(update, "effective_user", None)
+            if user is None:
+                return await handler(update, context, *args, **kwargs)
+            async with self.hold(user.id):
+                return await handler(update, context, *args, **kwargs)
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """מוני הנעילה: נעילות, נעילות שחיכו, זמן המתנה כולל ומקסימלי, מנעולים פעילים ושנמחקו"""
+        return {
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "wait_seconds": self.wait_seconds,
+            "max_wait_seconds": self.max_wait_seconds,
+            "locks": len(self._locks),
+            "dropped": self.dropped,
+        }
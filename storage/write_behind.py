@@ -0,0 +1,134 @@
+"""
+כתיבה מושהית (write-behind) - איסוף שמירות בזיכרון וכתיבתן לאחסון באצווה
+
+כל שמירה רק מסמנת את המפתח כ"מלוכלך". הכתיבה בפועל מתבצעת כל פרק זמן קבוע,
+או כשמספר המפתחות המלוכלכים מגיע לסף, וגם בכיבוי. כמה שמירות של אותו מפתח
+בין שתי כתיבות מתאחדות לכתיבה אחת.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """חוצץ של שמירות ממתינות, עם כתיבה תקופתית ברקע"""
+
+    def __init__(self, write: Callable[[List[Any]], Awaitable[List[bool]]],
+                 flush_interval: float = 5.0, max_dirty: int = 100):
+        """
+        Args:
+            write: פונקציה אסינכרונית שכותבת רשימת ערכים לאחסון ומחזירה לכל ערך האם נכתב
+            flush_interval: זמן בשניות בין כתיבות (0 מבטל את הכתיבה התקופתית)
+            max_dirty: מספר המפתחות הממתינים שמפעיל כתיבה מיידית
+        """
+        self._write = write
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._dirty: Dict[Hashable, Any] = {}
+        self._inflight: Dict[Hashable, Any] = {}  # הערכים שנכתבים ברגע זה
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # מונים לדיווח
+        self.flushes = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._dirty or key in self._inflight
+
+    def pending(self, key: Hashable) -> Any:
+        """הערך הממתין לכתיבה (או שנכתב ברגע זה) עבור מפתח - None אם אין"""
+        value = self._dirty.get(key)
+        return value if value is not None else self._inflight.get(key)
+
+    async def mark_dirty(self, key: Hashable, value: Any) -> None:
+        """סימון ערך לכתיבה; הפעלת כתיבה ברקע אם הגענו לסף"""
+        if key in self._dirty:
+            self.coalesced += 1
+        self._dirty[key] = value
+        if len(self._dirty) >= self.max_dirty and (self._flush_task is None or self._flush_task.done()):
+            # הכתיבה לא מעכבת את מי ששמר - היא רצה כמשימה נפרדת
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> int:
+        """
+        כתיבת כל הערכים הממתינים
+
+        Returns:
+            מספר הערכים שנכתבו בהצלחה
+        """
+        async with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            self._inflight = batch
+            written = set()
+            try:
+                keys = list(batch)
+                try:
+                    results = await self._write(list(batch.values()))
+                except Exception as e:
+                    logger.error(f"Write-behind failed for {len(keys)} entries: {e}")
+                    results = [False] * len(keys)
+                for key, ok in zip(keys, results):
+                    if ok:
+                        written.add(key)
+                    else:
+                        self.failures += 1
+            finally:
+                # ערך שלא נכתב (כישלון או ביטול באמצע) חוזר לתור,
+                # אלא אם כבר נשמרה גרסה חדשה יותר שלו
+                for key, value in batch.items():
+                    if key not in written:
+                        self._dirty.setdefault(key, value)
+                self._inflight = {}
+                self.flushes += 1
+                self.writes += len(written)
+            return len(written)
+
+    def start(self) -> None:
+        """התחלת הכתיבה התקופתית ברקע"""
+        if self._task is None and self.flush_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """עצירת הכתיבה התקופתית וכתיבה אחרונה של כל מה שממתין"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+        if self._dirty:
+            logger.error(f"Write-behind stopped with {len(self._dirty)} unsaved entries")
+
+    def stats(self) -> Dict[str, int]:
+        """מוני הכתיבה: מספר סבבי כתיבה, כתיבות, שמירות שאוחדו, כישלונות וממתינים"""
+        return {
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "pending": len(self._dirty),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Periodic write-behind flush failed: {e}")
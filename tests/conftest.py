@@ -0,0 +1,6 @@
+"""הגדרות משותפות לבדיקות: תיקיית הפרויקט בנתיב הייבוא, כמו בסקריפטים של benchmarks"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,128 @@
+"""בדיקות ליומן אירועי הידע: קריאה אחרי שורה אחרונה קטועה, שחזור ודחיסה"""
+
+import asyncio
+import os
+
+from models import UserRepository
+from storage.knowledge_journal import KnowledgeEvent, KnowledgeJournal, format_event, read_events
+
+WORD_A = "word-a"
+WORD_B = "word-b"
+
+
+def journal_segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".log"))
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "knowledge-1.log"
+    events = [KnowledgeEvent(1, 10, WORD_A, 1, "practice"), KnowledgeEvent(2, 10, WORD_B, -1, "quiz")]
+    torn = format_event(KnowledgeEvent(3, 10, WORD_A, 1, "practice"))[:-5]
+    path.write_text("".join(map(format_event, events)) + torn, encoding="utf-8")
+    assert list(read_events(str(path))) == events
+
+
+def test_events_are_grouped_and_ordered(tmp_path):
+    async def run():
+        journal = KnowledgeJournal(str(tmp_path), fsync=False)
+        results = await asyncio.gather(*(
+            journal.append(user_id, WORD_A, 1, "practice") for user_id in range(20)
+        ))
+        segments = await journal.rotate()
+        read = await journal.read(segments)
+        await journal.close()
+        return journal, results, read
+
+    journal, results, read = asyncio.run(run())
+    assert read == results
+    assert [event.ts for event in read] == sorted({event.ts for event in read})
+    assert journal.stats()["appends"] == 20
+    assert journal.stats()["commits"] < 20
+
+
+def test_recover_applies_events_after_torn_line(tmp_path):
+    users_dir, journal_dir = tmp_path / "users", tmp_path / "journal"
+
+    async def record_and_crash():
+        repo = UserRepository(str(users_dir), journal=KnowledgeJournal(str(journal_dir), fsync=False))
+        user_profile = {"user_id": 5, "words_knowledge": {}}
+        await repo.save_user(user_profile)
+        await repo._write_behind.flush()
+        assert await repo.record_knowledge(user_profile, [(WORD_A, 1), (WORD_B, -1)], "practice")
+        assert await repo.record_knowledge(user_profile, [(WORD_A, 1)], "practice")
+        # קריסה: היומן נסגר בלי דחיסה והפרופיל השמור לא כולל את האירועים
+        await repo.journal.close()
+
+    asyncio.run(record_and_crash())
+    segment = journal_dir / journal_segments(journal_dir)[-1]
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write(f"9999999999999999\t5\t{WORD_B}")
+
+    async def recover():
+        repo = UserRepository(str(users_dir), journal=KnowledgeJournal(str(journal_dir), fsync=False))
+        applied = await repo.recover_journal()
+        user_profile = await repo.get_user(5)
+        await repo.close()
+        return applied, user_profile
+
+    applied, user_profile = asyncio.run(recover())
+    assert applied == 3
+    assert user_profile["words_knowledge"] == {WORD_A: 2, WORD_B: -1}
+    # השחזור נדחס לפרופילים - לא נשארים קטעים לשחזור הבא
+    assert journal_segments(journal_dir) == []
+
+
+def test_compaction_saves_profiles_and_removes_segments(tmp_path):
+    users_dir, journal_dir = tmp_path / "users", tmp_path / "journal"
+    history_dir = tmp_path / "history"
+
+    async def record_and_compact():
+        journal = KnowledgeJournal(str(journal_dir), fsync=False, history_dir=str(history_dir))
+        repo = UserRepository(str(users_dir), journal=journal)
+        user_profile = {"user_id": 8, "words_knowledge": {}}
+        await repo.record_knowledge(user_profile, [(WORD_A, 1)], "practice")
+        before = journal_segments(journal_dir)
+        removed = await repo.compact_journal()
+        replayed = await repo.recover_journal()
+        await repo.close()
+        return before, removed, replayed
+
+    async def load():
+        repo = UserRepository(str(users_dir))
+        try:
+            return await repo.get_user(8)
+        finally:
+            await repo.close()
+
+    before, removed, replayed = asyncio.run(record_and_compact())
+    assert len(before) == 1
+    assert removed == 1
+    assert replayed == 0
+    assert journal_segments(journal_dir) == []
+    assert journal_segments(history_dir) == before
+    assert asyncio.run(load())["words_knowledge"] == {WORD_A: 1}
+
+
+def test_events_already_in_saved_profile_are_not_replayed(tmp_path):
+    users_dir, journal_dir = tmp_path / "users", tmp_path / "journal"
+
+    async def record_save_and_crash():
+        repo = UserRepository(str(users_dir), journal=KnowledgeJournal(str(journal_dir), fsync=False))
+        user_profile = {"user_id": 9, "words_knowledge": {}}
+        await repo.record_knowledge(user_profile, [(WORD_A, 1)], "practice")
+        # הפרופיל נשמר עם האירוע, אבל הקטע לא נמחק לפני הקריסה
+        await repo.save_user(user_profile)
+        await repo._write_behind.flush()
+        await repo.journal.close()
+
+    async def recover():
+        repo = UserRepository(str(users_dir), journal=KnowledgeJournal(str(journal_dir), fsync=False))
+        applied = await repo.recover_journal()
+        user_profile = await repo.get_user(9)
+        await repo.close()
+        return applied, user_profile
+
+    asyncio.run(record_save_and_crash())
+    applied, user_profile = asyncio.run(recover())
+    assert applied == 0
+    assert user_profile["words_knowledge"] == {WORD_A: 1}
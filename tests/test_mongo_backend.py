@@ -0,0 +1,93 @@
+"""
+בדיקות אינטגרציה מול MongoDB אמיתי - רצות רק אם מוגדר MONGO_URI
+
+כל בדיקה עובדת במסד זמני משלה, שנמחק בסופה:
+    MONGO_URI=mongodb://localhost:27017 python -m pytest -q tests/test_mongo_backend.py
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+
+MONGO_URI = os.environ.get("MONGO_URI")
+
+pytestmark = pytest.mark.skipif(not MONGO_URI, reason="MONGO_URI is not set")
+
+WORD_A = "word-a"
+WORD_B = "word-b"
+
+
+@pytest.fixture
+def database_name():
+    pymongo = pytest.importorskip("pymongo")
+    name = f"test_english_bot_{uuid.uuid4().hex[:12]}"
+    yield name
+    client = pymongo.MongoClient(MONGO_URI)
+    client.drop_database(name)
+    client.close()
+
+
+def open_backend(database_name):
+    from storage.mongo_backend import MongoProfileBackend
+    return MongoProfileBackend(MONGO_URI, database=database_name)
+
+
+def test_explicit_database_is_used(database_name):
+    backend = open_backend(database_name)
+    try:
+        assert backend.collection.database.name == database_name
+    finally:
+        asyncio.run(backend.close())
+
+
+def test_round_trip_and_partial_updates(database_name):
+    async def run():
+        backend = open_backend(database_name)
+        profile = {"user_id": 1, "words_knowledge": {WORD_A: 1}, "word_progress": {}, "level": "beginner"}
+        assert await backend.store_many([profile]) == [True]
+        profile["words_knowledge"][WORD_A] = 3
+        profile["words_knowledge"][WORD_B] = -1
+        profile["word_progress"][WORD_A] = {"word_id": WORD_A, "next_review": "2026-01-01T00:00:00"}
+        del profile["level"]
+        assert await backend.store_many([profile]) == [True]
+        await backend.close()
+
+        reader = open_backend(database_name)
+        stored = await reader.load(1)
+        fields = await reader.load_fields(1, ("words_knowledge",))
+        user_ids = await reader.user_ids()
+        due = await reader.users_due_for_review("2026-06-01T00:00:00")
+        not_due = await reader.users_due_for_review("2025-06-01T00:00:00")
+        await reader.close()
+        return stored, fields, user_ids, due, not_due
+
+    stored, fields, user_ids, due, not_due = asyncio.run(run())
+    assert stored["words_knowledge"] == {WORD_A: 3, WORD_B: -1}
+    assert "level" not in stored
+    assert fields == {"words_knowledge": {WORD_A: 3, WORD_B: -1}}
+    assert user_ids == [1]
+    assert due == [1]
+    assert not_due == []
+
+
+def test_overlapping_saves_apply_each_change_once(database_name):
+    async def run():
+        backend = open_backend(database_name)
+        await backend.store_many([{"user_id": 2, "words_knowledge": {WORD_A: 0}}])
+        # שני סבבי שמירה של אותו משתמש בו זמנית, ואותו משתמש פעמיים בסבב אחד
+        first = {"user_id": 2, "words_knowledge": {WORD_A: 1}}
+        second = {"user_id": 2, "words_knowledge": {WORD_A: 2}}
+        await asyncio.gather(backend.store_many([first]), backend.store_many([second]))
+        third = {"user_id": 2, "words_knowledge": {WORD_A: 3}}
+        fourth = {"user_id": 2, "words_knowledge": {WORD_A: 4}}
+        await backend.store_many([third, fourth])
+        await backend.close()
+
+        reader = open_backend(database_name)
+        stored = await reader.load(2)
+        await reader.close()
+        return stored
+
+    assert asyncio.run(run())["words_knowledge"] == {WORD_A: 4}
@@ -0,0 +1,88 @@
+"""בדיקות לתקציב הקריאות והשמירות של פרופיל בעדכון אחד (ProfileContext)"""
+
+import asyncio
+
+from models import UserRepository
+from modules.user.profile_context import (
+    READS_PER_UPDATE, WRITES_PER_UPDATE, ProfileAccessStats, ProfileContext,
+)
+
+
+def open_context(repo, user_id, stats):
+    async def load(user_id):
+        user_profile = await repo.get_user(user_id)
+        if user_profile is None:
+            return {"user_id": user_id, "session_data": {}}, True
+        return user_profile, False
+    return ProfileContext(user_id, load, repo.save_user, repo.save_session, stats)
+
+
+def test_update_within_budget(tmp_path):
+    async def run():
+        repo = UserRepository(str(tmp_path), flush_interval=0)
+        stats = ProfileAccessStats()
+        async with open_context(repo, 1, stats) as profile:
+            user_profile = await profile.get()
+            await profile.get()
+            user_profile["session_data"]["current_word_index"] = 3
+            profile.session_changed()
+        await repo.close()
+        return profile, stats
+
+    profile, stats = asyncio.run(run())
+    assert (profile.reads, profile.writes) == (READS_PER_UPDATE, WRITES_PER_UPDATE)
+    assert stats.stats()["profile_over_budget"] == 0
+    assert stats.stats()["profile_updates"] == 1
+
+
+def test_new_profile_is_saved_once(tmp_path):
+    async def run():
+        repo = UserRepository(str(tmp_path), flush_interval=0)
+        stats = ProfileAccessStats()
+        async with open_context(repo, 2, stats) as profile:
+            await profile.get()
+            profile.changed()
+            profile.session_changed()
+        saved = await repo.get_user(2)
+        await repo.close()
+        return profile, saved
+
+    profile, saved = asyncio.run(run())
+    assert profile.writes == 1
+    assert saved["user_id"] == 2
+
+
+def test_reads_outside_context_are_counted(tmp_path):
+    async def run():
+        repo = UserRepository(str(tmp_path), flush_interval=0)
+        await repo.save_user({"user_id": 3, "points": 1})
+        stats = ProfileAccessStats()
+        async with open_context(repo, 3, stats) as profile:
+            await profile.get()
+            # מודול שעוקף את ההקשר וקורא ושומר בעצמו
+            user_profile = await repo.get_user(3)
+            await repo.get_user_fields(3, ["points"])
+            await repo.save_user(user_profile)
+        await repo.close()
+        return profile, stats
+
+    profile, stats = asyncio.run(run())
+    assert (profile.reads, profile.writes) == (3, 1)
+    assert stats.stats()["profile_over_budget"] == 1
+    assert stats.stats()["profile_max_reads"] == 3
+
+
+def test_nothing_counted_without_context(tmp_path):
+    async def run():
+        repo = UserRepository(str(tmp_path), flush_interval=0)
+        stats = ProfileAccessStats()
+        async with open_context(repo, 4, stats):
+            pass
+        await repo.save_user({"user_id": 4})
+        await repo.get_user(4)
+        await repo.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats.stats()["profile_reads"] == 0
+    assert stats.stats()["profile_writes"] == 0
@@ -0,0 +1,99 @@
+"""בדיקות לפורמטי הפרופילים: שמירה וקריאה חוזרת בכל פורמט, וטבלת מזהי המילים"""
+
+import pytest
+
+from storage.serializers import (
+    BinaryProfileSerializer, CompactProfileSerializer, JsonProfileSerializer, SCHEMA_KEY,
+    WordIdTable, create_serializer, loads_profile,
+)
+
+WORD_A = "0f8c2a9e-1b7d-4c55-9a1e-3d2b6f4e8a10"
+WORD_B = "7d1e4b2c-9f3a-4e6b-8c5d-2a1f0e9b7c64"
+WORD_C = "c3a9e7f1-5b2d-4a8c-b6e0-9d4f1a2c8e37"
+
+
+def make_profile():
+    return {
+        "user_id": 1234,
+        "join_date": "2026-01-02",
+        "words_knowledge": {WORD_A: 3, WORD_B: -2, WORD_C: 0},
+        "daily_streak": 5,
+        "last_practice": None,
+        "word_progress": {WORD_A: {"word_id": WORD_A, "status": "learning", "interval": 6.0}},
+        "session_data": {
+            "current_word_set": [WORD_B, WORD_C],
+            "current_word_index": 1,
+            "session_results": {WORD_B: {"remembered": True}, WORD_C: {"remembered": False}},
+        },
+    }
+
+
+@pytest.mark.parametrize("name", ["json", "compact", "binary"])
+def test_round_trip(tmp_path, name):
+    word_ids = WordIdTable(str(tmp_path / "word_ids.txt"))
+    serializer = create_serializer(name, word_ids)
+    profile = make_profile()
+    data = serializer.dumps(profile)
+    assert loads_profile(data, word_ids) == profile
+    # הקידוד לא משנה את הפרופיל שבזיכרון
+    assert profile == make_profile()
+
+
+def test_formats_are_detected_by_content(tmp_path):
+    word_ids = WordIdTable(str(tmp_path / "word_ids.txt"))
+    profile = make_profile()
+    json_data = JsonProfileSerializer(word_ids).dumps(profile)
+    compact_data = CompactProfileSerializer(word_ids).dumps(profile)
+    binary_data = BinaryProfileSerializer(word_ids).dumps(profile)
+    assert SCHEMA_KEY.encode() not in json_data
+    assert SCHEMA_KEY.encode() in compact_data
+    assert binary_data.startswith(b"EWUP")
+    assert len(compact_data) < len(json_data)
+    for data in (json_data, compact_data, binary_data):
+        assert loads_profile(data, word_ids) == profile
+
+
+def test_binary_keeps_non_integer_scores(tmp_path):
+    word_ids = WordIdTable(str(tmp_path / "word_ids.txt"))
+    profile = {"user_id": 1, "words_knowledge": {WORD_A: 1.5, WORD_B: 2}}
+    data = BinaryProfileSerializer(word_ids).dumps(profile)
+    assert loads_profile(data, word_ids) == profile
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_serializer("xml", WordIdTable(str(tmp_path / "word_ids.txt")))
+
+
+def test_word_id_table_survives_reload(tmp_path):
+    path = str(tmp_path / "word_ids.txt")
+    table = WordIdTable(path)
+    assert [table.index(WORD_A), table.index(WORD_B), table.index(WORD_A)] == [0, 1, 0]
+    assert table.flush() == 2
+    assert table.flush() == 0
+    table.index(WORD_C)
+    assert table.flush() == 1
+
+    reloaded = WordIdTable(path)
+    assert len(reloaded) == 3
+    assert [reloaded.word_id(i) for i in range(3)] == [WORD_A, WORD_B, WORD_C]
+    assert reloaded.index(WORD_B) == 1
+
+
+def test_word_id_table_drops_torn_last_line(tmp_path):
+    path = tmp_path / "word_ids.txt"
+    path.write_text(f"{WORD_A}\n{WORD_B}\n{WORD_C[:10]}", encoding="utf-8")
+    table = WordIdTable(str(path))
+    assert len(table) == 2
+    assert path.read_text(encoding="utf-8") == f"{WORD_A}\n{WORD_B}\n"
+    # המזהה שנקטע מקבל מספר חדש במקום השורה החלקית
+    assert table.index(WORD_C) == 2
+
+
+def test_profiles_written_before_reload_still_decode(tmp_path):
+    path = str(tmp_path / "word_ids.txt")
+    table = WordIdTable(path)
+    profile = make_profile()
+    data = create_serializer("binary", table).dumps(profile)
+    table.flush()
+    assert loads_profile(data, WordIdTable(path)) == profile
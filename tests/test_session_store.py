@@ -0,0 +1,64 @@
+"""בדיקות למצב הסשן: שמירה וטעינה מקובץ, ושמירה תקופתית בזמן הריצה"""
+
+import asyncio
+import json
+
+from models import UserRepository
+from storage.session_store import SessionStore
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    store = SessionStore(path=path)
+    assert not store.changed
+    store.put(1, {"current_word_index": 2})
+    assert store.changed
+    store.save()
+    assert not store.changed
+
+    reloaded = SessionStore(path=path)
+    assert reloaded.load() == 1
+    assert reloaded.get(1) == {"current_word_index": 2}
+
+
+def test_snapshot_is_taken_when_called(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    store = SessionStore(path=path)
+    session = {"current_word_index": 1}
+    store.put(1, session)
+    data = store.snapshot()
+    # שינוי במקום אחרי ה-snapshot לא נכנס לקובץ שנכתב ממנו
+    session["current_word_index"] = 5
+    store.save(data)
+    reloaded = SessionStore(path=path)
+    reloaded.load()
+    assert reloaded.get(1) == {"current_word_index": 1}
+
+
+def test_expired_sessions_are_not_saved(tmp_path):
+    path = tmp_path / "sessions.json"
+    store = SessionStore(ttl=0, path=str(path))
+    store.put(1, {})
+    store.save()
+    assert json.loads(path.read_text(encoding="utf-8")) == []
+
+
+def test_repository_saves_sessions_periodically(tmp_path):
+    path = tmp_path / "sessions.json"
+
+    async def run():
+        repo = UserRepository(str(tmp_path / "users"), session_file=str(path), session_save_interval=0.01)
+        repo.start()
+        await repo.save_session({"user_id": 7, "session_data": {"current_word_index": 3}})
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if path.exists():
+                break
+        saved = json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+        await repo.close()
+        return saved
+
+    saved = asyncio.run(run())
+    # נשמר לפני הכיבוי
+    assert saved is not None
+    assert [(user_id, session) for user_id, _, session in saved] == [(7, {"current_word_index": 3})]
@@ -0,0 +1,78 @@
+"""בדיקות למעברי המצב של review (SM-2): מרווחים, מקדם הגדילה וסטטוס המילה"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import UserWordProgress, WordStatus
+from modules.practice.spaced_repetition import (
+    FIRST_INTERVAL, MASTERED_INTERVAL, MIN_EASE, RELEARN_INTERVAL, REVIEW_TIME_FORMAT, SECOND_INTERVAL,
+    review,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def due_at(days: float) -> str:
+    return (NOW + timedelta(days=days)).strftime(REVIEW_TIME_FORMAT)
+
+
+def test_first_correct_answer_schedules_first_interval():
+    progress = review(UserWordProgress("w"), True, NOW)
+    assert progress.status == WordStatus.LEARNING
+    assert progress.interval == FIRST_INTERVAL
+    assert progress.repetitions == 1
+    assert progress.success_rate == 1.0
+    assert progress.next_review == due_at(FIRST_INTERVAL)
+    # איכות 4 לא משנה את מקדם הגדילה
+    assert progress.ease == 2.5
+
+
+def test_second_correct_answer_schedules_second_interval():
+    progress = review(review(UserWordProgress("w"), True, NOW), True, NOW)
+    assert progress.interval == SECOND_INTERVAL
+    assert progress.repetitions == 2
+    assert progress.next_review == due_at(SECOND_INTERVAL)
+
+
+def test_later_correct_answers_grow_by_ease():
+    progress = UserWordProgress("w", WordStatus.LEARNING, repetitions=2, success_rate=1.0,
+                                interval=SECOND_INTERVAL, ease=2.5)
+    progress = review(progress, True, NOW)
+    assert progress.interval == round(SECOND_INTERVAL * 2.5, 1)
+    assert progress.status == WordStatus.LEARNING
+
+
+def test_long_interval_marks_word_mastered():
+    progress = UserWordProgress("w", WordStatus.LEARNING, repetitions=3, success_rate=1.0,
+                                interval=15.0, ease=2.5)
+    progress = review(progress, True, NOW)
+    assert progress.interval >= MASTERED_INTERVAL
+    assert progress.status == WordStatus.MASTERED
+
+
+def test_forgetting_relearns_and_lowers_ease():
+    progress = UserWordProgress("w", WordStatus.MASTERED, repetitions=4, success_rate=1.0,
+                                interval=40.0, ease=2.5)
+    progress = review(progress, False, NOW)
+    assert progress.status == WordStatus.LEARNING
+    assert progress.interval == RELEARN_INTERVAL
+    assert progress.ease == pytest.approx(2.5 - 0.54)
+    assert progress.success_rate == 0.8
+    assert progress.next_review == due_at(RELEARN_INTERVAL)
+
+
+def test_ease_never_drops_below_minimum():
+    progress = UserWordProgress("w")
+    for _ in range(10):
+        progress = review(progress, False, NOW)
+    assert progress.ease == MIN_EASE
+    assert progress.success_rate == 0.0
+    assert progress.repetitions == 10
+
+
+def test_review_does_not_change_given_progress():
+    progress = UserWordProgress("w", WordStatus.LEARNING, repetitions=1, success_rate=1.0, interval=1.0)
+    review(progress, False, NOW)
+    assert (progress.status, progress.repetitions, progress.interval, progress.ease) == \
+        (WordStatus.LEARNING, 1, 1.0, 2.5)
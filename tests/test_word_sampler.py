@@ -0,0 +1,75 @@
+"""בדיקות לעץ פנוויק של הדוגם מול חישוב ישיר של סכומי הקידומת"""
+
+import random
+
+import pytest
+
+from modules.practice.word_sampler import FenwickTree, WordSampler
+
+
+def brute_find(weights, target):
+    """הפריט הראשון שסכום הקידומת שלו (כולל אותו) גדול מ-target"""
+    total = 0.0
+    for index, weight in enumerate(weights):
+        total += weight
+        if total > target:
+            return index
+    return len(weights)
+
+
+def check_against_brute_force(tree, weights, rng):
+    assert tree.total == pytest.approx(sum(weights))
+    assert list(tree.weights) == weights
+    prefix = 0.0
+    for index, weight in enumerate(weights):
+        # נקודות בתוך הטווח של כל פריט עם משקל, כולל הגבול התחתון שלו
+        if weight > 0:
+            for target in (prefix, prefix + weight * rng.random()):
+                assert tree.find(target) == brute_find(weights, target) == index
+        prefix += weight
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 8, 9, 100, 257])
+def test_find_matches_prefix_sums(size):
+    rng = random.Random(size)
+    weights = [float(rng.choice([0, 0.5, 1, 2, 3.25])) for _ in range(size)]
+    weights[rng.randrange(size)] = 1.0  # לפחות פריט אחד עם משקל
+    check_against_brute_force(FenwickTree(weights), weights, rng)
+
+
+def test_set_keeps_tree_consistent():
+    rng = random.Random(7)
+    weights = [float(rng.randint(0, 5)) for _ in range(61)]
+    tree = FenwickTree(weights)
+    for _ in range(500):
+        index = rng.randrange(len(weights))
+        weights[index] = float(rng.choice([0, 0.25, 1, 4]))
+        tree.set(index, weights[index])
+        if sum(weights):
+            target = rng.random() * sum(weights)
+            assert tree.find(target) == brute_find(weights, target)
+    if sum(weights):
+        check_against_brute_force(tree, weights, rng)
+
+
+def test_empty_tree():
+    tree = FenwickTree([])
+    assert len(tree) == 0
+    assert tree.total == 0
+
+
+def test_sampler_returns_distinct_words_with_weight():
+    word_ids = [f"w{i}" for i in range(50)]
+    # מילים עם ציון חיובי לא נבחרות
+    knowledge = {word_id: 1 for word_id in word_ids[::2]}
+
+    def weight(score, progress, now):
+        return 0.0 if score else 1.0
+
+    sampler = WordSampler(word_ids, {"words_knowledge": knowledge}, weight, now="2026-01-01T00:00:00")
+    chosen = sampler.sample(10, exclude=["w1"], rng=random.Random(3))
+    assert len(chosen) == len(set(chosen)) == 10
+    assert all(word_id not in knowledge and word_id != "w1" for word_id in chosen)
+    # הדגימה לא משנה את המשקלים
+    assert sampler.available == 25
+    assert len(sampler.sample(100, rng=random.Random(4))) == 25
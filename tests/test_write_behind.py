@@ -0,0 +1,101 @@
+"""בדיקות לכתיבה המושהית: איחוד שמירות של אותו מפתח, וכתיבה של כל מה שממתין בסגירה"""
+
+import asyncio
+
+from models import UserRepository
+from storage.write_behind import WriteBehindBuffer
+
+
+class RecordingWriter:
+    """כותב שזוכר כל סבב כתיבה"""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, values):
+        self.batches.append(list(values))
+        return [not self.fail] * len(values)
+
+
+def test_saves_of_same_key_are_coalesced():
+    async def run():
+        writer = RecordingWriter()
+        buffer = WriteBehindBuffer(writer, flush_interval=0)
+        await buffer.mark_dirty(1, "first")
+        await buffer.mark_dirty(1, "second")
+        await buffer.mark_dirty(2, "other")
+        assert await buffer.flush() == 2
+        return writer, buffer
+
+    writer, buffer = asyncio.run(run())
+    assert writer.batches == [["second", "other"]]
+    assert buffer.stats()["coalesced"] == 1
+    assert buffer.stats()["pending"] == 0
+
+
+def test_pending_value_is_visible_until_written():
+    async def run():
+        buffer = WriteBehindBuffer(RecordingWriter(), flush_interval=0)
+        await buffer.mark_dirty(7, {"user_id": 7})
+        before = buffer.pending(7), 7 in buffer
+        await buffer.flush()
+        return before, (buffer.pending(7), 7 in buffer)
+
+    before, after = asyncio.run(run())
+    assert before == ({"user_id": 7}, True)
+    assert after == (None, False)
+
+
+def test_failed_writes_stay_dirty():
+    async def run():
+        writer = RecordingWriter(fail=True)
+        buffer = WriteBehindBuffer(writer, flush_interval=0)
+        await buffer.mark_dirty(1, "value")
+        assert await buffer.flush() == 0
+        writer.fail = False
+        assert await buffer.flush() == 1
+        return writer, buffer
+
+    writer, buffer = asyncio.run(run())
+    assert writer.batches == [["value"], ["value"]]
+    assert buffer.stats()["failures"] == 1
+
+
+def test_stop_flushes_everything_pending():
+    async def run():
+        writer = RecordingWriter()
+        buffer = WriteBehindBuffer(writer, flush_interval=3600)
+        buffer.start()
+        await buffer.mark_dirty(1, "a")
+        await buffer.mark_dirty(2, "b")
+        await buffer.stop()
+        return writer, buffer
+
+    writer, buffer = asyncio.run(run())
+    assert writer.batches == [["a", "b"]]
+    assert len(buffer) == 0
+
+
+def test_repository_close_writes_saved_profiles(tmp_path):
+    async def save_and_close():
+        repo = UserRepository(str(tmp_path), flush_interval=3600)
+        repo.start()
+        for points in range(5):
+            await repo.save_user({"user_id": 42, "points": points})
+        stats = repo._write_behind.stats()
+        await repo.close()
+        return stats
+
+    async def load():
+        repo = UserRepository(str(tmp_path), flush_interval=0)
+        try:
+            return await repo.get_user(42)
+        finally:
+            await repo.close()
+
+    stats = asyncio.run(save_and_close())
+    # חמש שמירות לפני הכתיבה - נכתבת רק הגרסה האחרונה
+    assert stats["coalesced"] == 4
+    assert stats["writes"] == 0
+    assert asyncio.run(load())["points"] == 4
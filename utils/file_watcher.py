@@ -0,0 +1,64 @@
+"""
+מעקב אחרי שינויים בקובץ - בדיקה תקופתית של זמן השינוי והגודל שלו
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileWatcher:
+    """משימת asyncio שמפעילה פונקציה בכל פעם שקובץ משתנה"""
+
+    def __init__(self, path: str, on_change: Callable[[], Awaitable[None]], interval: float = 5.0):
+        """
+        Args:
+            path: נתיב הקובץ למעקב
+            on_change: פונקציה אסינכרונית שתופעל אחרי כל שינוי
+            interval: זמן בשניות בין בדיקות
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._read_signature()
+        self._task: Optional[asyncio.Task] = None
+
+    def _read_signature(self) -> Optional[Tuple[int, int]]:
+        """חתימת הקובץ - זמן שינוי וגודל (None אם הקובץ לא קיים)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self) -> None:
+        """התחלת המעקב ברקע"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """עצירת המעקב"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = self._read_signature()
+            if signature is None or signature == self._signature:
+                continue
+            try:
+                await self.on_change()
+            except Exception as e:
+                # למשל קובץ שנקרא באמצע כתיבה - ננסה שוב בבדיקה הבאה
+                logger.error(f"Failed to handle change in {self.path}: {e}")
+                continue
+            self._signature = signature
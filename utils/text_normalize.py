@@ -0,0 +1,64 @@
+"""
+מודול לנרמול טקסט באנגלית ובעברית לצורך חיפוש ואינדוקס
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# ניקוד וטעמים בעברית (U+0591 עד U+05C7), למעט סימני פיסוק כמו מקף עליון
+_HEBREW_MARKS = re.compile(r"[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")
+_HEBREW_ALTERNATIVES = re.compile(r"[,;/]")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+
+
+class _HebrewTranslationTable(dict):
+    """
+    טבלת תרגום ל-str.translate שנבנית בהדרגה: ניקוד נמחק, פיסוק מוחלף ברווח
+    ושאר התווים נשארים כמו שהם. כל תו מסווג פעם אחת בלבד ונשמר בטבלה.
+    """
+
+    def __missing__(self, codepoint: int):
+        char = chr(codepoint)
+        if _HEBREW_MARKS.match(char):
+            value = None
+        elif unicodedata.category(char).startswith("P"):
+            value = " "
+        else:
+            value = codepoint
+        self[codepoint] = value
+        return value
+
+
+_HEBREW_TABLE = _HebrewTranslationTable()
+
+
+def normalize_english(text: str) -> str:
+    """נרמול טקסט באנגלית לחיפוש מדויק - אותיות קטנות ורווחים מצומצמים"""
+    return " ".join((text or "").casefold().split())
+
+
+def normalize_hebrew(text: str) -> str:
+    """נרמול טקסט בעברית לחיפוש מדויק - הסרת ניקוד, פיסוק ורווחים מיותרים"""
+    return " ".join((text or "").translate(_HEBREW_TABLE).split())
+
+
+def hebrew_index_keys(text: str) -> List[str]:
+    """
+    מפתחות האינדקס העברי של מילה: התרגום המלא, וכל חלופה בנפרד
+    (למשל "להילחם, נלחם" או "עלה (עלים)")
+    """
+    keys = [normalize_hebrew(text)]
+    for part in _HEBREW_ALTERNATIVES.split(_PARENTHESES.sub("", text or "")):
+        key = normalize_hebrew(part)
+        if key not in keys:
+            keys.append(key)
+    return [key for key in keys if key]
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    נרמול אחיד לכל השדות במנוע החיפוש - אותיות קטנות, ללא ניקוד,
+    פיסוק מוחלף ברווח ורווחים מצומצמים
+    """
+    return normalize_hebrew((text or "").casefold())
@@ -0,0 +1,196 @@
+"""
+מנוע חיפוש לאוצר המילים - אינדקס תחיליות ממוין ואינדקס טריגרמות
+
+החיפוש מכסה את השדות english, translation ו-hebrew ומדרג את התוצאות לפי
+רמת ההתאמה: התאמה מדויקת, תחילית של המונח, תחילית של מילה בתוך המונח,
+תת-מחרוזת, ולבסוף התאמה מקורבת (עם שגיאות כתיב) לפי טריגרמות משותפות.
+"""
+
+import heapq
+import math
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+
+from utils.text_normalize import normalize_search_text
+
+# סדר השדות קובע גם את העדיפות שלהם בדירוג
+SEARCH_FIELDS = ("english", "translation", "hebrew")
+
+# דרגות ההתאמה - מספר נמוך יותר מדורג גבוה יותר
+TIER_EXACT = 0
+TIER_PREFIX = 1
+TIER_TOKEN_PREFIX = 2
+TIER_SUBSTRING = 3
+TIER_FUZZY = 4
+
+# מספר הרשומות שנסרקות בטווח התחיליות לכל תוצאה מבוקשת (חוסם שאילתות של אות אחת)
+PREFIX_SCAN_PER_RESULT = 10
+# סף הדמיון המינימלי (חלק הטריגרמות של השאילתה שנמצאו במילה) להתאמה מקורבת
+MIN_FUZZY_SIMILARITY = 0.4
+
+
+def _trigrams(term: str, padded: bool = True) -> Set[str]:
+    """חישוב קבוצת הטריגרמות של מונח (עם ריפוד רווחים לסימון תחילה וסוף)"""
+    if padded:
+        term = f" {term} "
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class WordSearchIndex:
+    """אינדקס חיפוש לאוצר המילים, מתעדכן בהוספה ובהסרה של מילים"""
+
+    def __init__(self):
+        # רשימה ממוינת של (מפתח, word_id, דרגת שדה, האם המפתח הוא המונח המלא)
+        self._prefix_entries: List[Tuple[str, str, int, bool]] = []
+        self._trigram_index: Dict[str, Set[str]] = {}  # טריגרמה -> מזהי מילים
+        self._word_terms: Dict[str, List[Tuple[int, str]]] = {}  # word_id -> [(דרגת שדה, מונח)]
+        self._word_trigrams: Dict[str, Set[str]] = {}  # word_id -> טריגרמות
+
+    @classmethod
+    def build(cls, words: Iterable) -> 'WordSearchIndex':
+        """בניית אינדקס מלא מאוסף מילים (מיון יחיד במקום הכנסות בודדות)"""
+        index = cls()
+        for word in words:
+            index._prefix_entries.extend(index._register(word))
+        index._prefix_entries.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._word_terms)
+
+    def copy(self) -> 'WordSearchIndex':
+        """עותק עצמאי של האינדקס (המונחים עצמם משותפים כי הם לא משתנים)"""
+        clone = WordSearchIndex()
+        clone._prefix_entries = list(self._prefix_entries)
+        clone._trigram_index = {gram: set(word_ids) for gram, word_ids in self._trigram_index.items()}
+        clone._word_terms = dict(self._word_terms)
+        clone._word_trigrams = dict(self._word_trigrams)
+        return clone
+
+    def _register(self, word) -> List[Tuple[str, str, int, bool]]:
+        """רישום המונחים והטריגרמות של מילה, והחזרת רשומות התחיליות שלה"""
+        terms = []
+        for field_rank, field in enumerate(SEARCH_FIELDS):
+            term = normalize_search_text(getattr(word, field, "") or "")
+            if term and all(term != existing for _, existing in terms):
+                terms.append((field_rank, term))
+
+        entries = []
+        grams = set()
+        for field_rank, term in terms:
+            entries.append((term, word.word_id, field_rank, True))
+            # כל מילה בתוך מונח מרובה מילים נגישה גם היא בחיפוש תחילית
+            for token in term.split(" ")[1:]:
+                entries.append((token, word.word_id, field_rank, False))
+            grams |= _trigrams(term)
+
+        for gram in grams:
+            self._trigram_index.setdefault(gram, set()).add(word.word_id)
+        self._word_terms[word.word_id] = terms
+        self._word_trigrams[word.word_id] = grams
+        return entries
+
+    def add(self, word) -> None:
+        """הוספת מילה לאינדקס (או עדכון מילה קיימת)"""
+        if word.word_id in self._word_terms:
+            self.remove(word.word_id)
+        for entry in self._register(word):
+            insort(self._prefix_entries, entry)
+
+    def remove(self, word_id: str) -> None:
+        """הסרת מילה מהאינדקס"""
+        terms = self._word_terms.pop(word_id, None)
+        if terms is None:
+            return
+
+        for field_rank, term in terms:
+            keys = [(term, True)] + [(token, False) for token in term.split(" ")[1:]]
+            for key, full in keys:
+                position = bisect_left(self._prefix_entries, (key, word_id, field_rank, full))
+                if position < len(self._prefix_entries) and self._prefix_entries[position] == (key, word_id, field_rank, full):
+                    del self._prefix_entries[position]
+
+        for gram in self._word_trigrams.pop(word_id, set()):
+            word_ids = self._trigram_index.get(gram)
+            if word_ids is not None:
+                word_ids.discard(word_id)
+                if not word_ids:
+                    del self._trigram_index[gram]
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """
+        חיפוש מילים לפי מחרוזת חיפוש
+
+        Args:
+            query: מחרוזת החיפוש (אנגלית או עברית)
+            limit: מספר התוצאות המקסימלי
+
+        Returns:
+            רשימת מזהי מילים מדורגת מההתאמה הטובה ביותר
+        """
+        query = normalize_search_text(query)
+        if not query or limit <= 0:
+            return []
+
+        # word_id -> מפתח דירוג; שומרים רק את ההתאמה הטובה ביותר לכל מילה
+        ranked: Dict[str, Tuple] = {}
+
+        def consider(word_id: str, rank: Tuple) -> None:
+            if word_id not in ranked or rank < ranked[word_id]:
+                ranked[word_id] = rank
+
+        # שלב 1: סריקת טווח התחיליות ברשימה הממוינת
+        entries = self._prefix_entries
+        position = bisect_left(entries, (query,))
+        scanned = 0
+        max_scan = max(limit * PREFIX_SCAN_PER_RESULT, 50)
+        while position < len(entries) and scanned < max_scan:
+            key, word_id, field_rank, full = entries[position]
+            if not key.startswith(query):
+                break
+            if full:
+                tier = TIER_EXACT if key == query else TIER_PREFIX
+            else:
+                tier = TIER_TOKEN_PREFIX
+            consider(word_id, (tier, field_rank, len(key), key))
+            position += 1
+            scanned += 1
+
+        if len(ranked) >= limit or len(query) < 3:
+            return self._top(ranked, limit)
+
+        # שלב 2: תת-מחרוזת - חיתוך רשימות הטריגרמות ואימות מול המונחים
+        query_grams = _trigrams(query, padded=False)
+        postings = sorted((self._trigram_index.get(gram, set()) for gram in query_grams), key=len)
+        candidates = set(postings[0]) if postings else set()
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        for word_id in candidates:
+            for field_rank, term in self._word_terms[word_id]:
+                if query in term:
+                    consider(word_id, (TIER_SUBSTRING, field_rank, len(term), term))
+                    break
+
+        if len(ranked) >= limit:
+            return self._top(ranked, limit)
+
+        # שלב 3: התאמה מקורבת לפי מספר הטריגרמות המשותפות.
+        # מילה שעוברת את הסף חייבת להופיע באחת מהרשימות הקצרות ביותר
+        # (סינון תחיליות), כך שהרשימות הארוכות משמשות רק לבדיקת שייכות.
+        postings = sorted((self._trigram_index.get(gram, set()) for gram in _trigrams(query)), key=len)
+        required = max(1, math.ceil(len(postings) * MIN_FUZZY_SIMILARITY))
+        candidates = set().union(*postings[:len(postings) - required + 1])
+        for word_id in candidates - ranked.keys():
+            common = sum(1 for posting in postings if word_id in posting)
+            if common >= required:
+                field_rank, term = self._word_terms[word_id][0]
+                consider(word_id, (TIER_FUZZY, -common / len(postings), len(term), term))
+
+        return self._top(ranked, limit)
+
+    @staticmethod
+    def _top(ranked: Dict[str, Tuple], limit: int) -> List[str]:
+        """בחירת התוצאות המדורגות ביותר"""
+        return [word_id for word_id, _ in heapq.nsmallest(limit, ranked.items(), key=lambda item: item[1])]
@@ -0,0 +1,284 @@
+"""
+תמונת מצב בינארית של מאגר המילים, לטעינה מהירה באמצעות מיפוי זיכרון (mmap)
+
+מבנה הקובץ:
+    כותרת  - מזהה פורמט, גרסה, מספר רשומות וגיבוב (hash) של קובץ ה-JSON המקורי
+    רשומות - רשומה ברוחב קבוע לכל מילה: הפניות (היסט, אורך) לערימת המחרוזות,
+             רמת קושי ודגלים
+    ערימה  - כל המחרוזות בקידוד UTF-8, אחת אחרי השנייה
+
+הקובץ ממופה לזיכרון לקריאה בלבד, כך שכמה תהליכים של הבוט על אותו שרת חולקים
+את אותם דפי זיכרון, ואובייקטי Word נוצרים רק כשניגשים למילה.
+
+בניית תמונת מצב (מתיקיית הפרויקט):
+    python -m utils.word_snapshot build data/words/words_complete_unique_ids.json
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+SNAPSHOT_MAGIC = b"EWSN"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = ".snapshot"
+
+# מזהה פורמט, גרסה, מספר רשומות, גיבוב המקור, היסט הערימה
+_HEADER = struct.Struct("<4sHI32sQ")
+# שמונה זוגות (היסט, אורך) למחרוזות, רמת קושי, דגלים
+_RECORD = struct.Struct("<16IiI")
+# סדר שדות המחרוזת ברשומה
+_STRING_FIELDS = ("word_id", "english", "hebrew", "translation", "part_of_speech",
+                  "examples", "synonyms", "topic_tags")
+_LIST_FIELDS = ("examples", "synonyms", "topic_tags")
+# מפריד בין פריטים בשדות רשימה (Unit Separator - לא מופיע בטקסט רגיל)
+_LIST_SEPARATOR = "\x1f"
+_FLAG_NO_TRANSLATION = 1
+
+# תצוגה מצומצמת של מילה עם השדות שנדרשים לבניית האינדקסים בלבד
+WordIndexView = namedtuple("WordIndexView", ["word_id", "english", "hebrew", "translation",
+                                             "difficulty_level", "topic_tags"])
+
+
+def snapshot_path_for(json_file_path: str) -> str:
+    """נתיב תמונת המצב המתאימה לקובץ JSON של מילים"""
+    return os.path.splitext(json_file_path)[0] + SNAPSHOT_EXTENSION
+
+
+def source_hash(json_file_path: str) -> bytes:
+    """גיבוב התוכן של קובץ ה-JSON, לזיהוי תמונת מצב שאינה מעודכנת"""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(json_file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def build_snapshot(json_file_path: str, snapshot_path: Optional[str] = None) -> str:
+    """
+    הידור קובץ ה-JSON של המילים לתמונת מצב בינארית
+
+    Args:
+        json_file_path: נתיב לקובץ המילים
+        snapshot_path: נתיב הפלט (ברירת מחדל: ליד קובץ ה-JSON)
+
+    Returns:
+        נתיב תמונת המצב שנכתבה
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(json_file_path)
+    digest = source_hash(json_file_path)
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        words_data = json.load(f)
+
+    heap = bytearray()
+    heap_positions: Dict[bytes, int] = {}  # מחרוזות זהות נשמרות בערימה פעם אחת בלבד
+    records = []
+
+    def add_string(value: str) -> Tuple[int, int]:
+        encoded = value.encode('utf-8')
+        if encoded not in heap_positions:
+            heap_positions[encoded] = len(heap)
+            heap.extend(encoded)
+        return heap_positions[encoded], len(encoded)
+
+    for word_data in words_data:
+        refs = []
+        for field in _STRING_FIELDS:
+            value = word_data.get(field)
+            if field in _LIST_FIELDS:
+                items = value or []
+                if any(_LIST_SEPARATOR in item for item in items):
+                    raise ValueError(f"שדה {field} של המילה {word_data.get('word_id')} מכיל תו מפריד אסור")
+                value = _LIST_SEPARATOR.join(items)
+            refs.extend(add_string(value or ""))
+        flags = _FLAG_NO_TRANSLATION if word_data.get('translation') is None else 0
+        records.append(_RECORD.pack(*refs, word_data.get('difficulty_level', 1), flags))
+
+    heap_offset = _HEADER.size + _RECORD.size * len(records)
+    temp_path = snapshot_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(records), digest, heap_offset))
+        f.writelines(records)
+        f.write(heap)
+    # החלפה אטומית, כדי שתהליך שטוען במקביל לא יראה קובץ חלקי
+    os.replace(temp_path, snapshot_path)
+    return snapshot_path
+
+
+class WordSnapshot:
+    """תמונת מצב ממופה לזיכרון - גישה לרשומות ללא פענוח של כל הקובץ"""
+
+    def __init__(self, snapshot_path: str):
+        with open(snapshot_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, digest, heap_offset = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"פורמט תמונת מצב לא נתמך: {magic!r} v{version}")
+        self.path = snapshot_path
+        self.count = count
+        self.source_hash = digest
+        self._heap_offset = heap_offset
+
+    @classmethod
+    def open_if_fresh(cls, json_file_path: str, snapshot_path: Optional[str] = None) -> Optional['WordSnapshot']:
+        """
+        פתיחת תמונת המצב רק אם היא נבנתה מהתוכן הנוכחי של קובץ ה-JSON
+
+        Returns:
+            תמונת המצב, או None אם היא חסרה, פגומה או לא מעודכנת
+        """
+        snapshot_path = snapshot_path or snapshot_path_for(json_file_path)
+        if not os.path.exists(snapshot_path):
+            return None
+        try:
+            snapshot = cls(snapshot_path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"שגיאה בפתיחת תמונת המצב של המילים: {e}")
+            return None
+        if snapshot.source_hash != source_hash(json_file_path):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def close(self) -> None:
+        """שחרור המיפוי לזיכרון"""
+        self._mmap.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._heap_offset + offset
+        return self._mmap[start:start + length].decode('utf-8')
+
+    def word_id(self, index: int) -> str:
+        """מזהה המילה ברשומה מספר index"""
+        offset, length = struct.unpack_from("<II", self._mmap, _HEADER.size + _RECORD.size * index)
+        return self._string(offset, length)
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """פענוח רשומה מספר index למילון בפורמט של קובץ ה-JSON"""
+        values = _RECORD.unpack_from(self._mmap, _HEADER.size + _RECORD.size * index)
+        data: Dict[str, Any] = {}
+        for position, field in enumerate(_STRING_FIELDS):
+            text = self._string(values[2 * position], values[2 * position + 1])
+            if field in _LIST_FIELDS:
+                data[field] = text.split(_LIST_SEPARATOR) if text else []
+            else:
+                data[field] = text
+        if values[17] & _FLAG_NO_TRANSLATION:
+            data['translation'] = None
+        data['difficulty_level'] = values[16]
+        return data
+
+    def index_view(self, index: int) -> WordIndexView:
+        """פענוח השדות של רשומה מספר index שנדרשים לאינדקסים בלבד"""
+        values = _RECORD.unpack_from(self._mmap, _HEADER.size + _RECORD.size * index)
+        string = self._string
+        tags = string(values[14], values[15])
+        return WordIndexView(
+            string(values[0], values[1]),
+            string(values[2], values[3]),
+            string(values[4], values[5]),
+            None if values[17] & _FLAG_NO_TRANSLATION else string(values[6], values[7]),
+            values[16],
+            tuple(tags.split(_LIST_SEPARATOR)) if tags else ("general",),
+        )
+
+
+class SnapshotWordMap(MutableMapping):
+    """
+    מילון word_id -> Word שמגובה בתמונת מצב ממופה לזיכרון
+
+    אובייקטי Word נוצרים מהרשומה בכל גישה ואינם נשמרים. מילים שנוספו או
+    הוחלפו בזמן ריצה נשמרות בשכבה נפרדת מעל תמונת המצב.
+    """
+
+    def __init__(self, snapshot: WordSnapshot, word_factory: Callable[[Dict[str, Any]], Any]):
+        self.snapshot = snapshot
+        self._word_factory = word_factory
+        self._positions = {snapshot.word_id(index): index for index in range(snapshot.count)}
+        self._overrides: Dict[str, Any] = {}
+        self._removed = set()
+
+    def __getitem__(self, word_id: str):
+        if word_id in self._overrides:
+            return self._overrides[word_id]
+        if word_id in self._removed or word_id not in self._positions:
+            raise KeyError(word_id)
+        return self._word_factory(self.snapshot.record(self._positions[word_id]))
+
+    def index_views(self) -> Iterator:
+        """
+        מעבר על כל המילים לצורך בניית אינדקסים - מילים מתמונת המצב מפוענחות
+        רק לתצוגה מצומצמת (WordIndexView), ללא יצירת אובייקטי Word
+        """
+        for word_id, index in self._positions.items():
+            if word_id in self._overrides:
+                yield self._overrides[word_id]
+            elif word_id not in self._removed:
+                yield self.snapshot.index_view(index)
+        for word_id, word in self._overrides.items():
+            if word_id not in self._positions:
+                yield word
+
+    def copy(self) -> 'SnapshotWordMap':
+        """עותק שחולק את תמונת המצב, עם שכבת שינויים נפרדת"""
+        clone = SnapshotWordMap.__new__(SnapshotWordMap)
+        clone.snapshot = self.snapshot
+        clone._word_factory = self._word_factory
+        clone._positions = self._positions
+        clone._overrides = dict(self._overrides)
+        clone._removed = set(self._removed)
+        return clone
+
+    def __setitem__(self, word_id: str, word) -> None:
+        self._overrides[word_id] = word
+        self._removed.discard(word_id)
+
+    def __delitem__(self, word_id: str) -> None:
+        if word_id not in self:
+            raise KeyError(word_id)
+        self._overrides.pop(word_id, None)
+        if word_id in self._positions:
+            self._removed.add(word_id)
+
+    def __contains__(self, word_id) -> bool:
+        if word_id in self._overrides:
+            return True
+        return word_id in self._positions and word_id not in self._removed
+
+    def __iter__(self) -> Iterator[str]:
+        for word_id in self._positions:
+            if word_id not in self._removed and word_id not in self._overrides:
+                yield word_id
+        yield from self._overrides
+
+    def __len__(self) -> int:
+        overridden = sum(1 for word_id in self._overrides if word_id in self._positions)
+        return len(self._positions) - len(self._removed) + len(self._overrides) - overridden
+
+
+def main():
+    parser = argparse.ArgumentParser(description="בניית תמונת מצב בינארית של מאגר המילים")
+    subparsers = parser.add_subparsers(dest="command", help="פקודה לביצוע")
+
+    build_parser = subparsers.add_parser("build", help="הידור קובץ JSON של מילים לתמונת מצב")
+    build_parser.add_argument("words_file", help="נתיב לקובץ המילים")
+    build_parser.add_argument("output_file", nargs="?", help="נתיב לקובץ הפלט (ברירת מחדל: ליד קובץ המילים)")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        path = build_snapshot(args.words_file, args.output_file)
+        print(f"נוצרה תמונת מצב עם {WordSnapshot(path).count} מילים.")
+        print(f"נתיב הקובץ: {os.path.abspath(path)}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()